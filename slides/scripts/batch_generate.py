@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Render many design files into decks in parallel.
+
+Design files are fanned out across a process pool. Each worker warms the
+template snapshot once and reuses it for every deck it renders. A failing deck
+is reported and the batch carries on, even one that kills its worker (see
+render_all()). Decks keep their path relative to the designs' common
+directory under --output-dir, so same-named designs in different directories
+do not overwrite each other. A JSON summary is written at the end, with each
+deck's phase timings and slowest slides. --metrics and --trace
+collect every deck's events into one JSON lines file or Chrome trace.
+--memory adds per-phase and per-slide memory to those metrics and the summary;
+--memory-budget fails any deck that grows its worker by more than the budget,
+with a memory report in its summary record, before the worker is OOM-killed.
+
+Usage:
+    uv run python slides/scripts/batch_generate.py <design_dir_or_glob>... [--template <template_name>]
+        [--generator <module:Class>] [--workers N] [--output-dir DIR] [--slim] [--summary FILE]
+        [--metrics FILE] [--trace FILE] [--memory] [--memory-budget MB]
+
+Example:
+    uv run python slides/scripts/batch_generate.py slides/design 'slides/design/2026-*.md' --workers 8
+"""
+
+import argparse
+import contextlib
+import glob
+import importlib
+import io
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from instrumentation import MIB, MemoryBudgetExceeded, write_chrome_trace
+from template_cache import load_snapshot
+
+DEFAULT_GENERATOR = 'generate_pptx:SlideGenerator'
+
+# Per-process state set up by _init_worker
+_worker = {}
+
+
+def load_generator(spec: str):
+    """Resolve a 'module:Class' spec to a SlideGenerator subclass."""
+    module_name, _, class_name = spec.partition(':')
+    if not class_name:
+        raise ValueError(f"Generator spec must look like 'module:Class', got {spec!r}")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def collect_design_files(patterns) -> list:
+    """Expand directories (*.md inside) and glob patterns into design files."""
+    files = []
+    seen = set()
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(path.glob('*.md'))
+        else:
+            matches = sorted(Path(p) for p in glob.glob(pattern))
+        for match in matches:
+            key = match.resolve()
+            if match.is_file() and key not in seen:
+                seen.add(key)
+                files.append(match)
+    return files
+
+
+def _init_worker(template_path: str, generator_spec: str, slim: bool = False, memory: dict = None):
+    """Load the template snapshot and generator class once per worker.
+
+    memory: track_memory() arguments for every deck, or None not to track memory.
+    """
+    load_snapshot(template_path).new_presentation()
+    _worker['template_path'] = template_path
+    _worker['generator'] = load_generator(generator_spec)
+    _worker['slim'] = slim
+    _worker['memory'] = memory
+
+
+def render_deck(design_path: str, output_path: str) -> dict:
+    """Render one design file in a worker and return its status record."""
+    start = time.perf_counter()
+    record = {'design': design_path, 'output': output_path, 'pid': os.getpid()}
+    gen = None
+    try:
+        gen = _worker['generator'](_worker['template_path'])
+        if _worker.get('memory') is not None:
+            gen.metrics.track_memory(**_worker['memory'])
+        with contextlib.redirect_stdout(io.StringIO()):
+            gen.generate_design(design_path)
+        gen.save(output_path, slim=_worker['slim'])
+        record.update(status='ok', slides=len(gen.prs.slides))
+    except MemoryBudgetExceeded as e:
+        # Drop the deck: its memory goes back to the worker's allocator (not the OS) for the next
+        # deck to reuse, and the next deck's budget is measured from where the worker is then
+        gen.prs = None
+        record.update(status='failed', error=f'{type(e).__name__}: {e}')
+    except Exception as e:
+        record.update(status='failed', error=f'{type(e).__name__}: {e}',
+                      traceback=traceback.format_exc())
+    record['seconds'] = round(time.perf_counter() - start, 4)
+    if gen is not None:
+        gen.metrics.stop_memory()
+        record.update(gen.metrics.summary())
+        record['events'] = gen.metrics.events
+        record['trace'] = gen.metrics.trace_events()
+    return record
+
+
+def output_paths(design_files, output_dir: Path) -> list:
+    """Output .pptx per design file: its path relative to the designs' common directory, under output_dir."""
+    parents = [str(design.resolve().parent) for design in design_files]
+    try:
+        common = Path(os.path.commonpath(parents)) if parents else None
+    except ValueError:  # different drives
+        common = None
+    outputs = []
+    for design in design_files:
+        relative = design.resolve().relative_to(common) if common else Path(design.name)
+        outputs.append(output_dir / relative.with_suffix('.pptx'))
+    return outputs
+
+
+def _crashed(design: str, output: str, error: Exception) -> dict:
+    """Status record of a deck whose worker process died."""
+    return {'design': design, 'output': output, 'status': 'failed',
+            'error': f'{type(error).__name__}: the worker died rendering this deck (out of memory?)'}
+
+
+def render_all(jobs, workers: int, initargs: tuple):
+    """Yield a status record per (design, output) job as decks finish, surviving dead workers.
+
+    A worker that dies (OOM-killed, say) breaks the whole pool and fails every
+    deck still in it. Those decks are retried one at a time in a fresh
+    single-worker pool, restarted whenever it breaks, so only a deck that kills
+    its worker on its own is reported failed.
+    """
+    retry = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        futures = {pool.submit(render_deck, *job): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except BrokenProcessPool:
+                retry.append(futures[future])
+
+    pool = None
+    try:
+        for job in sorted(retry):
+            if pool is None:
+                pool = ProcessPoolExecutor(max_workers=1, initializer=_init_worker, initargs=initargs)
+            try:
+                yield pool.submit(render_deck, *job).result()
+            except BrokenProcessPool as e:
+                pool.shutdown()
+                pool = None
+                yield _crashed(*job, e)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def run_batch(design_files, template_path: str, output_dir: Path,
+              generator_spec: str = DEFAULT_GENERATOR, workers: int = None,
+              slim: bool = False, memory: dict = None) -> dict:
+    """Render all design files and return the batch summary.
+
+    memory: track_memory() arguments (e.g. {'budget': 2 << 30}) to record memory
+    per deck, and fail decks that go over the budget; None skips it.
+
+    Deck records keep their raw metric events under 'events' and 'trace';
+    write_metrics() strips them out of the summary.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    # Fail fast on a bad spec, and warm the snapshot so forked workers inherit it
+    load_generator(generator_spec)
+    load_snapshot(template_path)
+
+    jobs = []
+    for design, output in zip(design_files, output_paths(design_files, output_dir)):
+        output.parent.mkdir(parents=True, exist_ok=True)
+        jobs.append((str(design), str(output)))
+
+    start = time.perf_counter()
+    results = []
+    for record in render_all(jobs, workers, (template_path, generator_spec, slim, memory)):
+        results.append(record)
+        if record['status'] == 'ok':
+            print(f"[ok]     {record['design']} -> {record['output']} "
+                  f"({record['slides']} slides, {record['seconds']:.2f}s)")
+        else:
+            print(f"[failed] {record['design']}: {record['error']}")
+
+    elapsed = time.perf_counter() - start
+    ok = sum(1 for r in results if r['status'] == 'ok')
+    results.sort(key=lambda r: r['design'])
+    return {
+        'template': template_path,
+        'generator': generator_spec,
+        'workers': workers,
+        'total': len(results),
+        'ok': ok,
+        'failed': len(results) - ok,
+        'seconds': round(elapsed, 4),
+        'decks_per_second': round(len(results) / elapsed, 2) if elapsed else None,
+        'decks': results,
+    }
+
+
+def write_metrics(summary: dict, metrics_path=None, trace_path=None):
+    """Move the decks' raw events out of the summary into JSON lines / Chrome trace files."""
+    lines = []
+    trace = []
+    for record in summary['decks']:
+        for event in record.pop('events', []):
+            lines.append(json.dumps({'design': record['design'], **event}, ensure_ascii=False) + '\n')
+        trace.extend(record.pop('trace', []))
+    if metrics_path:
+        Path(metrics_path).write_text(''.join(lines), encoding='utf-8')
+    if trace_path:
+        write_chrome_trace(trace_path, trace)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render many design files into decks in parallel')
+    parser.add_argument('designs', nargs='+', help='Design files, directories or glob patterns')
+    parser.add_argument('--template', '-t', default='genda', help='Template name (default: genda)')
+    parser.add_argument('--generator', '-g', default=DEFAULT_GENERATOR,
+                        help=f'Generator class as module:Class (default: {DEFAULT_GENERATOR})')
+    parser.add_argument('--workers', '-j', type=int, default=None,
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--output-dir', '-o', default='./slides/output', help='Output directory')
+    parser.add_argument('--slim', action='store_true',
+                        help='Drop template layouts, masters and media the decks do not use')
+    parser.add_argument('--summary', default=None,
+                        help='Summary JSON path (default: <output-dir>/batch_summary.json)')
+    parser.add_argument('--metrics', default=None, metavar='FILE',
+                        help='Write every deck\'s phase and slide metrics as JSON lines')
+    parser.add_argument('--trace', default=None, metavar='FILE',
+                        help='Write a Chrome trace of all decks (one process track per worker)')
+    parser.add_argument('--memory', action='store_true',
+                        help='Record memory per phase and slide in the metrics and summary')
+    parser.add_argument('--memory-budget', type=float, default=None, metavar='MB',
+                        help='Fail a deck once it grows its worker by more than MB MiB (implies --memory)')
+    args = parser.parse_args()
+
+    design_files = collect_design_files(args.designs)
+    if not design_files:
+        print("No design files found")
+        sys.exit(1)
+
+    template_path = f'./slides/templates/{args.template}.pptx'
+    output_dir = Path(args.output_dir)
+    summary_path = Path(args.summary) if args.summary else output_dir / 'batch_summary.json'
+
+    print(f"Design files: {len(design_files)}")
+    print(f"Template: {template_path}")
+    print(f"Generator: {args.generator}\n")
+
+    memory = None
+    if args.memory or args.memory_budget:
+        memory = {'budget': int(args.memory_budget * MIB) if args.memory_budget else None}
+    summary = run_batch(design_files, template_path, output_dir, args.generator, args.workers, args.slim,
+                        memory)
+    write_metrics(summary, args.metrics, args.trace)
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    print(f"\n{summary['ok']}/{summary['total']} decks rendered in {summary['seconds']:.2f}s "
+          f"with {summary['workers']} workers")
+    print(f"Summary: {summary_path}")
+    if summary['failed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
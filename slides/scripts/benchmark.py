@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Benchmark the slide generators against a synthetic template fixture.
+
+The real template (slides/templates/genda.pptx) is not in the repository, so the
+suite builds a stand-in locally: python-pptx's default template resized to
+20" x 11.25", with a GENDA-like colour scheme, title/subtitle placeholders on
+layouts 0 and 2 and a few sample slides to delete.
+
+Measured:
+    template load (cold parse and cached copy), TemplateColors extraction,
+    per-shape cost of add_rounded_box / add_text_box / add_multiline_box,
+    full WarehouseProposalGenerator.generate_all, save (python-pptx and streaming),
+    a line chart from a 1,000,000-point series (downsampled; chart part size recorded),
+    and build, text overflow check and save of 100 / 1,000 / 5,000-slide decks.
+    Primitive timings are per shape; everything else is per call.
+
+Results are written as JSON and can be compared with a stored baseline; any
+metric slower than the baseline by more than the tolerance fails the run.
+
+Usage:
+    uv run python slides/scripts/benchmark.py [--output FILE] [--baseline FILE] [--save-baseline FILE]
+        [--sizes 100,1000,5000] [--repeat N] [--tolerance 0.25]
+
+Example:
+    uv run python slides/scripts/benchmark.py --sizes 100 --save-baseline slides/output/bench-baseline.json
+    uv run python slides/scripts/benchmark.py --sizes 100 --baseline slides/output/bench-baseline.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pptx
+from pptx import Presentation
+from pptx.util import Inches
+
+import template_cache
+from generate_pptx import SlideGenerator, TemplateColors
+from generate_warehouse_proposal import WarehouseProposalGenerator
+
+# GENDA-like clrScheme used by the fixture
+FIXTURE_COLORS = {
+    'dk1': '001722',
+    'lt1': '979A9B',
+    'dk2': 'F3F4F4',
+    'lt2': 'C0A171',
+    'accent1': '82919B',
+    'accent2': '9D788C',
+    'accent3': 'A3AB91',
+    'accent4': 'E1D2BB',
+    'accent5': 'D1D6D9',
+    'accent6': 'DF3348',
+}
+
+DEFAULT_SIZES = (100, 1000, 5000)
+
+
+def build_fixture_template(path) -> Path:
+    """Write a synthetic stand-in for the GENDA template to path."""
+    prs = Presentation()
+    prs.slide_width = Inches(SlideGenerator.SLIDE_WIDTH)
+    prs.slide_height = Inches(SlideGenerator.SLIDE_HEIGHT)
+
+    # Layout 0: title + subtitle (subtitle below 2.5"), layout 2: title + subtitle
+    for layout_idx in (0, 2):
+        layout = prs.slide_layouts[layout_idx]
+        for ph in layout.placeholders:
+            ph_elm = ph._element.ph
+            if ph_elm.get('type') == 'ctrTitle':
+                ph_elm.set('type', 'title')
+            elif layout_idx == 2 and ph_elm.get('type') == 'body':
+                ph_elm.set('type', 'subTitle')
+
+    # Theme colours
+    theme_part = prs.slide_master.part.part_related_by(
+        'http://schemas.openxmlformats.org/officeDocument/2006/relationships/theme')
+    theme = theme_part.blob.decode('utf-8')
+    for slot, val in FIXTURE_COLORS.items():
+        start = theme.index(f'<a:{slot}>')
+        end = theme.index(f'</a:{slot}>', start)
+        theme = theme[:start] + f'<a:{slot}><a:srgbClr val="{val}"/>' + theme[end:]
+    theme_part.blob = theme.encode('utf-8')
+
+    # Sample slides for delete_all_slides() to remove
+    for layout_idx in (0, 1, 2):
+        slide = prs.slides.add_slide(prs.slide_layouts[layout_idx])
+        for ph in slide.placeholders:
+            ph.text = 'Sample'
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    prs.save(path)
+    return path
+
+
+def measure(fn, repeat: int = 5, number: int = 1) -> dict:
+    """Run fn `number` times per sample, `repeat` samples; report median and min seconds per call."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {'median_s': statistics.median(samples), 'min_s': min(samples), 'repeat': repeat, 'number': number}
+
+
+def bench_template(template_path: str, repeat: int) -> dict:
+    results = {}
+
+    def cold_load():
+        template_cache.clear_memory_cache()
+        template_cache.load_snapshot(template_path, use_disk=False).new_presentation()
+    results['template_load.cold'] = measure(cold_load, repeat)
+
+    gen = SlideGenerator(template_path)
+    results['template_load.cached'] = measure(gen.load_template, repeat, number=5)
+
+    package = Path(template_path).read_bytes()
+    results['theme_colors.extract'] = measure(lambda: template_cache.extract_theme_colors(package), repeat, number=5)
+    results['theme_colors.cached'] = measure(lambda: TemplateColors(template_path), repeat, number=20)
+    return results
+
+
+def bench_primitives(template_path: str, repeat: int, shapes: int = 500) -> dict:
+    """Per-shape cost of each primitive, on both the fragment and the proxy path."""
+    results = {}
+    for use_fragments, suffix in ((True, ''), (False, '[proxy]')):
+        gen = SlideGenerator(template_path)
+        gen.USE_FRAGMENTS = use_fragments
+        c = gen.colors
+        primitives = {
+            'add_rounded_box': lambda slide: gen.add_rounded_box(slide, 1, 3, 4, 1, c.dark_navy, "在庫精度", 14, c.white),
+            'add_text_box': lambda slide: gen.add_text_box(slide, 1, 3, 4, 0.5, "どこからでも確認", 14, c.dark_navy, True),
+            'add_multiline_box': lambda slide: gen.add_multiline_box(slide, 1, 3, 3, 2.8, c.dark_navy, "見えない", "在庫状況が不明"),
+        }
+        for name, add in primitives.items():
+            samples = []
+            for _ in range(repeat):
+                gen.load_template()
+                gen.delete_all_slides()
+                slide = gen.add_content_slide("Benchmark")
+                start = time.perf_counter()
+                for _ in range(shapes):
+                    add(slide)
+                samples.append((time.perf_counter() - start) / shapes)
+            results[f'{name}{suffix}'] = {
+                'median_s': statistics.median(samples), 'min_s': min(samples),
+                'repeat': repeat, 'number': shapes,
+            }
+    return results
+
+
+def bench_deck(template_path: str, repeat: int) -> dict:
+    results = {}
+    gen = WarehouseProposalGenerator(template_path)
+
+    def generate():
+        with contextlib.redirect_stdout(io.StringIO()):
+            gen.generate_all()
+    results['generate_all'] = measure(generate, repeat)
+
+    generate()
+    results['save.pptx'] = measure(lambda: gen.prs.save(io.BytesIO()), repeat)
+    results['save.stream'] = measure(lambda: gen.save_to_stream(io.BytesIO()), repeat)
+    return results
+
+
+def bench_charts(template_path: str, repeat: int, points: int = 1_000_000) -> dict:
+    """A line chart from one very long series, thinned to CHART_MAX_POINTS."""
+    gen = SlideGenerator(template_path)
+    gen.load_template()
+    gen.delete_all_slides()
+    slide = gen.add_content_slide("Benchmark")
+    categories = list(range(points))
+    values = [(i % 1000) * 0.01 + (i // 1000) for i in range(points)]
+
+    def add():
+        return gen.add_line_chart(slide, 1, 3, 12, 6, categories, [("在庫数", values)])
+    result = measure(add, repeat)
+    result['points'] = points
+    result['chart_bytes'] = len(add().chart.part.blob)
+    return {'chart.line.1m': result}
+
+
+def bench_scaling(template_path: str, sizes) -> dict:
+    """Build and save decks of each size by cycling through the warehouse slide builders."""
+    results = {}
+    for size in sizes:
+        gen = WarehouseProposalGenerator(template_path)
+        gen.load_template()
+        gen.delete_all_slides()
+        builders = [name for name, _label in gen.SLIDE_BUILDERS]
+
+        start = time.perf_counter()
+        for i in range(size):
+            getattr(gen, builders[i % len(builders)])()
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        gen.check_text()
+        check_s = time.perf_counter() - start
+
+        sink = io.BytesIO()
+        start = time.perf_counter()
+        gen.save_to_stream(sink)
+        save_s = time.perf_counter() - start
+
+        results[f'deck.{size}.build'] = {'median_s': build_s, 'min_s': build_s, 'repeat': 1, 'number': 1,
+                                         'per_slide_s': build_s / size}
+        results[f'deck.{size}.check_text'] = {'median_s': check_s, 'min_s': check_s, 'repeat': 1, 'number': 1,
+                                              'boxes': len(gen.text_boxes)}
+        results[f'deck.{size}.save'] = {'median_s': save_s, 'min_s': save_s, 'repeat': 1, 'number': 1,
+                                        'bytes': sink.tell()}
+    return results
+
+
+def run(template_path: str, sizes, repeat: int) -> dict:
+    results = {}
+    for section in (bench_template, bench_primitives, bench_deck, bench_charts):
+        results.update(section(template_path, repeat))
+    results.update(bench_scaling(template_path, sizes))
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'python_pptx': pptx.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Return (name, baseline_s, current_s, ratio) for metrics slower than baseline * (1 + tolerance)."""
+    regressions = []
+    for name, base in baseline['results'].items():
+        cur = current['results'].get(name)
+        if cur is None or not base['median_s']:
+            continue
+        ratio = cur['median_s'] / base['median_s']
+        if ratio > 1 + tolerance:
+            regressions.append((name, base['median_s'], cur['median_s'], ratio))
+    return regressions
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f'{seconds * 1e6:9.1f} us'
+    if seconds < 1:
+        return f'{seconds * 1e3:9.2f} ms'
+    return f'{seconds:9.3f} s '
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark slide generation on a synthetic template')
+    parser.add_argument('--output', '-o', default=None, help='Write results JSON here')
+    parser.add_argument('--baseline', default=None, help='Compare against this results JSON')
+    parser.add_argument('--save-baseline', default=None, help='Also write results as a new baseline here')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='Deck sizes for the scaling benchmark (default: 100,1000,5000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Samples per benchmark (default: 5)')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown versus baseline before failing (default: 0.25)')
+    parser.add_argument('--template', default=None, help='Use this template instead of the synthetic fixture')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    with tempfile.TemporaryDirectory() as tmp:
+        template_path = args.template or str(build_fixture_template(Path(tmp) / 'fixture.pptx'))
+        report = run(template_path, sizes, args.repeat)
+
+    for name, result in report['results'].items():
+        print(f"{name:32s} {_format_seconds(result['median_s'])}")
+
+    payload = json.dumps(report, indent=2)
+    for path in filter(None, (args.output, args.save_baseline)):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(payload, encoding='utf-8')
+        print(f"\nWrote {path}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegressions (> {args.tolerance:.0%} slower than {args.baseline}):")
+            for name, base_s, cur_s, ratio in regressions:
+                print(f"  {name:30s} {_format_seconds(base_s)} -> {_format_seconds(cur_s)}  x{ratio:.2f}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
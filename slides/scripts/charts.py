@@ -0,0 +1,168 @@
+"""
+Downsampling for chart series.
+
+A chart part stores every point of every series twice, in the chart XML and in
+the embedded workbook, and PowerPoint redraws all of them, yet a chart a few
+inches wide can only show around a thousand. Long series are therefore thinned
+before python-pptx writes the chart, using Largest-Triangle-Three-Buckets
+(Steinarsson, 2013): the series is cut into equal buckets and from each the
+point forming the largest triangle with the previously kept point and the
+next bucket's average is kept. Unlike striding or averaging, LTTB keeps
+peaks, dips and the overall shape, which is what a trend line is for.
+
+Series sharing one category axis are thinned together: each series gets an
+equal share of the point budget and the union of the kept indices is used,
+so the output stays within max_points whatever the input length. With more
+series than a share of at least three points allows, evenly spaced
+categories are kept instead.
+
+Gaps (None values, which python-pptx writes as missing points) are left out
+of LTTB. Where the share allows, the first missing point of each gap is kept
+too, so the gap still shows after thinning.
+
+NumPy is used when it is installed; otherwise a pure-Python version picks
+the same points, more slowly.
+"""
+
+from datetime import date, datetime
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _numeric(categories) -> list:
+    """x values for LTTB: dates and datetimes as ordinals, numbers as is, anything else by position."""
+    first = categories[0]
+    if isinstance(first, datetime):
+        return list(map(datetime.timestamp, categories))
+    if isinstance(first, date):
+        return list(map(date.toordinal, categories))
+    if isinstance(first, (int, float)) and not isinstance(first, bool):
+        return categories
+    return range(len(categories))
+
+
+def _bucket_edges(n: int, threshold: int) -> tuple:
+    """Bucket boundaries (bucket i is edges[i]:edges[i + 1]) and where each next bucket ends.
+
+    The first and last points are buckets of their own and always kept.
+    """
+    every = (n - 2) / (threshold - 2)
+    edges = [int(i * every) + 1 for i in range(threshold - 1)]
+    edges[-1] = n - 1
+    next_ends = [min(int(i * every) + 1, n) for i in range(2, threshold)]
+    return edges, next_ends
+
+
+def _lttb_python(x, y, threshold: int) -> list:
+    n = len(y)
+    edges, next_ends = _bucket_edges(n, threshold)
+    kept = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = next_ends[i]
+        count = next_end - end
+        avg_x = sum(x[end:next_end]) / count
+        avg_y = sum(y[end:next_end]) / count
+
+        # Twice the triangle area is |dx * y[j] + dy * x[j] - c| for candidate j
+        ax, ay = x[a], y[a]
+        dx = ax - avg_x
+        dy = avg_y - ay
+        c = dx * ay + ax * dy
+        best = start
+        best_area = -1.0
+        for j, (xj, yj) in enumerate(zip(x[start:end], y[start:end]), start):
+            area = dx * yj + dy * xj - c
+            if area < 0:
+                area = -area
+            if area > best_area:
+                best_area = area
+                best = j
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
+
+
+def _lttb_numpy(x, y, threshold: int) -> list:
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    edges, next_ends = (np.array(bounds) for bounds in _bucket_edges(n, threshold))
+    # Averages of every "next bucket" from prefix sums
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+    counts = next_ends - edges[1:]
+    avg_x = (cx[next_ends] - cx[edges[1:]]) / counts
+    avg_y = (cy[next_ends] - cy[edges[1:]]) / counts
+
+    kept = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        dx = ax - avg_x[i]
+        dy = avg_y[i] - ay
+        areas = np.abs(dx * y[start:end] + dy * x[start:end] - (dx * ay + ax * dy))
+        a = int(start + np.argmax(areas))
+        kept.append(a)
+    kept.append(n - 1)
+    return kept
+
+
+def lttb_indices(x, y, threshold: int) -> list:
+    """Indices of the points LTTB keeps to draw y over x with `threshold` points."""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    if np is not None:
+        return _lttb_numpy(x, y, threshold)
+    return _lttb_python(x, y, threshold)
+
+
+def _series_indices(x, values, share: int) -> list:
+    """Indices to keep of one series within `share` points, skipping (and marking) None gaps."""
+    present = [i for i, value in enumerate(values) if value is not None]
+    if len(present) == len(values):
+        return lttb_indices(x, values, share)
+    gaps = [i for i, value in enumerate(values) if value is None and (i == 0 or values[i - 1] is not None)]
+    if share - len(gaps) >= 3:
+        share -= len(gaps)
+    else:
+        gaps = []
+    kept = lttb_indices([x[i] for i in present], [values[i] for i in present], share)
+    return [present[i] for i in kept] + gaps
+
+
+def downsample(categories, series, max_points: int) -> tuple:
+    """Thin category chart data to at most max_points categories.
+
+    Args:
+        categories: the shared x values (dates, numbers or labels).
+        series: [(name, values), ...], each as long as categories; values may be None.
+        max_points: category budget; data already within it is returned unchanged.
+
+    Returns:
+        (categories, series) with the same structure.
+    """
+    categories = list(categories)
+    if len(categories) <= max_points or not series:
+        return categories, series
+
+    n = len(categories)
+    share = max_points // len(series)
+    if share < 3:
+        # Too many series for LTTB's minimum of three points each
+        kept = sorted({round(i * (n - 1) / (max_points - 1)) for i in range(max_points)}) if max_points > 1 else [0]
+        return [categories[i] for i in kept], [(name, [values[i] for i in kept]) for name, values in series]
+
+    x = _numeric(categories)
+    kept = set()
+    for _name, values in series:
+        kept.update(_series_indices(x, values, share))
+    kept = sorted(kept)
+    return [categories[i] for i in kept], [(name, [values[i] for i in kept]) for name, values in series]
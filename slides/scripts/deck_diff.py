@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Structural diff of generated decks against known-good ("golden") outputs.
+
+Two decks are compared part by part, cheapest check first:
+
+1. Zip directories. Every member's CRC-32 and size are in the central
+   directory, so decks whose members all match are identical without
+   decompressing anything. This is the common case in CI.
+2. Slide fingerprints. Each slide is keyed by its XML's CRC and size and by
+   what its relationships point at (layouts by name, media and charts by
+   their CRC), so renumbered image or chart parts do not count as changes.
+3. Shape trees. Only slides whose fingerprints differ are parsed. Volatile
+   attributes are normalised away (shape ids, the id suffix python-pptx
+   puts in default names, rIds, PowerPoint's creationId extensions), each
+   top-level shape is hashed and the two shape sequences are aligned, so an
+   inserted shape shows up as one addition rather than as every later shape
+   changing.
+
+docProps (timestamps, revision, application), presentation.xml and its
+relationships and [Content_Types].xml are derived from the slides or
+volatile and are not compared on their own. Other parts (layouts, masters,
+themes) are compared by name and CRC.
+
+Usage:
+    uv run python slides/scripts/deck_diff.py <golden> <current> [--json FILE]
+
+<golden> and <current> are two .pptx files or two directories; directories
+are compared deck by deck (*.pptx, recursively, matched by relative path).
+Exits with status 1 if anything differs.
+
+Example:
+    uv run python slides/scripts/deck_diff.py slides/golden slides/output
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import posixpath
+import sys
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import NamedTuple
+
+from theme_registry import NS_A, NS_P, NS_R, RT, RT_OFFICE_DOCUMENT, read_id_list, read_rels, rel_target
+
+RT_SLIDE_LAYOUT = RT + 'slideLayout'
+RT_NOTES_SLIDE = RT + 'notesSlide'
+
+EMU_PER_INCH = 914400
+
+# Members never compared: volatile, or derived from the slides
+IGNORED_PARTS = {'[Content_Types].xml', '_rels/.rels', 'ppt/presentation.xml', 'ppt/_rels/presentation.xml.rels'}
+IGNORED_PREFIXES = ('docProps/',)
+
+# Members compared through the slides that use them rather than by name
+SLIDE_PREFIXES = ('ppt/slides/', 'ppt/notesSlides/', 'ppt/media/', 'ppt/charts/', 'ppt/embeddings/')
+
+SHAPE_TAGS = {NS_P + tag for tag in ('sp', 'pic', 'graphicFrame', 'grpSp', 'cxnSp', 'contentPart')}
+SHAPE_KINDS = {'sp': 'shape', 'pic': 'picture', 'graphicFrame': 'frame', 'grpSp': 'group',
+               'cxnSp': 'connector', 'contentPart': 'ink'}
+
+
+class Shape(NamedTuple):
+    """A top-level shape of a slide, as reported in a diff."""
+
+    kind: str
+    name: str
+    geometry: tuple  # (left, top, width, height) in inches, or None
+    text: str
+    digest: str
+
+    def describe(self) -> dict:
+        return {'kind': self.kind, 'name': self.name, 'geometry': self.geometry, 'text': self.text}
+
+
+class Deck:
+    """Read-only view of a .pptx package for diffing."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.zip = zipfile.ZipFile(path)
+        self.info = {info.filename: info for info in self.zip.infolist()}
+        self._slides = None
+
+    def close(self):
+        self.zip.close()
+
+    def content_key(self, member: str) -> str:
+        """Identity of a member's bytes, from the zip directory alone."""
+        info = self.info.get(member)
+        return f'{info.CRC:08x}:{info.file_size}' if info else 'missing'
+
+    def compared_parts(self) -> dict:
+        """{member: content key} for the parts compared by name."""
+        return {
+            name: self.content_key(name) for name in self.info
+            if name not in IGNORED_PARTS and not name.startswith(IGNORED_PREFIXES + SLIDE_PREFIXES)
+        }
+
+    def directory(self) -> dict:
+        return {
+            name: self.content_key(name) for name in self.info
+            if name not in IGNORED_PARTS and not name.startswith(IGNORED_PREFIXES)
+        }
+
+    @property
+    def slides(self) -> list:
+        """Slide members in presentation order."""
+        if self._slides is None:
+            document = rel_target(read_rels(self.zip, ''), RT_OFFICE_DOCUMENT)
+            rels = read_rels(self.zip, document)
+            self._slides = [rels[rId][1] for rId in read_id_list(self.zip, document, NS_P + 'sldIdLst')]
+        return self._slides
+
+    def rel_keys(self, slide: str) -> dict:
+        """{rId: (reltype, key)} of a slide's relationships, keyed by what they point at."""
+        keys = {}
+        for rId, (reltype, target) in read_rels(self.zip, slide).items():
+            if reltype == RT_SLIDE_LAYOUT:
+                keys[rId] = (reltype, target)
+            else:
+                keys[rId] = (reltype, self.content_key(target))
+        return keys
+
+    def fingerprint(self, slide: str) -> tuple:
+        return self.content_key(slide), tuple(sorted(self.rel_keys(slide).items()))
+
+
+def _geometry(shape) -> tuple:
+    xfrm = shape.find(f'./*/{NS_A}xfrm')
+    if xfrm is None:
+        xfrm = shape.find(f'{NS_P}xfrm')
+    if xfrm is None:
+        return None
+    off, ext = xfrm.find(NS_A + 'off'), xfrm.find(NS_A + 'ext')
+    if off is None or ext is None:
+        return None
+    return tuple(round(int(v) / EMU_PER_INCH, 2)
+                 for v in (off.get('x'), off.get('y'), ext.get('cx'), ext.get('cy')))
+
+
+def _text(shape) -> str:
+    paragraphs = [''.join(t.text or '' for t in p.iter(NS_A + 't')) for p in shape.iter(NS_A + 'p')]
+    return '\n'.join(paragraphs).strip('\n')
+
+
+def _digest(elem) -> str:
+    """Hash of an element's tag, sorted attributes, text and children."""
+    h = hashlib.blake2b(digest_size=16)
+    for node in elem.iter():
+        h.update(node.tag.encode())
+        for name, value in sorted(node.attrib.items()):
+            h.update(f'\x01{name}={value}'.encode())
+        h.update(f'\x02{node.text or ""}\x03{node.tail or ""}\x04'.encode())
+    return h.hexdigest()
+
+
+def _strip_creation_ids(root):
+    """Drop creationId extensions (and extension lists they leave empty)."""
+    for ext_lst in list(root.iter()):
+        if not ext_lst.tag.endswith('}extLst'):
+            continue
+        for ext in list(ext_lst):
+            for child in list(ext):
+                if child.tag.endswith('}creationId'):
+                    ext.remove(child)
+            if len(ext) == 0:
+                ext_lst.remove(ext)
+    for parent in list(root.iter()):
+        for child in list(parent):
+            if child.tag.endswith('}extLst') and len(child) == 0:
+                parent.remove(child)
+
+
+def normalise_slide(xml: bytes, rel_keys: dict):
+    """Parse slide XML with volatile attributes normalised.
+
+    Returns:
+        (shapes, properties): a Shape per top-level shape, and a digest of
+        everything outside the shape tree (background, transition, ...).
+    """
+    root = ET.fromstring(xml)
+    _strip_creation_ids(root)
+
+    # rIds -> what they point at
+    for node in root.iter():
+        for name, value in node.attrib.items():
+            if name.startswith(NS_R) and value in rel_keys:
+                node.set(name, rel_keys[value][1])
+
+    # Shape ids, and the "TextBox 4" suffix python-pptx derives from them
+    by_id = {}
+    for c_nv_pr in root.iter(NS_P + 'cNvPr'):
+        shape_id = c_nv_pr.attrib.pop('id', None)
+        name = c_nv_pr.get('name', '')
+        base, _, suffix = name.rpartition(' ')
+        if shape_id is not None and suffix.isdigit() and int(suffix) in (int(shape_id), int(shape_id) - 1):
+            c_nv_pr.set('name', base)
+        by_id[shape_id] = c_nv_pr
+    # Connectors refer to shapes by id; refer to them by content instead
+    connections = [node for node in root.iter() if node.tag in (NS_A + 'stCxn', NS_A + 'endCxn')]
+    if connections:
+        parents = {child: parent for parent in root.iter() for child in parent}
+        for node in connections:
+            target = by_id.get(node.get('id'))
+            if target is not None:
+                node.set('id', _digest(parents[parents[target]]))
+
+    sp_tree = root.find(f'{NS_P}cSld/{NS_P}spTree')
+    shapes = []
+    if sp_tree is not None:
+        for child in list(sp_tree):
+            if child.tag not in SHAPE_TAGS:
+                continue
+            c_nv_pr = child.find(f'./*/{NS_P}cNvPr')
+            shapes.append(Shape(
+                SHAPE_KINDS[child.tag.split('}')[-1]],
+                c_nv_pr.get('name', '') if c_nv_pr is not None else '',
+                _geometry(child), _text(child), _digest(child),
+            ))
+            sp_tree.remove(child)
+    return shapes, _digest(root)
+
+
+def diff_shapes(before: list, after: list) -> list:
+    """Added, removed and changed shapes between two shape sequences."""
+    changes = []
+    matcher = difflib.SequenceMatcher(None, [s.digest for s in before], [s.digest for s in after], autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == 'equal':
+            continue
+        old, new = before[i1:i2], after[j1:j2]
+        if op == 'replace':
+            # Pair shapes up in order; what is left over was added or removed
+            for k, (a, b) in enumerate(zip(old, new)):
+                aspects = [name for name in ('geometry', 'text') if getattr(a, name) != getattr(b, name)]
+                if a.kind != b.kind or a.name != b.name:
+                    aspects.append('identity')
+                changes.append({'op': 'changed', 'index': j1 + k, 'aspects': aspects or ['format'],
+                                'before': a.describe(), 'after': b.describe()})
+            paired = min(len(old), len(new))
+            old, new = old[paired:], new[paired:]
+            i1, j1 = i1 + paired, j1 + paired
+        changes.extend({'op': 'removed', 'index': i1 + k, 'before': s.describe()} for k, s in enumerate(old))
+        changes.extend({'op': 'added', 'index': j1 + k, 'after': s.describe()} for k, s in enumerate(new))
+    return changes
+
+
+def _read_slide(deck: Deck, slide: str):
+    rel_keys = deck.rel_keys(slide)
+    shapes, properties = normalise_slide(deck.zip.read(slide), rel_keys)
+    layout = next((key for reltype, key in rel_keys.values() if reltype == RT_SLIDE_LAYOUT), None)
+    notes = next((key for reltype, key in rel_keys.values() if reltype == RT_NOTES_SLIDE), None)
+    return shapes, (properties, notes), posixpath.basename(layout or '')
+
+
+def diff_slide(golden: Deck, current: Deck, slide_a: str, slide_b: str):
+    """Changes between two slides, or None if they only differ in volatile details."""
+    if golden.fingerprint(slide_a) == current.fingerprint(slide_b):
+        return None
+    shapes_a, props_a, layout_a = _read_slide(golden, slide_a)
+    shapes_b, props_b, layout_b = _read_slide(current, slide_b)
+    result = {}
+    if layout_a != layout_b:
+        result['layout'] = [layout_a, layout_b]
+    if props_a[0] != props_b[0]:
+        result['properties'] = 'changed'
+    if props_a[1] != props_b[1]:
+        result['notes'] = 'changed'
+    shapes = diff_shapes(shapes_a, shapes_b)
+    if shapes:
+        result['shapes'] = shapes
+    return result or None
+
+
+def diff_decks(golden_path, current_path) -> dict:
+    """Compare two .pptx files.
+
+    Returns:
+        {'identical': bool, 'parts': {member: 'added'|'removed'|'changed'},
+         'slides': [{'slide': n, ...}, ...]} with slides numbered from 1.
+    """
+    golden, current = Deck(golden_path), Deck(current_path)
+    try:
+        result = {'identical': True, 'parts': {}, 'slides': []}
+        if golden.directory() == current.directory():
+            return result
+
+        parts_a, parts_b = golden.compared_parts(), current.compared_parts()
+        for name in sorted(parts_a.keys() | parts_b.keys()):
+            if name not in parts_b:
+                result['parts'][name] = 'removed'
+            elif name not in parts_a:
+                result['parts'][name] = 'added'
+            elif parts_a[name] != parts_b[name]:
+                result['parts'][name] = 'changed'
+
+        slides_a, slides_b = golden.slides, current.slides
+        for n, (slide_a, slide_b) in enumerate(zip(slides_a, slides_b), 1):
+            change = diff_slide(golden, current, slide_a, slide_b)
+            if change:
+                result['slides'].append({'slide': n, **change})
+        for n in range(len(slides_b), len(slides_a)):
+            result['slides'].append({'slide': n + 1, 'removed': True})
+        for n in range(len(slides_a), len(slides_b)):
+            shapes, _props, _layout = _read_slide(current, slides_b[n])
+            result['slides'].append({'slide': n + 1, 'added': True, 'shapes': len(shapes)})
+
+        result['identical'] = not result['parts'] and not result['slides']
+        return result
+    finally:
+        golden.close()
+        current.close()
+
+
+def diff_directories(golden_dir, current_dir) -> dict:
+    """Compare every deck under two directories, matched by relative path."""
+    golden_dir, current_dir = Path(golden_dir), Path(current_dir)
+    golden = {p.relative_to(golden_dir).as_posix() for p in golden_dir.rglob('*.pptx')}
+    current = {p.relative_to(current_dir).as_posix() for p in current_dir.rglob('*.pptx')}
+    results = {}
+    for name in sorted(golden | current):
+        if name not in current:
+            results[name] = {'identical': False, 'missing': 'current'}
+        elif name not in golden:
+            results[name] = {'identical': False, 'missing': 'golden'}
+        else:
+            results[name] = diff_decks(golden_dir / name, current_dir / name)
+    return results
+
+
+def _format_shape(shape: dict) -> str:
+    text = shape['text'].replace('\n', ' / ')
+    if len(text) > 40:
+        text = text[:39] + '…'
+    geometry = shape['geometry']
+    where = f" at ({geometry[0]:.2f}, {geometry[1]:.2f}) {geometry[2]:.2f}x{geometry[3]:.2f}" if geometry else ''
+    return f"{shape['kind']} '{shape['name']}'{where}" + (f' "{text}"' if text else '')
+
+
+def format_result(name: str, result: dict) -> list:
+    """Human-readable lines for one deck's diff."""
+    if 'missing' in result:
+        return [f"{name}: missing from {result['missing']}"]
+    lines = [f"{name}:"]
+    for part, op in result['parts'].items():
+        lines.append(f"  part {part} {op}")
+    for slide in result['slides']:
+        prefix = f"  slide {slide['slide']}:"
+        if slide.get('removed'):
+            lines.append(f"{prefix} removed")
+            continue
+        if slide.get('added'):
+            lines.append(f"{prefix} added ({slide['shapes']} shapes)")
+            continue
+        if 'layout' in slide:
+            lines.append(f"{prefix} layout {slide['layout'][0]} -> {slide['layout'][1]}")
+        for key in ('properties', 'notes'):
+            if key in slide:
+                lines.append(f"{prefix} {key} changed")
+        for change in slide.get('shapes', ()):
+            if change['op'] == 'added':
+                lines.append(f"{prefix} + {_format_shape(change['after'])}")
+            elif change['op'] == 'removed':
+                lines.append(f"{prefix} - {_format_shape(change['before'])}")
+            else:
+                lines.append(f"{prefix} ~ {_format_shape(change['after'])} [{', '.join(change['aspects'])}]")
+                lines.append(f"{' ' * len(prefix)}   was {_format_shape(change['before'])}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Structural diff of decks against golden outputs')
+    parser.add_argument('golden', help='Known-good .pptx, or directory of them')
+    parser.add_argument('current', help='.pptx (or directory) to check')
+    parser.add_argument('--json', default=None, metavar='FILE', help='Also write the full diff as JSON')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if Path(args.golden).is_dir():
+        results = diff_directories(args.golden, args.current)
+    else:
+        results = {Path(args.current).name: diff_decks(args.golden, args.current)}
+    seconds = time.perf_counter() - start
+
+    changed = {name: result for name, result in results.items() if not result['identical']}
+    for name, result in changed.items():
+        print('\n'.join(format_result(name, result)))
+    print(f"{len(results) - len(changed)}/{len(results)} decks identical ({seconds:.2f}s)")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding='utf-8')
+    if changed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Write slides into a .pptx as soon as they are built.
+
+SlideGenerator normally keeps every slide's XML tree in memory until save().
+SlideStreamWriter instead serialises each finished slide, and any part only it
+references (media, charts, notes), straight into a ZipStreamWriter and swaps
+the slide for a stub part that carries nothing but its partname. What stays in
+memory is the presentation's slide id list and relationships, so peak memory
+stays flat however many slides are written.
+
+The template parts (presentation.xml, masters, layouts, themes, ...) are
+written by close(), after the last slide, together with the content types.
+
+Media is de-duplicated by content: python-pptx only de-duplicates images that
+are still in the package, so a new part whose bytes were already written is
+pointed at the earlier copy, and new parts whose generated partname is already
+taken in the zip are renumbered.
+
+add_slide() is python-pptx's Slides.add_slide() minus its scans over every
+existing slide relationship and slide id, which make a long deck quadratic.
+"""
+
+import hashlib
+import re
+
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.package import Part, XmlPart
+from pptx.opc.packuri import PackURI
+from pptx.parts.slide import SlidePart
+
+from package_writer import ZipStreamWriter, compression_level, iter_package_members
+
+_TRAILING_NUMBER = re.compile(r'\d*(\.\w+)$')
+
+
+class SlideStreamWriter:
+    """Stream the slides of a presentation into a zip as they are finished."""
+
+    def __init__(self, prs, stream, compression: dict = None):
+        self.prs = prs
+        self.package = prs.part.package
+        self.compression = compression
+        self.slides = 0
+        self.xml_bytes = 0
+        self._zip = ZipStreamWriter(stream)
+        # Template parts are written last, by close()
+        self._static = {id(part) for part in self.package.iter_parts()}
+        self._names = {part.partname.membername for part in self.package.iter_parts()}
+        self._written = set()
+        # Partname-only stand-ins for flushed parts other than slides, for the content types
+        self._flushed = []
+        # (content type, sha1) -> partname of media already in the zip
+        self._media = {}
+        # Last p:sldId handled; slides already in the presentation count as template
+        sldIdLst = prs.part._element.get_or_add_sldIdLst()
+        self._last_sldId = sldIdLst[-1] if len(sldIdLst) else None
+        self._next_id = max([255] + [int(sldId.id) for sldId in sldIdLst]) + 1
+        self._closed = False
+
+    @property
+    def bytes_written(self) -> int:
+        return self._zip.bytes_written
+
+    def add_slide(self, slide_layout):
+        """Add a slide on slide_layout, like prs.slides.add_slide(), in constant time."""
+        prs_part = self.prs.part
+        slide_part = SlidePart.new(prs_part._next_slide_partname, self.package, slide_layout.part)
+        # A brand-new part cannot match an existing relationship, so skip relate_to()'s search
+        rId = prs_part.rels._add_relationship(RT.SLIDE, slide_part)
+        slide = slide_part.slide
+        slide.shapes.clone_layout_placeholders(slide_layout)
+        prs_part._element.get_or_add_sldIdLst()._add_sldId(id=self._next_id, rId=rId)
+        self._next_id += 1
+        return slide
+
+    def _write(self, name: str, content_type: str, blob: bytes):
+        self._zip.write(name, blob, compression_level(name, content_type, self.compression))
+        self._written.add(name)
+
+    def _new_parts(self, slide_part) -> list:
+        """The slide part plus every non-template part reachable from it, depth first."""
+        parts, seen, stack = [], set(), [slide_part]
+        while stack:
+            part = stack.pop()
+            if id(part) in seen or id(part) in self._static:
+                continue
+            seen.add(id(part))
+            parts.append(part)
+            stack.extend(rel.target_part for rel in part.rels.values() if not rel.is_external)
+        return parts
+
+    def _unique_partname(self, part):
+        """Renumber a new part whose partname is already used in the zip or the template."""
+        name = part.partname.membername
+        if name not in self._written and name not in self._names:
+            return
+        template = _TRAILING_NUMBER.sub(r'%d\1', str(part.partname))
+        n = 1
+        while (template % n).lstrip('/') in self._written or (template % n).lstrip('/') in self._names:
+            n += 1
+        part.partname = PackURI(template % n)
+
+    def _flush_slide(self, rel):
+        slide_part = rel.target_part
+        parts = self._new_parts(slide_part)
+
+        # Settle partnames first: the rels XML written below refers to them
+        to_write = []
+        for part in parts:
+            if not isinstance(part, XmlPart):
+                key = (part.content_type, hashlib.sha1(part.blob).hexdigest())
+                if key in self._media:
+                    part.partname = PackURI(self._media[key])
+                    continue
+                self._unique_partname(part)
+                self._media[key] = str(part.partname)
+            elif part is not slide_part:
+                self._unique_partname(part)
+            to_write.append(part)
+
+        for part in to_write:
+            blob = part.blob
+            if part is slide_part:
+                self.xml_bytes += len(blob)
+            self._write(part.partname.membername, part.content_type, blob)
+            if part is not slide_part:
+                self._flushed.append(Part(part.partname, part.content_type, self.package))
+            if part._rels:
+                self._write(part.partname.rels_uri.membername, CT.OPC_RELATIONSHIPS, part.rels.xml)
+
+        # Keep only the partname (for presentation.xml.rels and the content types);
+        # target_part is a cached property, so drop its copy of the real part too
+        rel._target = Part(slide_part.partname, slide_part.content_type, self.package)
+        vars(rel).pop('target_part', None)
+        self.slides += 1
+
+    def flush(self) -> int:
+        """Write every slide added since the last flush; returns how many were written."""
+        prs_part = self.prs.part
+        if self._last_sldId is None:
+            sldIdLst = prs_part._element.get_or_add_sldIdLst()
+            sldId = sldIdLst[0] if len(sldIdLst) else None
+        else:
+            sldId = self._last_sldId.getnext()
+        flushed = 0
+        while sldId is not None:
+            self._flush_slide(prs_part.rels[sldId.rId])
+            self._last_sldId = sldId
+            flushed += 1
+            sldId = sldId.getnext()
+        return flushed
+
+    def close(self) -> int:
+        """Flush remaining slides, write the template parts and the zip directory; returns bytes written."""
+        if self._closed:
+            return self.bytes_written
+        self.flush()
+        for name, content_type, blob_fn in iter_package_members(self.package, self._flushed):
+            if name not in self._written:
+                self._write(name, content_type, blob_fn())
+        self._zip.close()
+        self._closed = True
+        return self.bytes_written
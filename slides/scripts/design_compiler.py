@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Compile markdown design files into slides for SlideGenerator.generate_design().
+
+A design is tokenised in one pass over its lines into an AST of slides, each
+holding blocks that map onto the generator's primitives:
+
+    # Deck title            title slide (add_title_slide); its paragraphs are
+    Subtitle text           the subtitle, and a 'Date: ...' line the date
+    Date: 2026.01.16
+
+    ## Slide title          content slide (add_content_slide)
+    ### Heading            'heading': bold text box (add_text_box)
+    Paragraph text          'text': text box; each source line is a line
+    - **Title** detail      'boxes': consecutive list items (-, *, + or 1.)
+    - Title: detail           drawn as a grid of add_multiline_box() boxes
+    > Key message           'callout': full-width add_rounded_box() banner
+
+Blank lines end a block. Fenced code is kept as a text block, verbatim;
+HTML comments and thematic breaks (---) are skipped, and so is anything
+before the first heading.
+
+Compiled designs are cached on disk (CACHE_DIR/designs), keyed by the
+SHA-256 of the file's bytes and DESIGN_VERSION, so an unchanged design is
+loaded without being parsed again. Designs and their slides are NamedTuples
+and pickle cheaply to worker processes (parallel_build.py).
+
+Usage:
+    uv run python slides/scripts/design_compiler.py <design.md> [--no-cache]
+
+Example:
+    uv run python slides/scripts/design_compiler.py slides/design/2026-01-16_warehouse-system-proposal.md
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from template_cache import CACHE_DIR
+
+# Bump when the AST or the way markdown maps onto it changes
+DESIGN_VERSION = 2
+
+_LIST_MARKERS = ('- ', '* ', '+ ')
+_BREAKS = {'---', '***', '___'}
+
+
+class Block(NamedTuple):
+    kind: str  # 'heading', 'text', 'boxes', 'callout' or 'date'
+    items: tuple  # text per line; for 'boxes', (title, detail) per item
+
+
+class Slide(NamedTuple):
+    kind: str  # 'title' or 'content'
+    title: str
+    blocks: tuple
+    line: int  # source line of the slide's heading
+
+    @property
+    def subtitle(self) -> str:
+        return '\n'.join(line for block in self.blocks if block.kind == 'text' for line in block.items)
+
+    @property
+    def date(self) -> str:
+        return next((block.items[0] for block in self.blocks if block.kind == 'date'), None)
+
+
+class Design(NamedTuple):
+    slides: tuple
+    digest: str  # SHA-256 of the source
+
+
+def _strip_emphasis(text: str) -> str:
+    return text.replace('**', '').replace('__', '').strip()
+
+
+def _heading_level(stripped: str) -> int:
+    """1 for '# x', 2 for '## x', ...; 0 if the line is not an ATX heading ('#1 priority' is not)."""
+    level = len(stripped) - len(stripped.lstrip('#'))
+    return level if level and stripped[level:level + 1] in (' ', '\t') else 0
+
+
+def _list_item(stripped: str):
+    """The text of a list item line ('- x', '* x', '+ x', '1. x'), or None."""
+    if stripped.startswith(_LIST_MARKERS):
+        return stripped[2:].strip()
+    digits = len(stripped) - len(stripped.lstrip('0123456789'))
+    if digits and stripped[digits:digits + 2] in ('. ', ') '):
+        return stripped[digits + 2:].strip()
+    return None
+
+
+def _box(item: str) -> tuple:
+    """(title, detail) of a list item: '**Title** detail', 'Title: detail' or just 'Title'."""
+    if item.startswith('**'):
+        end = item.find('**', 2)
+        if end > 2:
+            return item[2:end].strip(), _strip_emphasis(item[end + 2:].lstrip(' :：-—'))
+    for separator in ('：', ': '):
+        title, found, detail = item.partition(separator)
+        if found:
+            return _strip_emphasis(title), _strip_emphasis(detail)
+    return _strip_emphasis(item), ''
+
+
+def compile_design(text: str, digest: str = '') -> Design:
+    """Tokenise a markdown design into slides and blocks in a single pass over its lines."""
+    slides = []
+    # The slide being read: [kind, title, blocks, line]; and the open block: [kind, items]
+    slide = block = None
+    in_fence = in_comment = False
+
+    def close():
+        nonlocal block
+        if block is not None and slide is not None:
+            slide[2].append(Block(block[0], tuple(block[1])))
+        block = None
+
+    def add(kind, item):
+        nonlocal block
+        if block is None or block[0] != kind:
+            close()
+            block = [kind, []]
+        block[1].append(item)
+
+    for number, line in enumerate(text.splitlines(), 1):
+        stripped = line.strip()
+        if in_fence:
+            if stripped.startswith('```'):
+                in_fence = False
+                close()
+            else:
+                add('text', line.rstrip())
+            continue
+        if in_comment:
+            in_comment = '-->' not in stripped
+            continue
+        if not stripped:
+            close()
+            continue
+
+        level = _heading_level(stripped)
+        if level:
+            title = _strip_emphasis(stripped[level:])
+            close()
+            if level <= 2:
+                if slide is not None:
+                    slides.append(Slide(slide[0], slide[1], tuple(slide[2]), slide[3]))
+                slide = ['title' if level == 1 else 'content', title, [], number]
+            else:
+                add('heading', title)
+                close()
+        elif stripped.startswith('```'):
+            close()
+            in_fence = True
+        elif stripped.startswith('<!--'):
+            in_comment = '-->' not in stripped
+        elif stripped in _BREAKS:
+            close()
+        elif stripped.startswith('>'):
+            add('callout', _strip_emphasis(stripped.lstrip('> ')))
+        elif (item := _list_item(stripped)) is not None:
+            add('boxes', _box(item))
+        elif slide is not None and slide[0] == 'title' and stripped[:5].lower() == 'date:':
+            close()
+            add('date', stripped[5:].strip())
+            close()
+        else:
+            add('text', _strip_emphasis(stripped))
+
+    close()
+    if slide is not None:
+        slides.append(Slide(slide[0], slide[1], tuple(slide[2]), slide[3]))
+    return Design(tuple(slides), digest)
+
+
+def _cache_path(digest: str, cache_dir=None) -> Path:
+    return Path(cache_dir or CACHE_DIR / 'designs') / f'{digest}-v{DESIGN_VERSION}.pickle'
+
+
+def load_design(path, cache_dir=None, use_cache: bool = True) -> Design:
+    """The compiled design of a markdown file, from the cache when its bytes are unchanged."""
+    source = Path(path).read_bytes()
+    digest = hashlib.sha256(source).hexdigest()
+    cache_path = _cache_path(digest, cache_dir)
+    if use_cache:
+        try:
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            # Missing, truncated, or written by an older layout of these classes: compile afresh
+            pass
+
+    design = compile_design(source.decode('utf-8-sig'), digest)
+    if not design.slides:
+        raise ValueError(f"{path}: no slides (start one with '# Title' or '## Title')")
+    if use_cache:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(design, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    return design
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile a markdown design file and show its slides')
+    parser.add_argument('design_file', help='Markdown design file')
+    parser.add_argument('--no-cache', action='store_true', help='Parse the file even if it is cached')
+    args = parser.parse_args()
+
+    # Through the module, so cached designs pickle as design_compiler.Design rather than __main__.Design,
+    # which generate_pptx.py could not load
+    import design_compiler
+
+    start = time.perf_counter()
+    design = design_compiler.load_design(args.design_file, use_cache=not args.no_cache)
+    seconds = time.perf_counter() - start
+    for number, slide in enumerate(design.slides, 1):
+        blocks = ', '.join(f'{block.kind}({len(block.items)})' for block in slide.blocks)
+        print(f"{number:4d}  line {slide.line:5d}  {slide.kind:7s}  {slide.title}  [{blocks}]")
+    print(f"{len(design.slides)} slides in {seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
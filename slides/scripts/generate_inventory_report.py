@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Generate an inventory report deck: one slide per SKU from a CSV export.
+
+Reports can run to thousands of slides, so they are streamed by default:
+each slide is written to the output as soon as it is built and memory stays
+flat however long the CSV is. --in-memory builds the whole deck first and
+saves it at the end, like the hand-written decks; --workers N does that with
+the slides built across N processes (parallel_build.py).
+
+CSV columns: sku, name, location, quantity, last_moved (YYYY-MM-DD), days_idle
+
+Usage:
+    uv run python slides/scripts/generate_inventory_report.py --csv FILE [--output FILE]
+        [--in-memory] [--workers N] [--metrics FILE]
+    uv run python slides/scripts/generate_inventory_report.py --sample 5000 --output /tmp/report.pptx
+    uv run python slides/scripts/generate_inventory_report.py --sample 5000 --workers 8 --output /tmp/report.pptx
+
+Example:
+    uv run python slides/scripts/generate_inventory_report.py --csv data/inventory.csv
+"""
+
+import argparse
+import csv
+import random
+from datetime import date, timedelta
+
+from pptx.enum.text import PP_ALIGN
+from generate_pptx import SlideGenerator
+from layout import Cell, Grid, Place, Stack
+
+# Items not moved for this many days are flagged as stagnant (same rule as the proposal deck)
+STAGNANT_DAYS = 90
+
+
+def read_records(csv_path: str):
+    """Yield the rows of an inventory CSV one at a time."""
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        yield from csv.DictReader(f)
+
+
+def sample_records(count: int, seed: int = 0):
+    """Yield `count` synthetic inventory rows (for trying out and benchmarking the report)."""
+    rng = random.Random(seed)
+    today = date(2026, 1, 16)
+    for i in range(count):
+        days_idle = rng.choice((0, 3, 12, 45, 95, 180, 400))
+        yield {
+            'sku': f"SKU-{i + 1:06d}",
+            'name': f"部品 {rng.choice('ABCDEFGH')}-{rng.randint(100, 999)}",
+            'location': f"{rng.choice('ABCD')}-{rng.randint(1, 40):02d}-{rng.randint(1, 6)}",
+            'quantity': str(rng.randint(0, 2000)),
+            'last_moved': (today - timedelta(days=days_idle)).isoformat(),
+            'days_idle': str(days_idle),
+        }
+
+
+class InventoryReportGenerator(SlideGenerator):
+    """One status slide per inventory record."""
+
+    def _item_layout(self):
+        """Four KPI cards in a row above a full-width status banner."""
+        card = Stack(
+            Cell(3.6, 2.2, 'card'),
+            Place(Cell(3.2, 0.5, 'card_label'), 0.2, 0.25),
+            Place(Cell(3.2, 1.0, 'card_value'), 0.2, 0.9),
+        )
+        cards = Grid(card, columns=4, gap_x=0.4)
+        return Stack(cards, Place(Cell(cards.width, 1.4, 'status'), 0, 2.8))
+
+    def record_slide(self, record: dict):
+        """Slide for one CSV row."""
+        slide = self.add_content_slide(f"{record['sku']}  {record['name']}")
+        c = self.colors
+        layout = self.layout(self._item_layout(), self.MARGIN_TOP + 0.3)
+
+        kpis = [
+            ("在庫数", f"{int(record['quantity']):,}"),
+            ("ロケーション", record['location']),
+            ("最終入出荷", record['last_moved']),
+            ("滞留日数", f"{record['days_idle']}日"),
+        ]
+        for (label, value), card, label_box, value_box in zip(
+                kpis, layout['card'], layout['card_label'], layout['card_value']):
+            self.add_rounded_box(slide, *card, c.light_gray, "", 14, c.dark_navy)
+            self.add_text_box(slide, *label_box, label, 16, c.dark_gray_blue, True, PP_ALIGN.CENTER)
+            self.add_text_box(slide, *value_box, value, 32, c.dark_navy, True, PP_ALIGN.CENTER)
+
+        days_idle = int(record['days_idle'])
+        if days_idle >= STAGNANT_DAYS:
+            status, color = f"⚠ 滞留在庫：{days_idle}日間動きなし（{STAGNANT_DAYS}日超）", c.burgundy
+        else:
+            status, color = "稼働中の在庫", c.dark_navy
+        self.add_rounded_box(slide, *layout.box('status'), color, status, 24, c.white)
+        return slide
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate an inventory report deck from a CSV')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--csv', default=None, help='Inventory CSV (one slide per row)')
+    source.add_argument('--sample', type=int, default=None, metavar='N',
+                        help='Use N synthetic rows instead of a CSV')
+    parser.add_argument('--output', '-o', default='./slides/output/inventory-report.pptx', help='Output path')
+    parser.add_argument('--in-memory', action='store_true',
+                        help='Build the whole deck before saving instead of streaming it')
+    parser.add_argument('--workers', '-j', type=int, default=None, metavar='N',
+                        help='Build the deck in memory with its slides built across N processes')
+    parser.add_argument('--metrics', default=None, metavar='FILE',
+                        help='Write per-phase and per-slide metrics as JSON lines')
+    args = parser.parse_args()
+
+    template_path = './slides/templates/genda.pptx'
+    records = read_records(args.csv) if args.csv else sample_records(args.sample)
+
+    gen = InventoryReportGenerator(template_path)
+    if args.in_memory or args.workers:
+        slides = gen.generate_records(records, args.workers)
+        gen.save(args.output)
+    else:
+        with open(args.output, 'wb') as f:
+            gen.generate_stream(records, f)
+        slides = sum(event['slides'] for event in gen.metrics.events if event['event'] == 'slide')
+
+    print(f"Saved to: {args.output}")
+    print(f"Total slides: {slides}")
+    for name, seconds in gen.metrics.summary()['phases'].items():
+        print(f"  {name}: {seconds:.2f}s")
+
+    if args.metrics:
+        with open(args.metrics, 'w', encoding='utf-8') as f:
+            gen.metrics.write_jsonl(f)
+        print(f"Metrics: {args.metrics}")
+
+
+if __name__ == "__main__":
+    main()
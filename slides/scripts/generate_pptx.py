@@ -4,55 +4,71 @@ Generate PowerPoint slides from markdown design files.
 
 This script reads a markdown design file and generates a PowerPoint presentation
 using the specified template. Colors are extracted from the template's theme.
+The design is compiled by design_compiler.py (which documents the markdown it
+understands) and drawn with SlideGenerator's box primitives; decks that need
+hand-made layouts subclass SlideGenerator and list their SLIDE_BUILDERS.
 
 Usage:
-    uv run python slides/scripts/generate_pptx.py <design_file> [--template <template_name>]
+    uv run python slides/scripts/generate_pptx.py <design_file> [--template <template_name>] [--workers N]
+        [--check-text] [--lint]
 
 Example:
     uv run python slides/scripts/generate_pptx.py slides/design/2026-01-16_warehouse-system-proposal.md
 """
 
 import argparse
-import zipfile
-import xml.etree.ElementTree as ET
+import io
+import os
 from pathlib import Path
 
-from pptx import Presentation
 from pptx.util import Inches, Pt
+from pptx.chart.data import CategoryChartData
 from pptx.dml.color import RGBColor
-from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
+from pptx.enum.chart import XL_CHART_TYPE, XL_LEGEND_POSITION, XL_MARKER_STYLE
+from pptx.enum.text import MSO_ANCHOR, PP_ALIGN
 from pptx.enum.shapes import MSO_SHAPE
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.parts.image import ImagePart
+from pptx.shapes.picture import Picture
+
+from charts import downsample
+from deck_stream import SlideStreamWriter
+from design_compiler import load_design
+from image_pipeline import ImagePipeline
+from instrumentation import MemoryBudgetExceeded, Recorder
+from layout import solve
+from layout_lint import lint_slide
+from package_slim import slim_presentation
+from package_writer import write_package
+from parallel_build import build_parallel
+from shape_merge import merge_presentation
+from shape_fragments import (
+    stamp_card, stamp_multiline_box, stamp_rounded_box, stamp_table, stamp_text_box,
+    style_card, style_multiline_box, style_rounded_box, style_table_cell, style_text_box,
+)
+
+from slide_cache import SlideCache, builder_fingerprint, restore_slide
+from slide_svg import export_svg
+from template_cache import PH_SUBTITLE, PH_TITLE, load_snapshot
+from text_metrics import (
+    INSET_X, INSET_Y, corner_inset, fit_font_sizes, overflow, overflow_record, text_area, text_height,
+)
 
 
 class TemplateColors:
     """Extract and manage colors from PowerPoint template theme."""
 
-    def __init__(self, template_path: str):
-        self.colors = self._extract_theme_colors(template_path)
+    def __init__(self, template_path: str, layout_index: int = None):
+        self.colors = self._extract_theme_colors(template_path, layout_index)
         self._setup_semantic_colors()
 
-    def _extract_theme_colors(self, template_path: str) -> dict:
-        """Extract colors from template's theme XML."""
-        colors = {}
-        with zipfile.ZipFile(template_path, 'r') as z:
-            for tf in z.namelist():
-                if 'theme1.xml' in tf:
-                    content = z.read(tf)
-                    root = ET.fromstring(content)
-                    for elem in root.iter():
-                        if 'clrScheme' in elem.tag:
-                            for child in elem:
-                                tag = child.tag.split('}')[-1]
-                                for color_elem in child:
-                                    color_tag = color_elem.tag.split('}')[-1]
-                                    if color_tag == 'srgbClr':
-                                        val = color_elem.get('val')
-                                        colors[tag] = RGBColor.from_string(val)
-                                    elif color_tag == 'sysClr':
-                                        val = color_elem.get('lastClr')
-                                        if val:
-                                            colors[tag] = RGBColor.from_string(val)
-        return colors
+    def _extract_theme_colors(self, template_path: str, layout_index: int = None) -> dict:
+        """Extract colors from the first master's theme, or the theme layout_index uses (cached by template hash)."""
+        snapshot = load_snapshot(template_path)
+        palette = snapshot.colors if layout_index is None else snapshot.themes.layout(layout_index)
+        return {tag: RGBColor.from_string(val) for tag, val in palette.items()}
 
     def _setup_semantic_colors(self):
         """Map theme colors to semantic names."""
@@ -82,10 +98,74 @@ class SlideGenerator:
     MARGIN_TOP = 2.8
     MARGIN_BOTTOM = 1.0
 
+    # Areas builders must keep clear, as (name, left, top, width, height) inches (see
+    # reserved_areas() and layout_lint.py). None reserves the right margin for the copyright.
+    RESERVED_AREAS = None
+
+    # Slide builders in deck order: (method name, label). Subclasses fill this in.
+    SLIDE_BUILDERS = []
+
+    # Stamp primitives from precompiled XML fragments (identical output, far fewer
+    # python-pptx proxy calls). Set False to build them through the proxies.
+    USE_FRAGMENTS = True
+
+    # Shrink the font size of box text predicted to overflow its box (text_metrics.py).
+    # TEXT_FONT is a .ttf/.otf path to measure with; None uses built-in CJK-aware widths.
+    AUTO_SHRINK = False
+    TEXT_FONT = None
+    MIN_FONT_SIZE = 8
+
+    # Pictures from add_image() are downscaled to this many pixels per inch of their box
+    IMAGE_DPI = 150
+
+    # Longer chart series are downsampled (LTTB, charts.py) to this many categories
+    CHART_MAX_POINTS = 1000
+
+    # Extension -> content type of the images image_pipeline produces
+    IMAGE_CONTENT_TYPES = {'jpg': CT.JPEG, 'png': CT.PNG, 'gif': CT.GIF, 'bmp': CT.BMP, 'tiff': CT.TIFF}
+
+    # Slides compiled from a markdown design (generate_design()): font sizes, the gap between
+    # blocks, boxes per row, minimum box heights, text padding in boxes, and the TemplateColors
+    # names list items cycle through and callouts use
+    DESIGN_TEXT_SIZE = 20
+    DESIGN_HEADING_SIZE = 24
+    DESIGN_BOX_TITLE_SIZE = 24
+    DESIGN_BOX_TEXT_SIZE = 16
+    DESIGN_CALLOUT_SIZE = 24
+    DESIGN_GAP = 0.3
+    DESIGN_COLUMNS = 3
+    DESIGN_BOX_HEIGHT = 1.6
+    DESIGN_CALLOUT_HEIGHT = 1.0
+    DESIGN_PADDING = 0.2
+    DESIGN_FILLS = ('dark_navy', 'dark_gray_blue', 'mauve', 'sage_green')
+    DESIGN_CALLOUT_FILL = 'burgundy'
+
+    # Per-process attributes a parallel build worker sets up itself rather than copying (see worker_state())
+    WORKER_LOCAL = ('template', 'colors', 'layout_colors', 'metrics', 'prs', 'stream_writer', 'text_boxes',
+                    'images', 'image_parts', 'pending_images')
+
     def __init__(self, template_path: str):
         self.template_path = template_path
-        self.colors = TemplateColors(template_path)
+        self.metrics = Recorder()
+        with self.metrics.phase('template_snapshot'):
+            self.template = load_snapshot(template_path)
+            self.colors = TemplateColors(template_path)
+        # layout index -> TemplateColors of the theme that layout uses
+        self.layout_colors = {}
         self.prs = None
+        # SlideStreamWriter while generate_stream() runs
+        self.stream_writer = None
+        # (slide part, left, top, width, height, rounded, paragraphs) of every text box drawn
+        self.text_boxes = []
+        self.images = ImagePipeline(self.IMAGE_DPI)
+        # Pipeline key -> ImagePart in this presentation, and pictures awaiting their pixels
+        self.image_parts = {}
+        self.pending_images = []
+        # Named text slots (see slot()): values to use, and the defaults builders declared
+        self.slot_values = {}
+        self.slot_defaults = {}
+        # True while compiling a skeleton (skeleton.py): slots are drawn as {{name}} markers
+        self.skeleton = False
 
         # Calculate content area
         self.content_width = self.SLIDE_WIDTH - self.MARGIN_LEFT - self.MARGIN_RIGHT
@@ -94,8 +174,298 @@ class SlideGenerator:
         self.content_right = self.SLIDE_WIDTH - self.MARGIN_RIGHT
 
     def load_template(self):
-        """Load the PowerPoint template."""
-        self.prs = Presentation(self.template_path)
+        """Load the PowerPoint template (a copy of the cached, pre-parsed package)."""
+        with self.metrics.phase('template_load'):
+            self.prs = self.template.new_presentation()
+        self.text_boxes = []
+        self.image_parts = {}
+        self.pending_images = []
+
+    def generate_all(self, slides=None, incremental: bool = False, workers: int = None):
+        """Generate the slides listed in SLIDE_BUILDERS.
+
+        Args:
+            slides: 1-based slide numbers to render (default: all of them).
+            incremental: reuse cached slide XML for builders whose inputs are unchanged.
+            workers: build the slides in this many processes (parallel_build.py);
+                None or 1 builds them here, one after another.
+
+        Per-phase and per-slide timings are recorded on self.metrics. With a
+        memory budget (self.metrics.track_memory()), MemoryBudgetExceeded
+        aborts the deck and its presentation is released.
+        """
+        try:
+            self._generate_all(slides, incremental, workers)
+        except MemoryBudgetExceeded:
+            self._release()
+            raise
+
+    def _release(self):
+        """Let go of a half-built deck now rather than whenever the caller drops us."""
+        self.prs = None
+        self.text_boxes = []
+        self.image_parts = {}
+        self.pending_images = []
+
+    def _generate_all(self, slides, incremental: bool, workers: int = None):
+        """generate_all() itself: load, delete the sample slides, build."""
+        self.load_template()
+        with self.metrics.phase('delete'):
+            self.delete_all_slides()
+        print("Deleted existing slides from template")
+
+        cache = SlideCache() if incremental else None
+        if workers and workers > 1:
+            jobs = [(number, method_name, (), {'label': label})
+                    for number, (method_name, label) in enumerate(self.SLIDE_BUILDERS, 1)
+                    if not slides or number in slides]
+            with self.metrics.phase('build', workers=workers):
+                for (number, _method_name, _args, fields), event in build_parallel(self, jobs, workers, cache):
+                    print(f"Created slide {number}: {fields['label']} ({event['wall_s'] * 1000:.1f} ms, "
+                          f"{event['shapes']} shapes)")
+            if cache is not None:
+                print(f"Slide cache: {cache.hits} reused, {cache.misses} rebuilt")
+            return
+
+        with self.metrics.phase('build'):
+            for number, (method_name, label) in enumerate(self.SLIDE_BUILDERS, 1):
+                if slides and number not in slides:
+                    continue
+                hits = cache.hits if cache is not None else 0
+                with self.metrics.span('slide', method_name, number=number, label=label) as event:
+                    slide = self.build_slide(method_name, cache)
+                event.update(shapes=len(slide.shapes), xml_bytes=len(slide.part.blob))
+                if cache is not None:
+                    event['cached'] = cache.hits > hits
+                print(f"Created slide {number}: {label} ({event['wall_s'] * 1000:.1f} ms, "
+                      f"{event['shapes']} shapes)")
+
+        self._finish_images()
+
+        if cache is not None:
+            print(f"Slide cache: {cache.hits} reused, {cache.misses} rebuilt")
+
+    def _finish_images(self):
+        """Resolve the pictures a build placed (as an 'images' phase), then shut the image pool down."""
+        if self.pending_images:
+            with self.metrics.phase('images') as event:
+                event['pictures'] = self.resolve_images()
+            event.update(self.images.stats)
+        self.images.close()
+
+    def build_slide(self, method_name: str, cache=None):
+        """Run one slide builder, restoring its cached XML if its inputs are unchanged."""
+        if cache is None:
+            return getattr(self, method_name)()
+
+        fingerprint = builder_fingerprint(self, method_name)
+        entry = cache.get(fingerprint)
+        if entry is not None:
+            layout_index, slide_xml, boxes = entry
+            slide = restore_slide(self.prs, layout_index, slide_xml)
+            # So check_text() measures restored slides as it would freshly built ones
+            self.text_boxes.extend((slide.part, *box) for box in boxes)
+            return slide
+
+        first_box = len(self.text_boxes)
+        slide = getattr(self, method_name)()
+        # The cache stores the slide's parts as they are now, so they need their final pixels
+        self.resolve_images()
+        boxes = [box[1:] for box in self.text_boxes[first_box:] if box[0] is slide.part]
+        cache.put(fingerprint, self.prs, slide, boxes)
+        return slide
+
+    def record_slide(self, record):
+        """Add the slide(s) for one record in generate_stream() (override for data-driven decks)."""
+        raise NotImplementedError(f"{type(self).__name__} does not build slides from records")
+
+    def generate_records(self, records, workers: int = None) -> int:
+        """Build slides from records with record_slide() into self.prs; returns the slides built.
+
+        workers: build them in this many processes (parallel_build.py). The
+        whole deck is kept until save(); generate_stream() keeps memory flat.
+        """
+        self.load_template()
+        with self.metrics.phase('delete'):
+            self.delete_all_slides()
+
+        if workers and workers > 1:
+            jobs = [(number, 'record_slide', (record,), {}) for number, record in enumerate(records, 1)]
+            with self.metrics.phase('build', workers=workers):
+                for _job, _event in build_parallel(self, jobs, workers):
+                    pass
+        else:
+            with self.metrics.phase('build'):
+                for number, record in enumerate(records, 1):
+                    with self.metrics.span('slide', 'record_slide', number=number):
+                        self.record_slide(record)
+            self._finish_images()
+        return len(self.prs.slides)
+
+    def generate_stream(self, records, stream, compression: dict = None) -> int:
+        """Build slides from records with record_slide(), writing each to stream as soon as it is done.
+
+        Unlike generate_all() + save(), finished slides are not kept in memory, so
+        peak memory stays flat however many records there are. records can be any
+        iterable, e.g. a generator reading a CSV. Returns the bytes written.
+        """
+        self.load_template()
+        with self.metrics.phase('delete'):
+            self.delete_all_slides()
+
+        writer = self.stream_writer = SlideStreamWriter(self.prs, stream, compression)
+        try:
+            with self.metrics.phase('build'):
+                for number, record in enumerate(records, 1):
+                    xml_bytes = writer.xml_bytes
+                    with self.metrics.span('slide', 'record_slide', number=number) as event:
+                        self.record_slide(record)
+                        self.resolve_images()
+                        event['slides'] = writer.flush()
+                    event['xml_bytes'] = writer.xml_bytes - xml_bytes
+                    # Flushed slides are gone; do not keep their parts alive for check_text()
+                    self.text_boxes.clear()
+            self.images.close()
+
+            with self.metrics.phase('save', stream=True) as event:
+                event['bytes'] = writer.close()
+        finally:
+            self.stream_writer = None
+        return event['bytes']
+
+    def slot(self, name: str, default: str) -> str:
+        """Text for a named slot: its value from slot_values, else default.
+
+        While compiling a skeleton the slot is drawn as a {{name}} marker instead,
+        and skeleton.py substitutes each variant's value into the saved XML.
+        """
+        self.slot_defaults[name] = default
+        if self.skeleton:
+            return f'{{{{{name}}}}}'
+        return self.slot_values.get(name, default)
+
+    def worker_state(self) -> dict:
+        """Instance attributes parallel_build.py copies onto each worker's generator.
+
+        Everything but the per-process objects named in WORKER_LOCAL; override
+        if a subclass holds something that cannot be pickled.
+        """
+        return {name: value for name, value in vars(self).items() if name not in self.WORKER_LOCAL}
+
+    def slide_inputs(self, method_name: str):
+        """Extra data a builder depends on beyond its source (override for data-driven decks)."""
+        return None
+
+    def generate_design(self, design_path: str, workers: int = None):
+        """Generate the deck described by a markdown design file.
+
+        Subclasses with hard-coded content (SLIDE_BUILDERS) run generate_all()
+        and ignore the file. Otherwise the design is compiled (design_compiler.py,
+        cached by content) and each of its slides drawn with add_design_slide(),
+        in `workers` processes if more than one.
+        """
+        if self.SLIDE_BUILDERS:
+            self.generate_all(workers=workers)
+            return
+        with self.metrics.phase('design') as event:
+            design = load_design(design_path)
+        event['slides'] = len(design.slides)
+        try:
+            self._generate_design(design, workers)
+        except MemoryBudgetExceeded:
+            self._release()
+            raise
+
+    def _generate_design(self, design, workers: int = None):
+        """generate_design() for a compiled design: load, delete the sample slides, build."""
+        self.load_template()
+        with self.metrics.phase('delete'):
+            self.delete_all_slides()
+        print("Deleted existing slides from template")
+
+        jobs = [(number, 'add_design_slide', (page,), {'label': page.title})
+                for number, page in enumerate(design.slides, 1)]
+        if workers and workers > 1:
+            with self.metrics.phase('build', workers=workers):
+                for (number, _method_name, _args, fields), event in build_parallel(self, jobs, workers):
+                    print(f"Created slide {number}: {fields['label']} ({event['wall_s'] * 1000:.1f} ms, "
+                          f"{event['shapes']} shapes)")
+            return
+
+        with self.metrics.phase('build'):
+            for number, method_name, (page,), fields in jobs:
+                with self.metrics.span('slide', method_name, number=number, **fields) as event:
+                    slides = self.add_design_slide(page)
+                event.update(slides=len(slides), shapes=sum(len(slide.shapes) for slide in slides),
+                             xml_bytes=sum(len(slide.part.blob) for slide in slides))
+                print(f"Created slide {number}: {fields['label']} ({event['wall_s'] * 1000:.1f} ms, "
+                      f"{event['shapes']} shapes)")
+
+    def add_design_slide(self, page) -> list:
+        """Draw one compiled design slide (design_compiler.Slide); returns the slides added.
+
+        Blocks are stacked down the content area. A block (or row of boxes) that
+        would pass its bottom goes on a continuation slide, titled as add_table() does.
+        """
+        if page.kind == 'title':
+            if page.date:
+                return [self.add_title_slide(page.title, page.subtitle, page.date)]
+            return [self.add_title_slide(page.title, page.subtitle)]
+
+        slides = [self.add_content_slide(page.title)]
+        left, width = self.content_left, self.content_width
+        bottom = self.SLIDE_HEIGHT - self.MARGIN_BOTTOM
+        top = self.MARGIN_TOP
+
+        def place(height: float) -> tuple:
+            """(slide, top) for the next block, on a continuation slide if it does not fit."""
+            nonlocal top
+            if top + height > bottom and top > self.MARGIN_TOP:
+                slides.append(self.add_content_slide(f"{page.title}（続き）"))
+                top = self.MARGIN_TOP
+            placed = top
+            top += height + self.DESIGN_GAP
+            return slides[-1], placed
+
+        for block in page.blocks:
+            if block.kind == 'boxes':
+                self._add_design_boxes(block.items, place)
+                continue
+            text = '\n'.join(block.items)
+            if block.kind == 'callout':
+                inner_w, _inner_h = text_area(width, self.DESIGN_CALLOUT_HEIGHT, rounded=True)
+                needed = text_height([(text, self.DESIGN_CALLOUT_SIZE, True)], inner_w, self.TEXT_FONT)
+                height = max(self.DESIGN_CALLOUT_HEIGHT, needed + 2 * self.DESIGN_PADDING)
+                slide, y = place(height)
+                fill = getattr(self.colors, self.DESIGN_CALLOUT_FILL)
+                self.add_rounded_box(slide, left, y, width, height, fill, text, self.DESIGN_CALLOUT_SIZE)
+            else:
+                heading = block.kind == 'heading'
+                size = self.DESIGN_HEADING_SIZE if heading else self.DESIGN_TEXT_SIZE
+                height = text_height([(text, size, heading)], width - 2 * INSET_X, self.TEXT_FONT) + 2 * INSET_Y
+                slide, y = place(height)
+                self.add_text_box(slide, left, y, width, height, text, size, bold=heading)
+        return slides
+
+    def _add_design_boxes(self, items, place):
+        """Lay (title, detail) items out as rows of DESIGN_COLUMNS multiline boxes, placed by place()."""
+        gap = self.DESIGN_GAP
+        columns = min(self.DESIGN_COLUMNS, len(items))
+        width = (self.content_width - gap * (columns - 1)) / columns
+        inner_w, _inner_h = text_area(width, self.DESIGN_BOX_HEIGHT, rounded=True)
+        fills = [getattr(self.colors, name) for name in self.DESIGN_FILLS]
+        for start in range(0, len(items), columns):
+            row = items[start:start + columns]
+            height = max([self.DESIGN_BOX_HEIGHT] + [
+                text_height([(title, self.DESIGN_BOX_TITLE_SIZE, True), (detail, self.DESIGN_BOX_TEXT_SIZE, False)],
+                            inner_w, self.TEXT_FONT) + 2 * self.DESIGN_PADDING
+                for title, detail in row
+            ])
+            slide, top = place(height)
+            for i, (title, detail) in enumerate(row):
+                self.add_multiline_box(slide, self.content_left + i * (width + gap), top, width, height,
+                                       fills[(start + i) % len(fills)], title, detail,
+                                       title_size=self.DESIGN_BOX_TITLE_SIZE, subtitle_size=self.DESIGN_BOX_TEXT_SIZE)
 
     def delete_all_slides(self):
         """Delete all existing slides from the presentation."""
@@ -109,89 +479,138 @@ class SlideGenerator:
         """Calculate left position to center content horizontally."""
         return self.content_left + (self.content_width - total_width) / 2
 
+    def layout(self, spec, top: float, left: float = None):
+        """Solve a layout tree (see layout.py) at top; left defaults to centring it in the content area."""
+        if left is None:
+            left = self.center_left(spec.width)
+        return solve(spec, left, top)
+
+    def new_slide(self, layout):
+        """Add a blank slide on layout (in constant time while streaming)."""
+        if self.stream_writer is not None:
+            return self.stream_writer.add_slide(layout)
+        return self.prs.slides.add_slide(layout)
+
+    def colors_for_layout(self, layout_index: int) -> TemplateColors:
+        """Colors of the theme that slide layout `layout_index` actually uses."""
+        colors = self.layout_colors.get(layout_index)
+        if colors is None:
+            colors = self.layout_colors[layout_index] = TemplateColors(self.template_path, layout_index)
+        return colors
+
     def add_title_slide(self, title: str, subtitle: str, date: str = "2026.01.XX"):
         """Add a title slide using Layout 0."""
         layout = self.prs.slide_layouts[0]
-        slide = self.prs.slides.add_slide(layout)
-
-        for shape in slide.shapes:
-            if shape.has_text_frame:
-                if hasattr(shape, 'placeholder_format') and shape.placeholder_format.type is not None:
-                    ph_type = shape.placeholder_format.type.real
-                    if ph_type == 1:  # TITLE
-                        shape.text_frame.paragraphs[0].text = title
-                        for para in shape.text_frame.paragraphs:
-                            para.font.color.rgb = self.colors.gold
-                            para.font.size = Pt(60)
-                            para.font.bold = True
-                    elif ph_type == 4:  # SUBTITLE
-                        if shape.top.inches > 2.5:
-                            shape.text_frame.paragraphs[0].text = subtitle
-                            for para in shape.text_frame.paragraphs:
-                                para.font.color.rgb = self.colors.dark_gray_blue
-                                para.font.size = Pt(24)
-                        else:
-                            shape.text_frame.paragraphs[0].text = ""
+        slide = self.new_slide(layout)
+        c = self.colors_for_layout(0)
+
+        for idx, ph_type, top in self.template.placeholders[0]:
+            shape = slide.placeholders[idx]
+            if ph_type == PH_TITLE:
+                shape.text_frame.paragraphs[0].text = title
+                for para in shape.text_frame.paragraphs:
+                    para.font.color.rgb = c.gold
+                    para.font.size = Pt(60)
+                    para.font.bold = True
+            elif ph_type == PH_SUBTITLE:
+                if top is not None and top > Inches(2.5):
+                    shape.text_frame.paragraphs[0].text = subtitle
+                    for para in shape.text_frame.paragraphs:
+                        para.font.color.rgb = c.dark_gray_blue
+                        para.font.size = Pt(24)
+                else:
+                    shape.text_frame.paragraphs[0].text = ""
 
         # Add date
         txBox = slide.shapes.add_textbox(Inches(0.83), Inches(4.0), Inches(16), Inches(0.5))
         p = txBox.text_frame.paragraphs[0]
         p.text = date
         p.font.size = Pt(20)
-        p.font.color.rgb = self.colors.dark_gray_blue
+        p.font.color.rgb = c.dark_gray_blue
 
         return slide
 
     def add_content_slide(self, title: str):
         """Add a content slide using Layout 2 with proper title."""
         layout = self.prs.slide_layouts[2]
-        slide = self.prs.slides.add_slide(layout)
-
-        for shape in slide.shapes:
-            if shape.has_text_frame and hasattr(shape, 'placeholder_format'):
-                try:
-                    ph_type = shape.placeholder_format.type.real
-                    if ph_type == 1:  # TITLE
-                        shape.text_frame.paragraphs[0].text = title
-                        for para in shape.text_frame.paragraphs:
-                            para.font.color.rgb = self.colors.gold
-                            para.font.size = Pt(36)
-                            para.font.bold = True
-                    elif ph_type == 4:  # SUBTITLE - clear it
-                        shape.text_frame.paragraphs[0].text = ""
-                except:
-                    pass
+        slide = self.new_slide(layout)
+        c = self.colors_for_layout(2)
+
+        for idx, ph_type, _top in self.template.placeholders[2]:
+            shape = slide.placeholders[idx]
+            if ph_type == PH_TITLE:
+                shape.text_frame.paragraphs[0].text = title
+                for para in shape.text_frame.paragraphs:
+                    para.font.color.rgb = c.gold
+                    para.font.size = Pt(36)
+                    para.font.bold = True
+            elif ph_type == PH_SUBTITLE:  # clear it
+                shape.text_frame.paragraphs[0].text = ""
 
         return slide
 
+    def fit_text(self, slide, left: float, top: float, width: float, height: float,
+                 paragraphs, rounded: bool = False) -> list:
+        """Record a box's (text, size, bold) paragraphs for check_text() and return their font sizes.
+
+        With AUTO_SHRINK on, the sizes are shrunk until the text is predicted to fit.
+        """
+        if self.AUTO_SHRINK:
+            sizes = fit_font_sizes(paragraphs, width, height, rounded, self.TEXT_FONT, self.MIN_FONT_SIZE)
+            paragraphs = [(text, size, bold) for (text, _size, bold), size in zip(paragraphs, sizes)]
+        self.text_boxes.append((slide.part, left, top, width, height, rounded, paragraphs))
+        return [size for _text, size, _bold in paragraphs]
+
+    @classmethod
+    def reserved_areas(cls) -> list:
+        """RESERVED_AREAS, or the MARGIN_RIGHT strip down the right edge where the template prints its copyright."""
+        if cls.RESERVED_AREAS is not None:
+            return list(cls.RESERVED_AREAS)
+        return [('copyright margin', cls.SLIDE_WIDTH - cls.MARGIN_RIGHT, 0.0, cls.MARGIN_RIGHT, cls.SLIDE_HEIGHT)]
+
+    def lint_layout(self) -> list:
+        """Shapes off the slide, in reserved areas or overlapping, on every slide (layout_lint.py)."""
+        width, height = self.prs.slide_width.inches, self.prs.slide_height.inches
+        reserved = self.reserved_areas()
+        findings = []
+        for number, slide in enumerate(self.prs.slides, 1):
+            findings.extend(lint_slide(slide._element, number, width, height, reserved))
+        return findings
+
+    def check_text(self) -> list:
+        """Boxes drawn by the add_* helpers whose text is predicted to overflow.
+
+        Returns (slide_number, left_in, top_in, needed_in, available_in, text) tuples.
+        Slides restored from the incremental cache are measured from the boxes
+        recorded with them; use text_metrics.find_overflows(prs) for any other deck.
+        """
+        numbers = {slide.part: number for number, slide in enumerate(self.prs.slides, 1)}
+        overflows = []
+        for part, left, top, width, height, rounded, paragraphs in self.text_boxes:
+            if part not in numbers:
+                continue
+            result = overflow(paragraphs, width, height, rounded, self.TEXT_FONT)
+            if result is not None:
+                overflows.append(overflow_record(numbers[part], left, top, result, paragraphs))
+        return overflows
+
     def add_rounded_box(self, slide, left: float, top: float, width: float, height: float,
                         fill_color, text: str = "", font_size: int = 16, font_color=None):
         """Add a rounded rectangle with text."""
         if font_color is None:
             font_color = self.colors.white
+        if text:
+            font_size = self.fit_text(slide, left, top, width, height, [(text, font_size, True)], rounded=True)[0]
+
+        if self.USE_FRAGMENTS:
+            return stamp_rounded_box(slide.shapes, Inches(left), Inches(top), Inches(width), Inches(height),
+                                     fill_color, text, font_size, font_color)
 
         shape = slide.shapes.add_shape(
             MSO_SHAPE.ROUNDED_RECTANGLE,
             Inches(left), Inches(top), Inches(width), Inches(height)
         )
-        shape.fill.solid()
-        shape.fill.fore_color.rgb = fill_color
-        shape.line.fill.background()
-
-        if hasattr(shape, 'adjustments') and len(shape.adjustments) > 0:
-            shape.adjustments[0] = 0.1
-
-        if text:
-            tf = shape.text_frame
-            tf.word_wrap = True
-            tf.anchor = MSO_ANCHOR.MIDDLE
-            p = tf.paragraphs[0]
-            p.text = text
-            p.font.size = Pt(font_size)
-            p.font.color.rgb = font_color
-            p.font.bold = True
-            p.alignment = PP_ALIGN.CENTER
-
+        style_rounded_box(shape, fill_color, text, font_size, font_color)
         return shape
 
     def add_text_box(self, slide, left: float, top: float, width: float, height: float,
@@ -200,16 +619,14 @@ class SlideGenerator:
         """Add a text box."""
         if font_color is None:
             font_color = self.colors.dark_navy
+        font_size = self.fit_text(slide, left, top, width, height, [(text, font_size, bold)])[0]
+
+        if self.USE_FRAGMENTS:
+            return stamp_text_box(slide.shapes, Inches(left), Inches(top), Inches(width), Inches(height),
+                                  text, font_size, font_color, bold, align)
 
         txBox = slide.shapes.add_textbox(Inches(left), Inches(top), Inches(width), Inches(height))
-        tf = txBox.text_frame
-        tf.word_wrap = True
-        p = tf.paragraphs[0]
-        p.text = text
-        p.font.size = Pt(font_size)
-        p.font.color.rgb = font_color
-        p.font.bold = bold
-        p.alignment = align
+        style_text_box(txBox, text, font_size, font_color, bold, align)
         return txBox
 
     def add_multiline_box(self, slide, left: float, top: float, width: float, height: float,
@@ -218,33 +635,324 @@ class SlideGenerator:
         """Add a rounded box with title and subtitle."""
         if font_color is None:
             font_color = self.colors.white
+        paragraphs = [(title, title_size, True)]
+        if subtitle:
+            paragraphs.append((subtitle, subtitle_size, False))
+        sizes = self.fit_text(slide, left, top, width, height, paragraphs, rounded=True)
+        title_size = sizes[0]
+        if subtitle:
+            subtitle_size = sizes[1]
 
-        shape = self.add_rounded_box(slide, left, top, width, height, fill_color, "", 18, font_color)
-
-        tf = shape.text_frame
-        tf.word_wrap = True
-        tf.anchor = MSO_ANCHOR.MIDDLE
+        if self.USE_FRAGMENTS:
+            return stamp_multiline_box(slide.shapes, Inches(left), Inches(top), Inches(width), Inches(height),
+                                       fill_color, title, subtitle, font_color, title_size, subtitle_size)
 
-        p = tf.paragraphs[0]
-        p.text = title
-        p.font.size = Pt(title_size)
-        p.font.color.rgb = font_color
-        p.font.bold = True
-        p.alignment = PP_ALIGN.CENTER
+        shape = self.add_rounded_box(slide, left, top, width, height, fill_color, "", 18, font_color)
+        style_multiline_box(shape, font_color, title, subtitle, title_size, subtitle_size)
+        return shape
 
-        if subtitle:
-            p2 = tf.add_paragraph()
-            p2.text = subtitle
-            p2.font.size = Pt(subtitle_size)
-            p2.font.color.rgb = font_color
-            p2.font.bold = False
-            p2.alignment = PP_ALIGN.CENTER
+    def add_card(self, slide, left: float, top: float, width: float, height: float, fill_color,
+                 paragraphs, padding=(0.3, 0.2), gap: float = 0.1, align=PP_ALIGN.LEFT,
+                 anchor=MSO_ANCHOR.TOP):
+        """Add a rounded card holding several styled paragraphs, as one shape.
+
+        paragraphs: [(text, font_size, font_color, bold), ...], top to bottom.
+        padding: (x, y) inches from the card edge to its text; gap: inches
+        between paragraphs. This replaces a rounded box with text boxes laid
+        over it, at a third of the shapes.
+        """
+        pad_x, pad_y = padding
+        sizes = self.fit_text(slide, left + pad_x - INSET_X, top + pad_y - INSET_Y,
+                              width - 2 * (pad_x - INSET_X), height - 2 * (pad_y - INSET_Y),
+                              [(text, size, bold) for text, size, _color, bold in paragraphs])
+        paragraphs = [(text, size, color, bold) for (text, _size, color, bold), size in zip(paragraphs, sizes)]
+        # Insets count from the text rectangle, which the rounded corners already pull in
+        corner = corner_inset(width, height)
+        insets = (Inches(max(pad_x - corner, 0.0)), Inches(max(pad_y - corner, 0.0)))
+        spacing = Inches(gap)
+
+        if self.USE_FRAGMENTS:
+            return stamp_card(slide.shapes, Inches(left), Inches(top), Inches(width), Inches(height),
+                              fill_color, paragraphs, insets, spacing, align, anchor)
 
+        shape = slide.shapes.add_shape(
+            MSO_SHAPE.ROUNDED_RECTANGLE,
+            Inches(left), Inches(top), Inches(width), Inches(height)
+        )
+        style_card(shape, fill_color, paragraphs, insets, spacing, align, anchor)
         return shape
 
-    def save(self, output_path: str):
-        """Save the presentation."""
-        self.prs.save(output_path)
+    def add_image(self, slide, left: float, top: float, width: float, height: float, source):
+        """Add a picture fitted inside a box (aspect ratio kept, centred).
+
+        source is an image path or bytes. It goes through self.images: identical
+        images share one part, and each is downscaled to IMAGE_DPI for its box,
+        recompressed and cached on disk. The picture gets its final pixels and
+        size in resolve_images(), so a deck's images are processed in parallel.
+        """
+        key = self.images.submit(source, width, height)
+        image_part = self.image_parts.get(key)
+        if image_part is None:
+            # Placeholder until resolve_images(); its extension may change there
+            package = self.prs.part.package
+            filename = None if isinstance(source, (bytes, bytearray)) else Path(source).name
+            image_part = ImagePart(package.next_image_partname('png'), CT.PNG, package, b'', filename)
+            self.image_parts[key] = image_part
+
+        rId = slide.part.relate_to(image_part, RT.IMAGE)
+        shape_id = slide.shapes._next_shape_id
+        pic = slide.shapes._grpSp.add_pic(shape_id, f"Picture {shape_id - 1}", image_part.desc, rId,
+                                          Inches(left), Inches(top), Inches(width), Inches(height))
+        picture = Picture(pic, slide.shapes)
+        self.pending_images.append((picture, key, left, top, width, height))
+        return picture
+
+    def resolve_images(self) -> int:
+        """Fill in the pixels and fitted size of pictures added since the last call.
+
+        Runs automatically after generate_all()'s build phase, before each
+        streamed slide is written and before saving. Returns the pictures resolved.
+        """
+        pending, self.pending_images = self.pending_images, []
+        for picture, key, left, top, width, height in pending:
+            image = self.images.result(key)
+            image_part = self.image_parts[key]
+            if not image_part._blob:
+                image_part._blob = image.blob
+                if image.ext != image_part.partname.ext:
+                    image_part.partname = PackURI(f'/ppt/media/image{image_part.partname.idx}.{image.ext}')
+                    image_part._content_type = self.IMAGE_CONTENT_TYPES[image.ext]
+
+            scale = min(width / image.width, height / image.height)
+            fitted_width, fitted_height = image.width * scale, image.height * scale
+            picture.left = Inches(left + (width - fitted_width) / 2)
+            picture.top = Inches(top + (height - fitted_height) / 2)
+            picture.width = Inches(fitted_width)
+            picture.height = Inches(fitted_height)
+        return len(pending)
+
+    def chart_palette(self) -> list:
+        """Series colors, in order, for the chart primitives."""
+        c = self.colors
+        return [c.dark_navy, c.gold, c.dark_gray_blue, c.burgundy, c.sage_green, c.mauve]
+
+    def add_chart(self, slide, chart_type, left: float, top: float, width: float, height: float,
+                  categories, series, number_format: str = None, legend: bool = None,
+                  font_size: int = 12, max_points: int = None):
+        """Add a native chart themed from the template colors.
+
+        Args:
+            chart_type: an XL_CHART_TYPE (see add_line_chart/add_bar_chart/add_area_chart).
+            categories: x values shared by all series (dates, numbers or labels).
+            series: {name: values} or [(name, values), ...].
+            number_format: Excel number format of the values, e.g. '#,##0'.
+            legend: show a legend below the plot (default: when there are several series).
+            max_points: category budget before LTTB downsampling (default: CHART_MAX_POINTS).
+        """
+        series = list(series.items()) if hasattr(series, 'items') else list(series)
+        categories, series = downsample(categories, series, max_points or self.CHART_MAX_POINTS)
+
+        chart_data = CategoryChartData(number_format=number_format or 'General')
+        chart_data.categories = categories
+        for name, values in series:
+            chart_data.add_series(name, values)
+        frame = slide.shapes.add_chart(chart_type, Inches(left), Inches(top), Inches(width), Inches(height),
+                                       chart_data)
+
+        c = self.colors
+        chart = frame.chart
+        chart.font.size = Pt(font_size)
+        chart.font.color.rgb = c.dark_navy
+        chart.has_legend = len(series) > 1 if legend is None else legend
+        if chart.has_legend:
+            chart.legend.position = XL_LEGEND_POSITION.BOTTOM
+            chart.legend.include_in_layout = False
+        chart.value_axis.has_major_gridlines = True
+        chart.value_axis.major_gridlines.format.line.color.rgb = c.light_gray
+        chart.value_axis.format.line.fill.background()
+        chart.category_axis.format.line.color.rgb = c.gray
+
+        palette = self.chart_palette()
+        plot = chart.plots[0]
+        for i, chart_series in enumerate(plot.series):
+            color = palette[i % len(palette)]
+            if chart_type in (XL_CHART_TYPE.LINE, XL_CHART_TYPE.LINE_MARKERS):
+                chart_series.format.line.color.rgb = color
+                chart_series.format.line.width = Pt(2.25)
+                chart_series.smooth = False
+                if chart_type == XL_CHART_TYPE.LINE:
+                    chart_series.marker.style = XL_MARKER_STYLE.NONE
+            else:
+                chart_series.format.fill.solid()
+                chart_series.format.fill.fore_color.rgb = color
+        if chart_type in (XL_CHART_TYPE.COLUMN_CLUSTERED, XL_CHART_TYPE.BAR_CLUSTERED):
+            plot.gap_width = 50
+        return frame
+
+    def add_line_chart(self, slide, left: float, top: float, width: float, height: float,
+                       categories, series, **kwargs):
+        """Add a line chart (no markers); see add_chart()."""
+        return self.add_chart(slide, XL_CHART_TYPE.LINE, left, top, width, height, categories, series, **kwargs)
+
+    def add_bar_chart(self, slide, left: float, top: float, width: float, height: float,
+                      categories, series, horizontal: bool = False, **kwargs):
+        """Add a clustered column chart, or bar chart with horizontal=True; see add_chart()."""
+        chart_type = XL_CHART_TYPE.BAR_CLUSTERED if horizontal else XL_CHART_TYPE.COLUMN_CLUSTERED
+        return self.add_chart(slide, chart_type, left, top, width, height, categories, series, **kwargs)
+
+    def add_area_chart(self, slide, left: float, top: float, width: float, height: float,
+                       categories, series, **kwargs):
+        """Add an area chart; see add_chart()."""
+        return self.add_chart(slide, XL_CHART_TYPE.AREA, left, top, width, height, categories, series, **kwargs)
+
+    def table_cell_style(self, row_idx: int, col_idx: int, header_rows: int = 1) -> tuple:
+        """Default (fill, font color, bold) of a table cell: navy header, banded gray/white body."""
+        c = self.colors
+        if row_idx < header_rows:
+            return c.dark_navy, c.white, True
+        if (row_idx - header_rows) % 2 == 0:
+            return c.light_gray, c.dark_navy, False
+        return c.white, c.dark_navy, False
+
+    def add_table(self, slide, left: float, top: float, col_widths, rows, header_rows: int = 1,
+                  row_height: float = 0.4, font_size: int = 12, cell_style=None, align=PP_ALIGN.CENTER,
+                  continuation_title: str = None) -> list:
+        """Add rows of text as one native table, continuing on new slides when it passes the content area.
+
+        Args:
+            col_widths: column widths in inches.
+            rows: sequences of cell text; the first header_rows are repeated on every page.
+            row_height: minimum row height; rows grow to fit their wrapped text.
+            cell_style: (row_idx, col_idx) -> (fill, font color, bold); defaults to table_cell_style.
+            continuation_title: title of continuation slides (default: this slide's title + "（続き）").
+
+        Returns:
+            The table shape of every page, first page first; [] if rows is empty.
+        """
+        if not rows:
+            return []
+        if cell_style is None:
+            cell_style = lambda row_idx, col_idx: self.table_cell_style(row_idx, col_idx, header_rows)
+
+        heights = []
+        for row_idx, row in enumerate(rows):
+            height = row_height
+            for col_idx, (text, width) in enumerate(zip(row, col_widths)):
+                bold = cell_style(row_idx, col_idx)[2]
+                needed = (text_height([(str(text), font_size, bold)], width - 2 * INSET_X, self.TEXT_FONT)
+                          + 2 * INSET_Y)
+                height = max(height, needed)
+            heights.append(height)
+
+        bottom = self.SLIDE_HEIGHT - self.MARGIN_BOTTOM
+        # With no more rows than header_rows, the table is all header and fits on one page
+        header = list(range(min(header_rows, len(rows))))
+        header_height = sum(heights[:len(header)])
+        tables = []
+        start = len(header)
+        while True:
+            available = bottom - top - header_height
+            end, used = start, 0.0
+            # Always place at least one body row per page, even if it is taller than the page
+            while end < len(rows) and (end == start or used + heights[end] <= available):
+                used += heights[end]
+                end += 1
+            page = header + list(range(start, end))
+            tables.append(self._add_table_page(slide, left, top, col_widths, rows, page, heights,
+                                               font_size, cell_style, align))
+            if end >= len(rows):
+                return tables
+            if continuation_title is None:
+                title = slide.shapes.title
+                continuation_title = f"{title.text_frame.text if title is not None else ''}（続き）"
+            slide = self.add_content_slide(continuation_title)
+            top = self.MARGIN_TOP + 0.1
+            start = end
+
+    def _add_table_page(self, slide, left: float, top: float, col_widths, rows, page, heights,
+                        font_size: int, cell_style, align):
+        """Add the rows listed in page as one table."""
+        cells = [
+            [(str(text), *cell_style(row_idx, col_idx)) for col_idx, text in enumerate(rows[row_idx])]
+            for row_idx in page
+        ]
+        emu_widths = [Inches(width) for width in col_widths]
+        emu_heights = [Inches(heights[row_idx]) for row_idx in page]
+
+        if self.USE_FRAGMENTS:
+            return stamp_table(slide.shapes, Inches(left), Inches(top), emu_widths, emu_heights,
+                               cells, font_size, align)
+
+        frame = slide.shapes.add_table(len(page), len(col_widths), Inches(left), Inches(top),
+                                       sum(emu_widths), sum(emu_heights))
+        table = frame.table
+        for column, width in zip(table.columns, emu_widths):
+            column.width = width
+        for row, height, row_cells in zip(table.rows, emu_heights, cells):
+            row.height = height
+            for cell, (text, fill_color, font_color, bold) in zip(row.cells, row_cells):
+                style_table_cell(cell, fill_color, text, font_size, font_color, bold, align)
+        return frame
+
+    def slim(self, keep_layouts=()) -> dict:
+        """Drop layouts, masters and media the generated slides do not use.
+
+        keep_layouts: layout names or indices to keep even when no slide uses them.
+        """
+        with self.metrics.phase('slim') as event:
+            stats = slim_presentation(self.prs, keep_layouts)
+        event.update(removed=stats)
+        return stats
+
+    def merge_shapes(self) -> dict:
+        """Fold text boxes into the rounded boxes they sit on (see shape_merge.py).
+
+        Returns the slides' shape counts before and after and the shapes saved.
+        """
+        with self.metrics.phase('merge') as event:
+            stats = merge_presentation(self.prs, self.TEXT_FONT)
+        event.update(stats)
+        return stats
+
+    def save(self, output_path: str, slim: bool = False, keep_layouts=(), merge: bool = False):
+        """Save the presentation, optionally merging shapes and slimming unused template parts first."""
+        self.resolve_images()
+        self.images.close()
+        if merge:
+            self.merge_shapes()
+        if slim:
+            self.slim(keep_layouts)
+        with self.metrics.phase('save') as event:
+            self.prs.save(output_path)
+        if isinstance(output_path, (str, os.PathLike)):
+            event['bytes'] = os.path.getsize(output_path)
+
+    def export_svg(self, output_dir, **options) -> int:
+        """Write the deck as one SVG per slide plus index.html (slide_svg.py); returns the slides written.
+
+        The package is written uncompressed to memory and read back one slide at a time.
+        """
+        sink = io.BytesIO()
+        self.save_to_stream(sink, compression={'*': 0})
+        return export_svg(sink.getvalue(), output_dir, **options)
+
+    def save_to_stream(self, stream, compression: dict = None, threads: int = None,
+                       slim: bool = False, keep_layouts=(), merge: bool = False) -> int:
+        """Stream the presentation into any binary sink (no seeking, no temp files).
+
+        compression maps part extensions or content types to a zlib level (0 stores
+        the part); by default media is stored and XML deflated. Large parts are
+        deflated in parallel on `threads` threads. Returns the bytes written.
+        """
+        self.resolve_images()
+        self.images.close()
+        if merge:
+            self.merge_shapes()
+        if slim:
+            self.slim(keep_layouts)
+        with self.metrics.phase('save', stream=True) as event:
+            event['bytes'] = write_package(self.prs.part.package, stream, compression, threads)
+        return event['bytes']
 
 
 def main():
@@ -253,6 +961,12 @@ def main():
     parser.add_argument('--template', '-t', default='genda', help='Template name (default: genda)')
     parser.add_argument('--delete-existing', action='store_true', default=True,
                         help='Delete existing slides from template (default: True)')
+    parser.add_argument('--workers', '-j', type=int, default=None,
+                        help='Build slides in this many processes (default: one after another here)')
+    parser.add_argument('--check-text', action='store_true',
+                        help='Warn about box text predicted to overflow its box')
+    parser.add_argument('--lint', action='store_true',
+                        help='Report shapes off the slide, in the copyright margin or overlapping')
     args = parser.parse_args()
 
     # Determine paths
@@ -266,22 +980,26 @@ def main():
 
     # Generate slides
     gen = SlideGenerator(str(template_path))
-    gen.load_template()
-
-    if args.delete_existing:
-        gen.delete_all_slides()
-        print("Deleted existing slides from template")
-
-    # Print loaded colors
-    print(f"\nLoaded theme colors:")
-    for name, color in gen.colors.colors.items():
-        print(f"  {name}: #{color}")
-
-    print(f"\nContent area: {gen.content_left}in - {gen.content_right}in (width: {gen.content_width}in)")
-
-    # Note: Actual slide generation would parse the markdown file
-    # For now, this is a base class that can be extended
-    print("\nBase generator ready. Extend this class for specific presentations.")
+    print(f"\nContent area: {gen.content_left}in - {gen.content_right}in (width: {gen.content_width}in)\n")
+    gen.generate_design(str(design_path), workers=args.workers)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    gen.save(str(output_path))
+    print(f"\nSaved: {output_path}")
+    print(f"Total slides: {len(gen.prs.slides)}")
+
+    if args.check_text:
+        overflows = gen.check_text()
+        print(f"\nText overflow: {len(overflows)} box(es)")
+        for number, left, top, needed, available, text in overflows:
+            print(f"  slide {number} box at ({left}, {top})in: needs {needed}in, has {available}in: {text!r}")
+
+    if args.lint:
+        findings = gen.lint_layout()
+        print(f"\nLayout lint: {len(findings)} finding(s)")
+        for f in findings:
+            other = f" / {f.other}" if f.other else ''
+            print(f"  slide {f.slide}: {f.kind}: {f.shape}{other}: {f.detail}")
 
 
 if __name__ == "__main__":
@@ -3,79 +3,144 @@
 Generate Warehouse System Proposal slides.
 
 Usage:
-    uv run python slides/scripts/generate_warehouse_proposal.py
+    uv run python slides/scripts/generate_warehouse_proposal.py [--incremental] [--slides 7,9] [--output FILE]
+        [--slim [--keep-layout NAME ...]] [--merge-shapes] [--metrics FILE] [--trace FILE] [--check-text] [--auto-shrink]
+        [--lint] [--svg DIR] [--memory] [--memory-budget MB] [--workers N]
+
+Example:
+    uv run python slides/scripts/generate_warehouse_proposal.py --incremental --slides 7,9
 """
 
+import argparse
+import sys
+from pathlib import Path
+
 from pptx.enum.text import PP_ALIGN
 from generate_pptx import SlideGenerator
+from instrumentation import MIB, MemoryBudgetExceeded, format_memory_report, write_chrome_trace
+from layout import Cell, Grid, Place, Row, Stack
+from text_metrics import INSET_X, INSET_Y, LINE_SPACING
 
 
 class WarehouseProposalGenerator(SlideGenerator):
     """Generate Warehouse System Proposal slides."""
 
+    SLIDE_BUILDERS = [
+        ("create_slide_1_title", "Title"),
+        ("create_slide_2_purpose", "目的"),
+        ("create_slide_3_issues", "現状の課題"),
+        ("create_slide_4_solution", "解決の方向性"),
+        ("create_slide_5_system", "システム構成イメージ"),
+        ("create_slide_6_efficiency", "現場の作業効率化"),
+        ("create_slide_7_dashboard", "どこからでも状況確認"),
+        ("create_slide_8_stagnant", "滞留在庫の解消"),
+        ("create_slide_9_effect", "導入効果"),
+        ("create_slide_10_summary", "まとめとNext Steps"),
+    ]
+
+    def create_slide_1_title(self):
+        """Slide 1: Title."""
+        return self.add_title_slide(
+            self.slot('title', "Warehouseシステム構築提案"),
+            self.slot('subtitle', "倉庫業務の可視化による滞留在庫の解消と\nPush型オペレーションの実現"),
+            self.slot('date', "2026.01.XX"),
+        )
+
+    def _card_columns(self, cards: int, card_height: float, card_gap: float):
+        """Two 7" columns 2.5" apart, each a header bar above a stack of cards."""
+        col_width = 7.0
+        column = Stack(
+            Cell(col_width, 0.8, 'header'),
+            Place(Grid(Cell(col_width, card_height, 'card'), rows=cards, gap_y=card_gap), 0, 1.0),
+        )
+        return Row(column, column, gap=2.5)
+
+    def _draw_card_columns(self, slide, layout, columns, header_size: int, title_size: int, desc_size: int,
+                           title_top: float, desc_top: float):
+        """Fill the boxes of _card_columns: columns is [(header color, header, [(title, desc), ...]), ...].
+
+        Each card is one shape; its title starts title_top and its description
+        desc_top inches below the card's top, both 0.3" in from the sides.
+        """
+        c = self.colors
+        padding = (0.3 + INSET_X, title_top + INSET_Y)
+        gap = round(desc_top - title_top - title_size * LINE_SPACING / 72, 3)
+        cards = iter(layout['card'])
+        for header_box, (color, header, items) in zip(layout['header'], columns):
+            self.add_rounded_box(slide, *header_box, color, header, header_size, c.white)
+            for (title, desc), card in zip(items, cards):
+                self.add_card(slide, *card, c.light_gray, [
+                    (title, title_size, c.dark_navy, True),
+                    (desc, desc_size, c.dark_navy, False),
+                ], padding, gap)
+
+    def _comparison_table(self, rows: int, header_height: float, rows_top: float):
+        """Before → After table: two 6.5" columns around a 0.8" arrow column, 1" rows."""
+        col_width = 6.5
+        arrow_width = 0.8
+        header = Row(
+            Cell(col_width, header_height, 'before_header'),
+            Cell(arrow_width, header_height),
+            Cell(col_width, header_height, 'after_header'),
+        )
+        row = Row(Cell(col_width, 1.0, 'before'), Cell(arrow_width, 1.0, 'arrow'), Cell(col_width, 1.0, 'after'))
+        return Stack(header, Place(Grid(row, rows=rows, gap_y=0.2), 0, rows_top))
+
+    def _draw_comparison_table(self, slide, layout, comparisons, header_size: int,
+                               before_header: str = "Before", after_header: str = "After"):
+        """Fill the boxes of _comparison_table."""
+        c = self.colors
+        self.add_rounded_box(slide, *layout.box('before_header'), c.dark_navy, before_header, header_size, c.white)
+        self.add_rounded_box(slide, *layout.box('after_header'), c.gold, after_header, header_size, c.white)
+
+        for (before, after), before_box, arrow_box, after_box in zip(
+                comparisons, layout['before'], layout['arrow'], layout['after']):
+            self.add_rounded_box(slide, *before_box, c.light_gray, before, 16, c.dark_navy)
+            self.add_text_box(slide, *arrow_box, "→", 28, c.gold, True, PP_ALIGN.CENTER)
+            self.add_rounded_box(slide, *after_box, c.beige, after, 16, c.dark_navy)
+
     def create_slide_2_purpose(self):
         """Slide 2: 目的 - Key slide showing benefits for both management and operations."""
         slide = self.add_content_slide("なぜWarehouseシステムが必要か")
         c = self.colors
 
-        # Layout: Two columns (Management | Operations) with center connector
-        col_width = 7.0
-        gap = 2.5
-        total_width = col_width * 2 + gap
-        start_left = self.center_left(total_width)
-        start_top = self.MARGIN_TOP + 0.1
-
-        # === Left Column: 管理側 ===
-        mgmt_left = start_left
-        self.add_rounded_box(slide, mgmt_left, start_top, col_width, 0.8, c.dark_navy, "👔 管理側のメリット", 24, c.white)
+        # Layout: Two columns (Management | Operations) with center connector and key message below
+        columns = self._card_columns(cards=3, card_height=1.5, card_gap=0.25)
+        message = Stack(
+            Cell(columns.width, 1.2, 'message'),
+            Place(Cell(columns.width, 0.5, 'message_title'), 0, 0.15),
+            Place(Cell(columns.width, 0.5, 'message_text'), 0, 0.65),
+        )
+        layout = self.layout(Stack(
+            columns,
+            Place(Cell(1.0, 3.0, 'connector'), columns.width / 2 - 0.5, 1.5),
+            Place(message, 0, 5.8),
+        ), self.MARGIN_TOP + 0.1)
 
+        # === Columns: 管理側 | 現場側 ===
         mgmt_benefits = [
             ("在庫がリアルタイムで見える", "どこに何がいくつあるか、即座に把握"),
             ("滞留を自動検知", "90日動きがなければアラート"),
             ("どこからでも確認", "会議中・出張先からもアクセス可能"),
         ]
-
-        benefit_height = 1.5
-        benefit_gap = 0.25
-        mgmt_top = start_top + 1.0
-
-        for i, (title, desc) in enumerate(mgmt_benefits):
-            top = mgmt_top + i * (benefit_height + benefit_gap)
-            self.add_rounded_box(slide, mgmt_left, top, col_width, benefit_height, c.light_gray, "", 14, c.dark_navy)
-            self.add_text_box(slide, mgmt_left + 0.3, top + 0.2, col_width - 0.6, 0.5, title, 18, c.dark_navy, True, PP_ALIGN.LEFT)
-            self.add_text_box(slide, mgmt_left + 0.3, top + 0.7, col_width - 0.6, 0.6, desc, 14, c.dark_navy, False, PP_ALIGN.LEFT)
-
-        # === Right Column: 現場側 ===
-        ops_left = start_left + col_width + gap
-        self.add_rounded_box(slide, ops_left, start_top, col_width, 0.8, c.gold, "🔧 現場側のメリット", 24, c.white)
-
         ops_benefits = [
             ("スキャン1回で作業完了", "手書き・二重入力がゼロに"),
             ("何をすべきか明確", "システムが作業と場所を指示"),
             ("誰でも同じ品質", "ベテラン依存からの脱却"),
         ]
-
-        ops_top = start_top + 1.0
-
-        for i, (title, desc) in enumerate(ops_benefits):
-            top = ops_top + i * (benefit_height + benefit_gap)
-            self.add_rounded_box(slide, ops_left, top, col_width, benefit_height, c.light_gray, "", 14, c.dark_navy)
-            self.add_text_box(slide, ops_left + 0.3, top + 0.2, col_width - 0.6, 0.5, title, 18, c.dark_navy, True, PP_ALIGN.LEFT)
-            self.add_text_box(slide, ops_left + 0.3, top + 0.7, col_width - 0.6, 0.6, desc, 14, c.dark_navy, False, PP_ALIGN.LEFT)
+        self._draw_card_columns(slide, layout, [
+            (c.dark_navy, "👔 管理側のメリット", mgmt_benefits),
+            (c.gold, "🔧 現場側のメリット", ops_benefits),
+        ], header_size=24, title_size=18, desc_size=14, title_top=0.2, desc_top=0.7)
 
         # === Center connector ===
-        center_x = start_left + col_width + gap / 2
-        connector_top = start_top + 1.5
-        self.add_text_box(slide, center_x - 0.5, connector_top, 1.0, 3.0, "⟷", 48, c.gold, True, PP_ALIGN.CENTER)
+        self.add_text_box(slide, *layout.box('connector'), "⟷", 48, c.gold, True, PP_ALIGN.CENTER)
 
         # === Bottom: Key message ===
-        msg_top = start_top + 5.8
-        msg_box_height = 1.2
-
-        self.add_rounded_box(slide, start_left, msg_top, total_width, msg_box_height, c.dark_navy, "", 20, c.white)
-        self.add_text_box(slide, start_left, msg_top + 0.15, total_width, 0.5,
+        self.add_rounded_box(slide, *layout.box('message'), c.dark_navy, "", 20, c.white)
+        self.add_text_box(slide, *layout.box('message_title'),
                           "「見えない」から「見える」へ", 28, c.gold, True, PP_ALIGN.CENTER)
-        self.add_text_box(slide, start_left, msg_top + 0.65, total_width, 0.5,
+        self.add_text_box(slide, *layout.box('message_text'),
                           "見えれば判断できる。判断できれば動かせる。", 20, c.white, False, PP_ALIGN.CENTER)
 
         return slide
@@ -94,17 +159,12 @@ class WarehouseProposalGenerator(SlideGenerator):
         ]
 
         box_width = 3.0
-        box_height = 2.8
-        gap = 0.3
-
-        total_width = box_width * 5 + gap * 4
-        start_left = self.center_left(total_width)
-        start_top = self.MARGIN_TOP + 0.3
+        issue = Stack(Cell(box_width, 0.5, 'mark'), Place(Cell(box_width, 2.8, 'issue'), 0, 0.5))
+        layout = self.layout(Grid(issue, columns=len(issues), gap_x=0.3), self.MARGIN_TOP + 0.3)
 
-        for i, (title, desc) in enumerate(issues):
-            left = start_left + i * (box_width + gap)
-            self.add_text_box(slide, left, start_top, box_width, 0.5, "❌", 32, c.burgundy, True, PP_ALIGN.CENTER)
-            self.add_multiline_box(slide, left, start_top + 0.5, box_width, box_height, c.dark_navy, title, desc,
+        for (title, desc), mark_box, issue_box in zip(issues, layout['mark'], layout['issue']):
+            self.add_text_box(slide, *mark_box, "❌", 32, c.burgundy, True, PP_ALIGN.CENTER)
+            self.add_multiline_box(slide, *issue_box, c.dark_navy, title, desc,
                                    title_size=22, subtitle_size=14)
 
         return slide
@@ -122,26 +182,15 @@ class WarehouseProposalGenerator(SlideGenerator):
             ("紙を見て探し回る", "システムが場所を指示"),
         ]
 
-        col_width = 6.5
-        row_height = 1.0
-        gap = 0.2
-        arrow_width = 0.8
-
-        total_width = col_width * 2 + arrow_width
-        start_left = self.center_left(total_width)
-        start_top = self.MARGIN_TOP + 0.2
-
-        self.add_rounded_box(slide, start_left, start_top, col_width, 0.7, c.dark_navy, "Before（現状）", 20, c.white)
-        self.add_rounded_box(slide, start_left + col_width + arrow_width, start_top, col_width, 0.7, c.gold, "After（システム導入後）", 20, c.white)
+        table = self._comparison_table(len(comparisons), header_height=0.7, rows_top=0.85)
+        layout = self.layout(Stack(
+            table,
+            Place(Cell(table.width, 0.5, 'key'), 0, 7.0),
+        ), self.MARGIN_TOP + 0.2)
 
-        for i, (before, after) in enumerate(comparisons):
-            top = start_top + 0.85 + i * (row_height + gap)
-            self.add_rounded_box(slide, start_left, top, col_width, row_height, c.light_gray, before, 16, c.dark_navy)
-            self.add_text_box(slide, start_left + col_width, top, arrow_width, row_height, "→", 28, c.gold, True, PP_ALIGN.CENTER)
-            self.add_rounded_box(slide, start_left + col_width + arrow_width, top, col_width, row_height, c.beige, after, 16, c.dark_navy)
+        self._draw_comparison_table(slide, layout, comparisons, 20, "Before（現状）", "After（システム導入後）")
 
-        key_top = start_top + 7.0
-        self.add_text_box(slide, start_left, key_top, total_width, 0.5,
+        self.add_text_box(slide, *layout.box('key'),
                           "全ての入出荷を記録し、止まっている作業を「残」として可視化する。",
                           22, c.gold, True, PP_ALIGN.CENTER)
 
@@ -153,70 +202,47 @@ class WarehouseProposalGenerator(SlideGenerator):
         c = self.colors
 
         # Layout: Two columns with shared system in center
-        col_width = 7.0
-        gap = 2.5
-        total_width = col_width * 2 + gap
-        start_left = self.center_left(total_width)
+        columns = self._card_columns(cards=4, card_height=1.2, card_gap=0.2)
+        center = Stack(
+            Place(Cell(2.5, 0.5, 'link_arrow'), 0, 0.5),
+            Place(Cell(2.5, 0.8, 'link_label'), 0, 1.5),
+            Place(Cell(2.5, 0.5, 'link_arrow'), 0, 2.5),
+        )
         start_top = self.MARGIN_TOP + 0.1
+        layout = self.layout(Stack(columns, Place(center, 7.0, 1.5)), start_top)
 
-        # === Left Column: 管理側 (Dashboard) ===
-        mgmt_left = start_left
-        self.add_rounded_box(slide, mgmt_left, start_top, col_width, 0.8, c.dark_navy, "👔 管理側：ダッシュボード", 22, c.white)
-
+        # === Columns: 管理側 (Dashboard) | 現場側 (Mobile) ===
         mgmt_features = [
             ("📊 全体進捗の把握", "入荷・出荷・在庫状況を一覧"),
             ("🔔 アラート通知", "SLA超過・滞留在庫を自動検知"),
             ("📈 データ分析", "滞留傾向・作業効率をレポート"),
             ("✅ 判断・承認", "廃棄/売却の意思決定"),
         ]
-
-        feature_height = 1.2
-        feature_gap = 0.2
-        mgmt_top = start_top + 1.0
-
-        for i, (title, desc) in enumerate(mgmt_features):
-            top = mgmt_top + i * (feature_height + feature_gap)
-            self.add_rounded_box(slide, mgmt_left, top, col_width, feature_height, c.light_gray, "", 14, c.dark_navy)
-            self.add_text_box(slide, mgmt_left + 0.3, top + 0.15, col_width - 0.6, 0.5, title, 16, c.dark_navy, True, PP_ALIGN.LEFT)
-            self.add_text_box(slide, mgmt_left + 0.3, top + 0.6, col_width - 0.6, 0.5, desc, 13, c.dark_navy, False, PP_ALIGN.LEFT)
-
-        # === Right Column: 現場側 (Mobile) ===
-        ops_left = start_left + col_width + gap
-        self.add_rounded_box(slide, ops_left, start_top, col_width, 0.8, c.gold, "🔧 現場側：モバイルアプリ", 22, c.white)
-
         ops_features = [
             ("📋 今日の作業一覧", "やるべきタスクが自動表示"),
             ("📍 場所ナビ", "棚番号・ロケーションを指示"),
             ("📷 スキャン完了", "バーコード読取で作業記録"),
             ("✔️ 進捗自動更新", "完了したらリアルタイム反映"),
         ]
-
-        ops_top = start_top + 1.0
-
-        for i, (title, desc) in enumerate(ops_features):
-            top = ops_top + i * (feature_height + feature_gap)
-            self.add_rounded_box(slide, ops_left, top, col_width, feature_height, c.light_gray, "", 14, c.dark_navy)
-            self.add_text_box(slide, ops_left + 0.3, top + 0.15, col_width - 0.6, 0.5, title, 16, c.dark_navy, True, PP_ALIGN.LEFT)
-            self.add_text_box(slide, ops_left + 0.3, top + 0.6, col_width - 0.6, 0.5, desc, 13, c.dark_navy, False, PP_ALIGN.LEFT)
+        self._draw_card_columns(slide, layout, [
+            (c.dark_navy, "👔 管理側：ダッシュボード", mgmt_features),
+            (c.gold, "🔧 現場側：モバイルアプリ", ops_features),
+        ], header_size=22, title_size=16, desc_size=13, title_top=0.15, desc_top=0.6)
 
         # === Center connector with shared functions ===
-        center_x = start_left + col_width
-        center_width = gap
-        center_top = start_top + 1.5
-
-        # Arrows
-        self.add_text_box(slide, center_x, center_top + 0.5, center_width, 0.5, "←→", 28, c.gold, True, PP_ALIGN.CENTER)
-        self.add_text_box(slide, center_x, center_top + 1.5, center_width, 0.8, "データ\n連携", 14, c.dark_navy, True, PP_ALIGN.CENTER)
-        self.add_text_box(slide, center_x, center_top + 2.5, center_width, 0.5, "←→", 28, c.gold, True, PP_ALIGN.CENTER)
+        top_arrow, bottom_arrow = layout['link_arrow']
+        self.add_text_box(slide, *top_arrow, "←→", 28, c.gold, True, PP_ALIGN.CENTER)
+        self.add_text_box(slide, *layout.box('link_label'), "データ\n連携", 14, c.dark_navy, True, PP_ALIGN.CENTER)
+        self.add_text_box(slide, *bottom_arrow, "←→", 28, c.gold, True, PP_ALIGN.CENTER)
 
         # === Bottom: Core system functions ===
-        bottom_top = start_top + 6.0
-        func_width = 5.0
-        func_gap = 0.5
-        total_func_width = func_width * 3 + func_gap * 2
-        func_start_left = self.center_left(total_func_width)
+        functions_grid = Grid(Cell(5.0, 1.0, 'function'), columns=3, gap_x=0.5)
+        bottom = self.layout(Stack(
+            Place(Cell(functions_grid.width, 0.4, 'caption'), 0, -0.5),
+            functions_grid,
+        ), start_top + 6.0)
 
-        self.add_text_box(slide, func_start_left, bottom_top - 0.5, total_func_width, 0.4,
+        self.add_text_box(slide, *bottom.box('caption'),
                           "共通基盤：3つの管理機能", 16, c.dark_navy, True, PP_ALIGN.CENTER)
 
         functions = [
@@ -225,9 +251,8 @@ class WarehouseProposalGenerator(SlideGenerator):
             ("📤 出荷管理", "指示→発送→配送"),
         ]
 
-        for i, (title, desc) in enumerate(functions):
-            left = func_start_left + i * (func_width + func_gap)
-            self.add_rounded_box(slide, left, bottom_top, func_width, 1.0, c.dark_navy, f"{title}", 14, c.white)
+        for (title, desc), box in zip(functions, bottom['function']):
+            self.add_rounded_box(slide, *box, c.dark_navy, f"{title}", 14, c.white)
 
         return slide
 
@@ -246,36 +271,21 @@ class WarehouseProposalGenerator(SlideGenerator):
             ("ベテラン依存", "誰でも同品質"),
         ]
 
-        col_width = 6.5
-        row_height = 1.0
-        gap = 0.2
-        arrow_width = 0.8
-
-        total_width = col_width * 2 + arrow_width
-        start_left = self.center_left(total_width)
         start_top = self.MARGIN_TOP + 0.5
-
-        self.add_rounded_box(slide, start_left, start_top, col_width, 0.6, c.dark_navy, "Before", 18, c.white)
-        self.add_rounded_box(slide, start_left + col_width + arrow_width, start_top, col_width, 0.6, c.gold, "After", 18, c.white)
-
-        for i, (before, after) in enumerate(comparisons):
-            top = start_top + 0.75 + i * (row_height + gap)
-            self.add_rounded_box(slide, start_left, top, col_width, row_height, c.light_gray, before, 16, c.dark_navy)
-            self.add_text_box(slide, start_left + col_width, top, arrow_width, row_height, "→", 28, c.gold, True, PP_ALIGN.CENTER)
-            self.add_rounded_box(slide, start_left + col_width + arrow_width, top, col_width, row_height, c.beige, after, 16, c.dark_navy)
+        layout = self.layout(self._comparison_table(len(comparisons), header_height=0.6, rows_top=0.75), start_top)
+        self._draw_comparison_table(slide, layout, comparisons, 18)
 
         testimonials = ["探す時間が減った", "迷わない", "記録の手間ゼロ"]
-        test_top = start_top + 5.5
-        test_width = 4.5
-        test_gap = 0.4
-        total_test_width = test_width * 3 + test_gap * 2
-        test_start_left = self.center_left(total_test_width)
+        testimonial_grid = Grid(Cell(4.5, 0.7, 'testimonial'), columns=len(testimonials), gap_x=0.4)
+        voices = self.layout(Stack(
+            Place(Cell(testimonial_grid.width, 0.4, 'caption'), 0, -0.5),
+            testimonial_grid,
+        ), start_top + 5.5)
 
-        self.add_text_box(slide, test_start_left, test_top - 0.5, total_test_width, 0.4, "現場の声（想定）:", 18, c.dark_navy, True, PP_ALIGN.LEFT)
+        self.add_text_box(slide, *voices.box('caption'), "現場の声（想定）:", 18, c.dark_navy, True, PP_ALIGN.LEFT)
 
-        for i, text in enumerate(testimonials):
-            left = test_start_left + i * (test_width + test_gap)
-            self.add_rounded_box(slide, left, test_top, test_width, 0.7, c.gold, text, 16, c.white)
+        for text, box in zip(testimonials, voices['testimonial']):
+            self.add_rounded_box(slide, *box, c.gold, text, 16, c.white)
 
         return slide
 
@@ -395,23 +405,13 @@ class WarehouseProposalGenerator(SlideGenerator):
             ("問い合わせ対応", "xx件/日", "xx件/日", "-50%想定"),
         ]
 
-        eff_col_widths = [2.0, 1.6, 1.8, 1.4]
-        eff_row_height = 0.55
-        eff_gap = 0.08
-        eff_top = start_top + 0.5
-
-        for row_idx, row in enumerate(efficiency_data):
-            top = eff_top + row_idx * (eff_row_height + eff_gap)
-            col_left = left_start
-            for col_idx, cell in enumerate(row):
-                if row_idx == 0:
-                    color = c.dark_navy if col_idx < 2 else c.gold
-                    font_color = c.white
-                else:
-                    color = c.light_gray
-                    font_color = c.dark_navy
-                self.add_rounded_box(slide, col_left, top, eff_col_widths[col_idx], eff_row_height, color, cell, 12, font_color)
-                col_left += eff_col_widths[col_idx] + eff_gap
+        def efficiency_style(row_idx, col_idx):
+            if row_idx == 0:
+                return (c.dark_navy if col_idx < 2 else c.gold), c.white, True
+            return c.light_gray, c.dark_navy, True
+
+        self.add_table(slide, left_start, start_top + 0.5, [2.0, 1.6, 1.8, 1.4], efficiency_data,
+                       row_height=0.616, font_size=12, cell_style=efficiency_style)
 
         # Right side: コストインパクト
         right_start = left_start + left_width + 0.5
@@ -427,26 +427,15 @@ class WarehouseProposalGenerator(SlideGenerator):
             ("合計削減効果", "-", "-", "$xx万/年"),
         ]
 
-        cost_col_widths = [1.8, 1.5, 1.5, 1.6]
-        cost_row_height = 0.55
-        cost_gap = 0.08
-        cost_top = start_top + 0.5
-
-        for row_idx, row in enumerate(cost_data):
-            top = cost_top + row_idx * (cost_row_height + cost_gap)
-            col_left = right_start
-            for col_idx, cell in enumerate(row):
-                if row_idx == 0:
-                    color = c.dark_navy if col_idx < 2 else c.gold
-                    font_color = c.white
-                elif row_idx == len(cost_data) - 1:
-                    color = c.gold if col_idx == 3 else c.light_gray
-                    font_color = c.white if col_idx == 3 else c.dark_navy
-                else:
-                    color = c.light_gray
-                    font_color = c.dark_navy
-                self.add_rounded_box(slide, col_left, top, cost_col_widths[col_idx], cost_row_height, color, cell, 12, font_color)
-                col_left += cost_col_widths[col_idx] + cost_gap
+        def cost_style(row_idx, col_idx):
+            if row_idx == 0:
+                return (c.dark_navy if col_idx < 2 else c.gold), c.white, True
+            if row_idx == len(cost_data) - 1 and col_idx == 3:
+                return c.gold, c.white, True
+            return c.light_gray, c.dark_navy, True
+
+        self.add_table(slide, right_start, start_top + 0.5, [1.8, 1.5, 1.5, 1.6], cost_data,
+                       row_height=0.616, font_size=12, cell_style=cost_style)
 
         # Bottom: ROI試算
         roi_top = start_top + 4.2
@@ -483,91 +472,137 @@ class WarehouseProposalGenerator(SlideGenerator):
         c = self.colors
 
         col_width = 5.0
-        gap = 0.4
-        total_width = col_width * 3 + gap * 2
-        start_left = self.center_left(total_width)
-        start_top = self.MARGIN_TOP + 0.1
-
-        self.add_rounded_box(slide, start_left, start_top, col_width, 0.6, c.dark_navy, "1. 課題", 20, c.white)
-        issues = "・在庫が見えない\n・溜まる\n・判断できない\n・属人的\n・現場負荷が高い"
-        self.add_rounded_box(slide, start_left, start_top + 0.7, col_width, 2.8, c.light_gray, issues, 16, c.dark_navy)
+        column = Stack(Cell(col_width, 0.6, 'header'), Place(Cell(col_width, 2.8, 'body'), 0, 0.7))
+        columns = Row(column, column, column, gap=0.4)
 
-        col2_left = start_left + col_width + gap
-        self.add_rounded_box(slide, col2_left, start_top, col_width, 0.6, c.dark_navy, "2. 解決策", 20, c.white)
-        solutions = "・入出荷をシステム記録\n・「残」として可視化\n・スキャン1回で完了"
-        self.add_rounded_box(slide, col2_left, start_top + 0.7, col_width, 2.8, c.light_gray, solutions, 16, c.dark_navy)
-
-        col3_left = col2_left + col_width + gap
-        self.add_rounded_box(slide, col3_left, start_top, col_width, 0.6, c.gold, "3. 期待効果", 20, c.white)
-        effects = "・在庫リアルタイム把握\n・現場作業の効率化\n・滞留の自動検知\n・Push型オペレーション"
-        self.add_rounded_box(slide, col3_left, start_top + 0.7, col_width, 2.8, c.light_gray, effects, 16, c.dark_navy)
-
-        next_top = start_top + 4.0
-        self.add_text_box(slide, start_left, next_top, total_width, 0.5, "Next Steps:", 22, c.dark_navy, True, PP_ALIGN.LEFT)
-
-        steps = [("1", "本提案の方向性承認"), ("2", "詳細設計（画面・データ項目）"), ("3", "Phase 1 開発着手")]
         step_width = 5.0
-        step_gap = 0.3
-        step_top = next_top + 0.6
-
-        for i, (num, text) in enumerate(steps):
-            left = start_left + i * (step_width + step_gap)
-            self.add_rounded_box(slide, left, step_top, 0.6, 0.6, c.gold, num, 18, c.white)
-            self.add_text_box(slide, left + 0.7, step_top + 0.1, step_width - 0.8, 0.5, text, 18, c.dark_navy, False, PP_ALIGN.LEFT)
-
-        return slide
-
-    def generate_all(self):
-        """Generate all slides."""
-        self.load_template()
-        self.delete_all_slides()
-        print("Deleted existing slides from template")
-
-        self.add_title_slide(
-            "Warehouseシステム構築提案",
-            "倉庫業務の可視化による滞留在庫の解消と\nPush型オペレーションの実現"
+        step = Stack(
+            Cell(step_width, 0.6),
+            Cell(0.6, 0.6, 'step_number'),
+            Place(Cell(step_width - 0.8, 0.5, 'step_text'), 0.7, 0.1),
         )
-        print("Created slide 1: Title")
-
-        self.create_slide_2_purpose()
-        print("Created slide 2: 目的")
-
-        self.create_slide_3_issues()
-        print("Created slide 3: 現状の課題")
-
-        self.create_slide_4_solution()
-        print("Created slide 4: 解決の方向性")
+        next_steps = Stack(
+            Cell(columns.width, 0.5, 'next_title'),
+            Place(Grid(step, columns=3, gap_x=0.3), 0, 0.6),
+        )
+        layout = self.layout(Stack(columns, Place(next_steps, 0, 4.0)), self.MARGIN_TOP + 0.1)
 
-        self.create_slide_5_system()
-        print("Created slide 5: システム構成イメージ")
+        summary = [
+            (c.dark_navy, "1. 課題", "・在庫が見えない\n・溜まる\n・判断できない\n・属人的\n・現場負荷が高い"),
+            (c.dark_navy, "2. 解決策", "・入出荷をシステム記録\n・「残」として可視化\n・スキャン1回で完了"),
+            (c.gold, "3. 期待効果", "・在庫リアルタイム把握\n・現場作業の効率化\n・滞留の自動検知\n・Push型オペレーション"),
+        ]
+        for (color, header, body), header_box, body_box in zip(summary, layout['header'], layout['body']):
+            self.add_rounded_box(slide, *header_box, color, header, 20, c.white)
+            self.add_rounded_box(slide, *body_box, c.light_gray, body, 16, c.dark_navy)
 
-        self.create_slide_6_efficiency()
-        print("Created slide 6: 現場の作業効率化")
+        self.add_text_box(slide, *layout.box('next_title'), "Next Steps:", 22, c.dark_navy, True, PP_ALIGN.LEFT)
 
-        self.create_slide_7_dashboard()
-        print("Created slide 7: どこからでも状況確認")
+        steps = [("1", "本提案の方向性承認"), ("2", "詳細設計（画面・データ項目）"), ("3", "Phase 1 開発着手")]
+        for (num, text), number_box, text_box in zip(steps, layout['step_number'], layout['step_text']):
+            self.add_rounded_box(slide, *number_box, c.gold, num, 18, c.white)
+            self.add_text_box(slide, *text_box, text, 18, c.dark_navy, False, PP_ALIGN.LEFT)
 
-        self.create_slide_8_stagnant()
-        print("Created slide 8: 滞留在庫の解消")
+        return slide
 
-        self.create_slide_9_effect()
-        print("Created slide 9: 導入効果")
 
-        self.create_slide_10_summary()
-        print("Created slide 10: まとめとNext Steps")
+def parse_slide_numbers(value: str) -> list:
+    """Parse a '7,9' or '2-4,9' slide selection into slide numbers."""
+    numbers = []
+    for part in value.split(','):
+        part = part.strip()
+        if '-' in part:
+            first, last = part.split('-', 1)
+            numbers.extend(range(int(first), int(last) + 1))
+        elif part:
+            numbers.append(int(part))
+    return numbers
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Generate Warehouse System Proposal slides')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Reuse cached XML for slides whose inputs are unchanged')
+    parser.add_argument('--slides', type=parse_slide_numbers, default=None,
+                        help='Only render these slides, e.g. 7,9 or 2-4 (writes a preview deck)')
+    parser.add_argument('--output', '-o', default=None, help='Output path')
+    parser.add_argument('--workers', '-j', type=int, default=None, metavar='N',
+                        help='Build the slides across N processes')
+    parser.add_argument('--slim', action='store_true',
+                        help='Drop template layouts, masters and media the deck does not use')
+    parser.add_argument('--keep-layout', action='append', default=[], metavar='NAME',
+                        help='Layout name to keep when slimming (repeatable)')
+    parser.add_argument('--svg', default=None, metavar='DIR',
+                        help='Also export the slides as SVG with an index.html page to DIR')
+    parser.add_argument('--merge-shapes', action='store_true',
+                        help='Fold text boxes into the rounded boxes they sit on')
+    parser.add_argument('--check-text', action='store_true',
+                        help='Report text predicted to overflow its box')
+    parser.add_argument('--lint', action='store_true',
+                        help='Report shapes off the slide, in the copyright margin or overlapping')
+    parser.add_argument('--auto-shrink', action='store_true',
+                        help='Shrink font sizes of text predicted to overflow its box')
+    parser.add_argument('--metrics', default=None, metavar='FILE',
+                        help='Write per-phase and per-slide metrics as JSON lines')
+    parser.add_argument('--trace', default=None, metavar='FILE',
+                        help='Write a Chrome trace (chrome://tracing, Perfetto)')
+    parser.add_argument('--memory', action='store_true',
+                        help='Record peak/retained memory per phase and slide, and print where it went')
+    parser.add_argument('--memory-budget', type=float, default=None, metavar='MB',
+                        help='Abort with a memory report once the process has grown by more than MB MiB')
+    args = parser.parse_args()
+
     template_path = './slides/templates/genda.pptx'
     output_path = './slides/output/2026-01-16_warehouse-system-proposal.pptx'
+    if args.output:
+        output_path = args.output
+    elif args.slides:
+        output_path = str(Path(output_path).with_suffix('.preview.pptx'))
 
     gen = WarehouseProposalGenerator(template_path)
-    gen.generate_all()
-    gen.save(output_path)
+    gen.AUTO_SHRINK = args.auto_shrink
+    if args.memory or args.memory_budget:
+        gen.metrics.track_memory(budget=int(args.memory_budget * MIB) if args.memory_budget else None)
+    try:
+        gen.generate_all(slides=args.slides, incremental=args.incremental, workers=args.workers)
+        merged = gen.merge_shapes() if args.merge_shapes else None
+        gen.save(output_path, slim=args.slim, keep_layouts=args.keep_layout)
+    except MemoryBudgetExceeded as e:
+        print(f"\nAborted: {e}")
+        print(format_memory_report(e.report))
+        sys.exit(1)
 
     print(f"\nSaved to: {output_path}")
     print(f"Total slides: {len(gen.prs.slides)}")
     print(f"Content area: {gen.content_left}in - {gen.content_right}in (width: {gen.content_width}in)")
+    if args.svg:
+        print(f"SVG slides: {gen.export_svg(args.svg, title=Path(output_path).stem)} in {args.svg}")
+    if merged:
+        print(f"Merged shapes: {merged['shapes_before']} -> {merged['shapes_after']} ({merged['saved']} saved)")
+
+    if args.check_text:
+        overflows = gen.check_text()
+        print(f"\nText overflow: {len(overflows)} box(es)")
+        for number, left, top, needed, available, text in overflows:
+            print(f"  slide {number} box at ({left}, {top})in: needs {needed}in, has {available}in: {text!r}")
+
+    if args.lint:
+        findings = gen.lint_layout()
+        print(f"\nLayout lint: {len(findings)} finding(s)")
+        for f in findings:
+            other = f" / {f.other}" if f.other else ''
+            print(f"  slide {f.slide}: {f.kind}: {f.shape}{other}: {f.detail}")
+
+    if args.memory:
+        print(f"\n{format_memory_report(gen.metrics.memory_report())}")
+
+    if args.metrics:
+        with open(args.metrics, 'w', encoding='utf-8') as f:
+            gen.metrics.write_jsonl(f)
+        print(f"Metrics: {args.metrics}")
+    if args.trace:
+        write_chrome_trace(args.trace, gen.metrics.trace_events())
+        print(f"Trace: {args.trace}")
 
 
 if __name__ == "__main__":
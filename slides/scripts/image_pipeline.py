@@ -0,0 +1,182 @@
+"""
+Media pipeline for pictures placed with SlideGenerator.add_image().
+
+Screenshots and photos are usually far larger than the box they are shown in,
+and the same logo or asset turns up on many slides and in many decks. Each
+placed image goes through:
+
+1. Dedup: sources are identified by the SHA-256 of their bytes, so the same
+   asset requested for the same box size is processed once and embedded once.
+2. Downscale: the image is shrunk (never enlarged) to fit the pixel size of
+   its box at the pipeline's DPI, keeping its aspect ratio and EXIF rotation.
+3. Recompress: JPEG sources are re-encoded as JPEG, everything else as
+   optimised PNG. An image that needs no resizing keeps its original bytes.
+4. Cache: results are written under <cache dir>/images, keyed by source hash,
+   box size and quality, so repeat builds skip the image work entirely.
+
+Misses are processed on a process pool as soon as they are submitted, so a
+deck's images are worked on in parallel while its slides are still being
+built; result() waits for one. With workers=1 (or 0) images are processed
+inline instead, which is the default inside a worker process (batch_generate,
+render_server, parallel_build): those pools already use every core, and a
+pool per worker would start workers x cores processes. SlideGenerator closes
+the pool once a build's images are resolved; the next miss starts it again.
+"""
+
+import hashlib
+import io
+import math
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from PIL import Image, ImageOps
+
+from template_cache import CACHE_DIR
+
+DEFAULT_DPI = 150
+JPEG_QUALITY = 85
+
+# Pillow format -> extension python-pptx and PowerPoint accept as-is
+KEEP_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif', 'BMP': 'bmp', 'TIFF': 'tiff'}
+
+EXIF_ORIENTATION = 0x0112
+
+# (path, mtime_ns, size) -> SHA-256 of the file
+_digests = {}
+
+
+class ProcessedImage(NamedTuple):
+    """Bytes to embed, their extension and their pixel size."""
+
+    blob: bytes
+    ext: str
+    width: int
+    height: int
+
+
+def source_digest(source) -> str:
+    """SHA-256 hex digest of a path's contents (memoised per file version) or of bytes."""
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha256(source).hexdigest()
+    stat = os.stat(source)
+    key = (os.path.abspath(source), stat.st_mtime_ns, stat.st_size)
+    digest = _digests.get(key)
+    if digest is None:
+        digest = _digests[key] = hashlib.sha256(Path(source).read_bytes()).hexdigest()
+    return digest
+
+
+def process_image(source, box: tuple, quality: int = JPEG_QUALITY) -> ProcessedImage:
+    """Fit an image (path or bytes) inside box=(width_px, height_px) and recompress it."""
+    data = bytes(source) if isinstance(source, (bytes, bytearray)) else Path(source).read_bytes()
+    with Image.open(io.BytesIO(data)) as im:
+        fmt = im.format
+        rotated = im.getexif().get(EXIF_ORIENTATION, 1) != 1
+        if rotated:
+            im = ImageOps.exif_transpose(im)
+        scale = min(box[0] / im.width, box[1] / im.height, 1.0)
+        size = (max(1, round(im.width * scale)), max(1, round(im.height * scale)))
+        if size == im.size and not rotated and fmt in KEEP_FORMATS:
+            return ProcessedImage(data, KEEP_FORMATS[fmt], *size)
+
+        if fmt == 'JPEG':
+            im = im.convert('RGB')
+        elif im.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            im = im.convert('RGBA')
+        if size != im.size:
+            im = im.resize(size, Image.LANCZOS)
+
+        out = io.BytesIO()
+        if fmt == 'JPEG':
+            im.save(out, 'JPEG', quality=quality, optimize=True)
+            return ProcessedImage(out.getvalue(), 'jpg', *size)
+        im.save(out, 'PNG', optimize=True)
+        return ProcessedImage(out.getvalue(), 'png', *size)
+
+
+class ImagePipeline:
+    """Deduplicate, downscale, recompress and cache images for placement."""
+
+    def __init__(self, dpi: int = DEFAULT_DPI, quality: int = JPEG_QUALITY,
+                 cache_dir=None, workers: int = None):
+        self.dpi = dpi
+        self.quality = quality
+        self.cache_dir = Path(cache_dir) if cache_dir else CACHE_DIR / 'images'
+        if workers is None:
+            workers = 1 if multiprocessing.parent_process() is not None else (os.cpu_count() or 1)
+        self.workers = workers
+        self.stats = Counter()
+        self._results = {}
+        self._futures = {}
+        self._pool = None
+
+    def box_pixels(self, width: float, height: float) -> tuple:
+        """Pixel size of a box given in inches."""
+        return math.ceil(width * self.dpi), math.ceil(height * self.dpi)
+
+    def submit(self, source, width: float, height: float) -> str:
+        """Start preparing source (path or bytes) for a width x height inch box; returns its key."""
+        box = self.box_pixels(width, height)
+        key = f'{source_digest(source)}-{box[0]}x{box[1]}-q{self.quality}'
+        if key in self._results or key in self._futures:
+            self.stats['deduplicated'] += 1
+            return key
+
+        cached = self._read_cache(key)
+        if cached is not None:
+            self.stats['cached'] += 1
+            self._results[key] = cached
+            return key
+
+        self.stats['processed'] += 1
+        if not isinstance(source, (bytes, bytearray)):
+            source = os.fspath(source)
+        if self.workers > 1:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            self._futures[key] = self._pool.submit(process_image, source, box, self.quality)
+        else:
+            self._store(key, process_image(source, box, self.quality))
+        return key
+
+    def result(self, key: str) -> ProcessedImage:
+        """The prepared image for a key from submit(), waiting for it if needed."""
+        future = self._futures.pop(key, None)
+        if future is not None:
+            self._store(key, future.result())
+        return self._results[key]
+
+    def close(self):
+        """Shut down the worker pool (it is restarted on the next miss)."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _store(self, key: str, image: ProcessedImage):
+        self._results[key] = image
+        try:
+            self._write_cache(key, image)
+        except OSError:
+            pass
+
+    def _read_cache(self, key: str):
+        for ext in KEEP_FORMATS.values():
+            path = self.cache_dir / f'{key}.{ext}'
+            try:
+                blob = path.read_bytes()
+            except OSError:
+                continue
+            with Image.open(io.BytesIO(blob)) as im:
+                return ProcessedImage(blob, ext, *im.size)
+        return None
+
+    def _write_cache(self, key: str, image: ProcessedImage):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.cache_dir / f'{key}.{image.ext}'
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp_path.write_bytes(image.blob)
+        os.replace(tmp_path, path)
@@ -0,0 +1,313 @@
+"""
+Structured timing and size metrics for deck generation.
+
+A Recorder collects one event per timed span: run phases (template load,
+delete, build, slim, save) and one event per slide builder. Every event has
+its wall and CPU time plus whatever the caller attaches (slide number, shape
+count, serialized XML bytes, bytes written, ...).
+
+Events can be written as JSON lines, one object per line, or as a Chrome trace
+(open it in chrome://tracing or https://ui.perfetto.dev) where slide builders
+show up nested inside the build phase.
+
+track_memory() opts into memory metrics as well: each event gets the peak and
+retained Python allocations of its span (tracemalloc), the process RSS at its
+end and the call sites that retained the most, attributed to the innermost
+frame in these scripts (so a slide builder's line rather than lxml's). RSS
+also counts what tracemalloc cannot see, the libxml2 trees behind every part.
+With a budget, the first span to end with the process grown by more than
+the budget since track_memory() raises MemoryBudgetExceeded with a memory
+report, so a worker can drop the deck and carry on instead of being OOM-killed
+mid-build. The budget is measured from that baseline rather than as absolute
+RSS because memory a dropped deck freed goes back to the allocator, not the
+OS: the worker's RSS stays near its peak, and the next deck reuses it.
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Call sites are attributed to the innermost frame in this directory
+_SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+_OWN_FILES = {__file__, tracemalloc.__file__}
+
+MIB = 1024 * 1024
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """A span ended with the process grown past its memory budget; .report says where memory went."""
+
+    def __init__(self, message: str, report: dict):
+        super().__init__(message)
+        self.report = report
+
+
+def rss_bytes():
+    """Resident set size of this process in bytes, or None where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process in bytes, or None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _site(traceback):
+    """'file.py:line' of the innermost frame in these scripts, else of the innermost frame.
+
+    None for the profiler's own allocations (snapshots, events).
+    """
+    frames = list(reversed(traceback))
+    if frames[0].filename in _OWN_FILES:
+        return None
+    frame = next((f for f in frames if f.filename.startswith(_SCRIPTS_DIR)), frames[0])
+    return f'{os.path.basename(frame.filename)}:{frame.lineno}'
+
+
+class _MemoryTracker:
+    """tracemalloc bookkeeping for nested spans, plus the budget."""
+
+    def __init__(self, budget: int = None, sites: int = 5, frames: int = 8):
+        self.budget = budget
+        self.sites = sites
+        self.started = not tracemalloc.is_tracing()
+        if self.started:
+            tracemalloc.start(frames)
+        # What the process used before tracking started; the budget applies to growth beyond it
+        self.baseline = self._process_used()
+        # Per open span: traced bytes and RSS at its start, the peak seen so far, its start snapshot
+        self.stack = []
+
+    def enter(self) -> dict:
+        current, peak = tracemalloc.get_traced_memory()
+        if self.stack:
+            # The outer span's peak so far, before resetting the shared counter
+            self.stack[-1]['peak'] = max(self.stack[-1]['peak'], peak)
+        tracemalloc.reset_peak()
+        mark = {'start': current, 'peak': current, 'rss': rss_bytes(), 'snapshot': None}
+        if self.sites:
+            mark['snapshot'] = tracemalloc.take_snapshot()
+        self.stack.append(mark)
+        return mark
+
+    def exit(self, event: dict):
+        mark = self.stack.pop()
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(mark['peak'], peak)
+        if self.stack:
+            self.stack[-1]['peak'] = max(self.stack[-1]['peak'], peak)
+        event['mem_peak_bytes'] = peak - mark['start']
+        event['mem_retained_bytes'] = current - mark['start']
+        rss = rss_bytes()
+        if rss is not None:
+            event['rss_bytes'] = rss
+            event['rss_growth_bytes'] = rss - mark['rss']
+        if mark['snapshot'] is not None:
+            event['top_sites'] = self._top_sites(mark['snapshot'])
+
+    def _top_sites(self, before) -> list:
+        """Call sites that retained the most memory since the `before` snapshot."""
+        sites = {}
+        for diff in tracemalloc.take_snapshot().compare_to(before, 'traceback'):
+            if diff.size_diff > 0:
+                site = _site(diff.traceback)
+                if site is None:
+                    continue
+                size, count = sites.get(site, (0, 0))
+                sites[site] = (size + diff.size_diff, count + max(diff.count_diff, 0))
+        top = sorted(sites.items(), key=lambda item: item[1][0], reverse=True)[:self.sites]
+        return [{'site': site, 'bytes': size, 'count': count} for site, (size, count) in top]
+
+    @staticmethod
+    def _process_used() -> int:
+        rss = rss_bytes()
+        return rss if rss is not None else tracemalloc.get_traced_memory()[0]
+
+    def used(self) -> int:
+        """Growth since tracking began in RSS, or in traced memory where RSS is unavailable."""
+        return self._process_used() - self.baseline
+
+    def stop(self):
+        if self.started and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class Recorder:
+    """Collect timed events for one generator."""
+
+    def __init__(self):
+        self.events = []
+        self._origin = time.perf_counter()
+        self._epoch = time.time()
+        # _MemoryTracker while track_memory() is on, and the budget it was given
+        self.memory = None
+        self.memory_budget = None
+
+    def track_memory(self, budget: int = None, sites: int = 5, frames: int = 8):
+        """Also record memory for every span from now on (see the module docstring).
+
+        budget: bytes the process may grow by from now (RSS where available)
+        before the next span to end raises MemoryBudgetExceeded.
+        sites: top retaining call sites to record per span (0 skips the
+        snapshots, which cost the most).
+        frames: stack depth tracemalloc keeps, to find the frame in these scripts.
+        """
+        self.memory = _MemoryTracker(budget, sites, frames)
+        self.memory_budget = budget
+
+    def stop_memory(self):
+        """Stop recording memory (and tracemalloc, if track_memory() started it)."""
+        if self.memory is not None:
+            self.memory.stop()
+            self.memory = None
+
+    @contextmanager
+    def span(self, kind: str, name: str, **fields):
+        """Time the enclosed block as one event.
+
+        Yields the event dict; fields added to it, during or after the block,
+        end up in the written output.
+        """
+        event = {'event': kind, 'name': name, **fields}
+        memory = self.memory
+        if memory is not None:
+            memory.enter()
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield event
+        finally:
+            event['start_s'] = round(start - self._origin, 6)
+            event['wall_s'] = round(time.perf_counter() - start, 6)
+            event['cpu_s'] = round(time.process_time() - cpu_start, 6)
+            if memory is not None:
+                memory.exit(event)
+            self.events.append(event)
+        # Only reached when the block succeeded: an error in flight is not replaced
+        if memory is not None and memory.budget is not None:
+            used = memory.used()
+            if used > memory.budget:
+                raise MemoryBudgetExceeded(
+                    f"{used / MIB:.0f} MiB more in use after {kind} {name!r}, "
+                    f"over the {memory.budget / MIB:.0f} MiB budget", self.memory_report())
+
+    def phase(self, name: str, **fields):
+        """Time one run phase (template_load, delete, build, slim, save, ...)."""
+        return self.span('phase', name, **fields)
+
+    def summary(self) -> dict:
+        """Seconds per phase plus the slowest slide builders (and a memory report, if tracked)."""
+        phases = {}
+        for event in self.events:
+            if event['event'] == 'phase':
+                phases[event['name']] = round(phases.get(event['name'], 0.0) + event['wall_s'], 6)
+        slides = sorted((e for e in self.events if e['event'] == 'slide'),
+                        key=lambda e: e['wall_s'], reverse=True)
+        summary = {
+            'phases': phases,
+            'slowest_slides': [
+                {'number': e.get('number'), 'name': e['name'], 'wall_s': e['wall_s']}
+                for e in slides[:3]
+            ],
+        }
+        if any('mem_peak_bytes' in e for e in self.events):
+            summary['memory'] = self.memory_report()
+        return summary
+
+    def memory_report(self, top: int = 5) -> dict:
+        """Where memory went: phases, and the slides with the highest peaks, with their top sites."""
+        def entry(event):
+            keys = ('name', 'number', 'mem_peak_bytes', 'mem_retained_bytes', 'rss_bytes', 'rss_growth_bytes',
+                    'top_sites')
+            return {key: event[key] for key in keys if key in event}
+
+        tracked = [e for e in self.events if 'mem_peak_bytes' in e]
+        slides = sorted((e for e in tracked if e['event'] == 'slide'),
+                        key=lambda e: e['mem_peak_bytes'], reverse=True)
+        return {
+            'budget_bytes': self.memory_budget,
+            'rss_bytes': rss_bytes(),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'phases': [entry(e) for e in tracked if e['event'] == 'phase'],
+            'slides': [entry(e) for e in slides[:top]],
+        }
+
+    def absorb(self, events: list, epoch: float, **fields) -> list:
+        """Add events another Recorder collected (in a worker process, say) on this one's clock.
+
+        epoch: the other recorder's _epoch; fields (e.g. worker=pid) go on every
+        event. Returns the added events.
+        """
+        shift = epoch - self._epoch
+        added = [{**event, **fields, 'start_s': round(event['start_s'] + shift, 6)} for event in events]
+        self.events.extend(added)
+        return added
+
+    def write_jsonl(self, stream, **fields):
+        """Write one JSON object per event; extra fields (e.g. design=...) go on every line."""
+        for event in self.events:
+            stream.write(json.dumps({**fields, **event}, ensure_ascii=False) + '\n')
+
+    def trace_events(self, pid: int = None) -> list:
+        """Events in Chrome trace format (complete 'X' events, microsecond timestamps)."""
+        pid = os.getpid() if pid is None else pid
+        trace = []
+        for event in self.events:
+            args = {k: v for k, v in event.items() if k not in ('event', 'name', 'start_s', 'wall_s')}
+            trace.append({
+                'name': event['name'],
+                'cat': event['event'],
+                'ph': 'X',
+                'ts': round((self._epoch + event['start_s']) * 1e6),
+                'dur': round(event['wall_s'] * 1e6),
+                'pid': pid,
+                # Events absorbed from worker processes get a track per worker
+                'tid': event.get('worker', 1),
+                'args': args,
+            })
+        return trace
+
+
+def format_memory_report(report: dict) -> str:
+    """A memory_report() as indented text for the console."""
+    def mib(value):
+        if value is None:
+            return 'n/a'
+        if abs(value) < MIB:
+            return f'{value / 1024:.0f} KiB'
+        return f'{value / MIB:.1f} MiB'
+
+    lines = [f"Memory: RSS {mib(report['rss_bytes'])}, peak RSS {mib(report['peak_rss_bytes'])}, "
+             f"budget {mib(report['budget_bytes'])}"]
+    for title, entries in (('Phases', report['phases']), ('Slides by peak', report['slides'])):
+        if entries:
+            lines.append(f"{title}:")
+        for entry in entries:
+            label = f"{entry['number']}. {entry['name']}" if 'number' in entry else entry['name']
+            lines.append(f"  {label}: peak {mib(entry['mem_peak_bytes'])}, "
+                         f"retained {mib(entry['mem_retained_bytes'])}, RSS {mib(entry.get('rss_growth_bytes'))} more")
+            for site in entry.get('top_sites', ())[:3]:
+                lines.append(f"      {site['site']}: {mib(site['bytes'])} in {site['count']} blocks")
+    return '\n'.join(lines)
+
+
+def write_chrome_trace(path, trace_events: list):
+    """Write trace events as a Chrome trace JSON file."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
@@ -0,0 +1,190 @@
+"""
+Declarative layout containers for slide geometry.
+
+A slide's geometry is described once as a tree of containers instead of being
+recomputed by hand with `start + i * (size + gap)` arithmetic:
+
+- Cell(width, height, name)      a leaf box; unnamed cells are spacers
+- Row(*children, gap)            children left to right
+- Column(*children, gap)         children top to bottom
+- Grid(cell, columns, rows, ...) one cell repeated in uniform tracks
+- Stack(*children)               children overlaid; wrap one in Place(node, dx, dy) to offset it
+
+Sizes are in inches, like the SlideGenerator helpers. solve() places a tree at
+an origin in a single pass and returns the boxes of every named node, grouped
+by name in placement order. Trees are immutable and hashable, and solve() is
+memoised on (tree, origin), so slides with the same shape of content share
+one computed layout no matter what text goes into the boxes.
+
+Positions are accumulated the way the hand-written slides did: Row and Column
+add each child's size and the gap in turn, Grid multiplies the track index.
+"""
+
+from functools import lru_cache
+from typing import NamedTuple
+
+
+class Box(NamedTuple):
+    """A placed rectangle, in inches; unpacks as (left, top, width, height)."""
+
+    left: float
+    top: float
+    width: float
+    height: float
+
+
+class Node:
+    """Base class of layout nodes: an immutable, hashable size plus optional name."""
+
+    __slots__ = ('name', 'width', 'height', '_key', '_hash')
+
+    def _freeze(self, name, width: float, height: float, *key):
+        self.name = name
+        self.width = width
+        self.height = height
+        self._key = (type(self).__name__, name, *key)
+        self._hash = hash(self._key)
+
+    def __eq__(self, other):
+        return isinstance(other, Node) and self._key == other._key
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return f"{type(self).__name__}{self._key[1:]}"
+
+
+class Cell(Node):
+    """A leaf box of a fixed size."""
+
+    __slots__ = ()
+
+    def __init__(self, width: float, height: float, name: str = None):
+        self._freeze(name, width, height)
+
+
+class Place(Node):
+    """Offset a node inside a Stack."""
+
+    __slots__ = ('node', 'dx', 'dy')
+
+    def __init__(self, node: Node, dx: float = 0.0, dy: float = 0.0):
+        self.node = node
+        self.dx = dx
+        self.dy = dy
+        self._freeze(None, dx + node.width, dy + node.height, node, dx, dy)
+
+
+class Row(Node):
+    """Children placed left to right, `gap` apart, aligned at the top."""
+
+    __slots__ = ('children', 'gap')
+
+    def __init__(self, *children: Node, gap: float = 0.0, name: str = None):
+        self.children = children
+        self.gap = gap
+        width = sum(child.width for child in children) + gap * (len(children) - 1)
+        height = max(child.height for child in children)
+        self._freeze(name, width, height, children, gap)
+
+
+class Column(Node):
+    """Children placed top to bottom, `gap` apart, aligned at the left."""
+
+    __slots__ = ('children', 'gap')
+
+    def __init__(self, *children: Node, gap: float = 0.0, name: str = None):
+        self.children = children
+        self.gap = gap
+        width = max(child.width for child in children)
+        height = sum(child.height for child in children) + gap * (len(children) - 1)
+        self._freeze(name, width, height, children, gap)
+
+
+class Grid(Node):
+    """One cell repeated over `columns` x `rows` uniform tracks, filled row by row."""
+
+    __slots__ = ('cell', 'columns', 'rows', 'gap_x', 'gap_y')
+
+    def __init__(self, cell: Node, columns: int = 1, rows: int = 1,
+                 gap_x: float = 0.0, gap_y: float = 0.0, name: str = None):
+        self.cell = cell
+        self.columns = columns
+        self.rows = rows
+        self.gap_x = gap_x
+        self.gap_y = gap_y
+        width = cell.width * columns + gap_x * (columns - 1)
+        height = cell.height * rows + gap_y * (rows - 1)
+        self._freeze(name, width, height, cell, columns, rows, gap_x, gap_y)
+
+
+class Stack(Node):
+    """Children overlaid at the same origin (use Place to offset one)."""
+
+    __slots__ = ('children',)
+
+    def __init__(self, *children: Node, name: str = None):
+        self.children = children
+        width = max(child.width for child in children)
+        height = max(child.height for child in children)
+        self._freeze(name, width, height, children)
+
+
+class Layout:
+    """Solved boxes of a layout tree, by node name."""
+
+    __slots__ = ('boxes',)
+
+    def __init__(self, boxes: dict):
+        self.boxes = boxes
+
+    def __getitem__(self, name: str) -> tuple:
+        """All boxes of the nodes called `name`, in placement order."""
+        return self.boxes[name]
+
+    def box(self, name: str) -> Box:
+        """The single box of a uniquely named node."""
+        boxes = self.boxes[name]
+        if len(boxes) != 1:
+            raise ValueError(f"Layout has {len(boxes)} boxes named {name!r}")
+        return boxes[0]
+
+
+def _place(node: Node, left: float, top: float, out: dict):
+    if node.name is not None:
+        out.setdefault(node.name, []).append(Box(left, top, node.width, node.height))
+
+    if isinstance(node, Place):
+        _place(node.node, left + node.dx, top + node.dy, out)
+    elif isinstance(node, Row):
+        x = left
+        for child in node.children:
+            _place(child, x, top, out)
+            x = x + child.width + node.gap
+    elif isinstance(node, Column):
+        y = top
+        for child in node.children:
+            _place(child, left, y, out)
+            y = y + child.height + node.gap
+    elif isinstance(node, Grid):
+        step_x = node.cell.width + node.gap_x
+        step_y = node.cell.height + node.gap_y
+        for r in range(node.rows):
+            for c in range(node.columns):
+                _place(node.cell, left + c * step_x, top + r * step_y, out)
+    elif isinstance(node, Stack):
+        for child in node.children:
+            _place(child, left, top, out)
+
+
+@lru_cache(maxsize=4096)
+def solve(node: Node, left: float, top: float) -> Layout:
+    """Place a layout tree with its top-left corner at (left, top).
+
+    Results are shared between callers with the same tree and origin; treat
+    them as read-only.
+    """
+    out = {}
+    _place(node, left, top, out)
+    return Layout({name: tuple(boxes) for name, boxes in out.items()})
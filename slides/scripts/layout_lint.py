@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Lint slide layouts: shapes off the slide, in reserved areas or overlapping.
+
+Builders place boxes with hand-computed offsets, so a changed constant can
+push a box off the slide, into the right margin the template keeps for its
+copyright line, or onto its neighbour. For every slide the bounding boxes of
+its top-level shapes go into an R-tree, bulk-loaded with Sort-Tile-Recursive
+packing, and each shape queries it for the shapes it touches: O(n log n) per
+slide, so long decks and large batches can be linted on every CI build.
+
+Findings:
+
+- out_of_bounds: a shape reaches past the slide's edges
+- reserved: a shape other than the template's placeholders reaches into a
+  reserved area (SlideGenerator.reserved_areas(): by default the right
+  margin, MARGIN_RIGHT wide)
+- overlap: two shapes overlap without one containing the other, or text
+  lies on text
+- covered: a shape lies entirely under an opaque one (fill, picture, chart,
+  table) drawn after it
+
+Stacking is fine: a shape inside another one drawn before it (text on a card,
+a badge on a panel) is not reported. Connectors are only checked against the
+slide's edges, and overlaps thinner than TOLERANCE are ignored, so boxes that
+share an edge do not count. Groups count as one shape.
+
+Usage:
+    uv run python slides/scripts/layout_lint.py <deck_or_dir>... [--generator module:Class]
+        [--reserved NAME=LEFT,TOP,WIDTH,HEIGHT ...] [--no-reserved] [--workers N] [--json FILE]
+
+Directories are linted deck by deck (*.pptx, recursively), across a process
+pool when there are several. Exits with status 1 if anything is found.
+
+Example:
+    uv run python slides/scripts/layout_lint.py slides/output --generator generate_warehouse_proposal:WarehouseProposalGenerator
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import NamedTuple
+
+from batch_generate import load_generator
+from theme_registry import NS_A, NS_P, RT_OFFICE_DOCUMENT, read_id_list, read_rels, rel_target
+
+DEFAULT_GENERATOR = 'generate_pptx:SlideGenerator'
+
+EMU_PER_INCH = 914400
+
+# Overlaps and overhangs up to this many inches are ignored (shared edges, rounding)
+TOLERANCE = 0.01
+
+_KINDS = {NS_P + 'sp': 'box', NS_P + 'pic': 'picture', NS_P + 'graphicFrame': 'chart',
+          NS_P + 'grpSp': 'group', NS_P + 'cxnSp': 'connector'}
+_FILLS = tuple(NS_A + tag for tag in ('solidFill', 'gradFill', 'blipFill', 'pattFill'))
+
+
+class Shape(NamedTuple):
+    """A top-level shape's bounding box in inches, in paint order."""
+
+    name: str
+    kind: str  # 'box', 'text', 'picture', 'chart', 'table', 'group' or 'connector'
+    left: float
+    top: float
+    width: float
+    height: float
+    opaque: bool  # hides what is drawn under it
+    text: bool  # has visible text
+    placeholder: bool
+
+    @property
+    def right(self) -> float:
+        return self.left + self.width
+
+    @property
+    def bottom(self) -> float:
+        return self.top + self.height
+
+
+class Finding(NamedTuple):
+    slide: int
+    kind: str  # 'out_of_bounds', 'reserved', 'overlap' or 'covered'
+    shape: str
+    other: str  # the other shape or the reserved area, or None
+    detail: str
+
+
+class SpatialIndex:
+    """A static R-tree over (left, top, right, bottom) rectangles, bulk-loaded by Sort-Tile-Recursive.
+
+    Building sorts the rectangles once per level, O(n log n); a query visits
+    O(log n) nodes plus the ones holding matches.
+    """
+
+    NODE_CAPACITY = 8
+
+    def __init__(self, rects):
+        # Nodes are (bounds, children); leaf entries are (bounds, index into rects)
+        level = [(tuple(rect), i) for i, rect in enumerate(rects)]
+        while len(level) > self.NODE_CAPACITY:
+            level = self._pack(level)
+        self.root = (self._union(level), level) if level else None
+
+    @staticmethod
+    def _union(entries) -> tuple:
+        return (min(e[0][0] for e in entries), min(e[0][1] for e in entries),
+                max(e[0][2] for e in entries), max(e[0][3] for e in entries))
+
+    def _pack(self, entries) -> list:
+        """Group entries into parent nodes: vertical slices by x centre, then runs by y centre."""
+        capacity = self.NODE_CAPACITY
+        nodes = math.ceil(len(entries) / capacity)
+        slice_size = math.ceil(math.sqrt(nodes)) * capacity
+        entries = sorted(entries, key=lambda e: e[0][0] + e[0][2])
+        parents = []
+        for i in range(0, len(entries), slice_size):
+            column = sorted(entries[i:i + slice_size], key=lambda e: e[0][1] + e[0][3])
+            for j in range(0, len(column), capacity):
+                children = column[j:j + capacity]
+                parents.append((self._union(children), children))
+        return parents
+
+    def query(self, rect) -> list:
+        """Indexes of the rectangles whose interiors intersect rect."""
+        if self.root is None:
+            return []
+        left, top, right, bottom = rect
+        found = []
+        stack = [self.root]
+        while stack:
+            _bounds, children = stack.pop()
+            for bounds, child in children:
+                if bounds[0] < right and left < bounds[2] and bounds[1] < bottom and top < bounds[3]:
+                    if isinstance(child, int):
+                        found.append(child)
+                    else:
+                        stack.append((bounds, child))
+        return found
+
+
+def _bounds(xfrm):
+    """(left, top, width, height) inches of an a:xfrm, widened to the box a rotation sweeps."""
+    off, ext = xfrm.find(NS_A + 'off'), xfrm.find(NS_A + 'ext')
+    if off is None or ext is None:
+        return None
+    left, top = int(off.get('x', 0)) / EMU_PER_INCH, int(off.get('y', 0)) / EMU_PER_INCH
+    width, height = int(ext.get('cx', 0)) / EMU_PER_INCH, int(ext.get('cy', 0)) / EMU_PER_INCH
+    rotation = int(xfrm.get('rot', 0)) / 60000
+    if rotation % 180:
+        angle = math.radians(rotation)
+        rotated_w = abs(width * math.cos(angle)) + abs(height * math.sin(angle))
+        rotated_h = abs(width * math.sin(angle)) + abs(height * math.cos(angle))
+        left, top = left + (width - rotated_w) / 2, top + (height - rotated_h) / 2
+        width, height = rotated_w, rotated_h
+    return left, top, width, height
+
+
+def _has_text(el) -> bool:
+    return any(t.text and t.text.strip() for t in el.iter(NS_A + 't'))
+
+
+def read_shapes(sld) -> list:
+    """The top-level shapes of a p:sld element (ElementTree or lxml) with a position of their own."""
+    sp_tree = sld.find(f'{NS_P}cSld/{NS_P}spTree')
+    shapes = []
+    for child in sp_tree if sp_tree is not None else ():
+        kind = _KINDS.get(child.tag)
+        if kind is None:
+            continue
+        c_nv_pr = child.find(f'./*/{NS_P}cNvPr')
+        placeholder = child.find(f'./*/{NS_P}nvPr/{NS_P}ph') is not None
+        if kind == 'group':
+            xfrm = child.find(f'{NS_P}grpSpPr/{NS_A}xfrm')
+        elif kind == 'chart':
+            xfrm = child.find(NS_P + 'xfrm')
+        else:
+            xfrm = child.find(f'{NS_P}spPr/{NS_A}xfrm')
+        bounds = _bounds(xfrm) if xfrm is not None else None
+        if bounds is None:
+            # Placeholders without a transform sit where their layout puts them
+            continue
+
+        opaque = kind in ('picture', 'chart')
+        if kind == 'chart' and child.find(f'{NS_A}graphic/{NS_A}graphicData/{NS_A}tbl') is not None:
+            kind = 'table'
+        elif kind == 'box':
+            sp_pr = child.find(NS_P + 'spPr')
+            fill_ref = child.find(f'{NS_P}style/{NS_A}fillRef')
+            opaque = (any(sp_pr.find(tag) is not None for tag in _FILLS)
+                      or (sp_pr.find(NS_A + 'noFill') is None and fill_ref is not None
+                          and fill_ref.get('idx', '0') != '0'))
+            c_nv_sp_pr = child.find(f'{NS_P}nvSpPr/{NS_P}cNvSpPr')
+            if c_nv_sp_pr is not None and c_nv_sp_pr.get('txBox') in ('1', 'true'):
+                kind = 'text'
+        shapes.append(Shape(c_nv_pr.get('name', '') if c_nv_pr is not None else '', kind, *bounds,
+                            opaque, kind != 'connector' and _has_text(child), placeholder))
+    return shapes
+
+
+def _contains(outer: Shape, inner: Shape, tolerance: float) -> bool:
+    return (outer.left - tolerance <= inner.left and outer.top - tolerance <= inner.top
+            and inner.right <= outer.right + tolerance and inner.bottom <= outer.bottom + tolerance)
+
+
+def _where(shape: Shape) -> str:
+    return f"({shape.left:.2f}, {shape.top:.2f}) {shape.width:.2f}x{shape.height:.2f}in"
+
+
+def lint_shapes(shapes, number: int, width: float, height: float, reserved=(),
+                tolerance: float = TOLERANCE) -> list:
+    """Findings for one slide's shapes (in paint order) on a width x height inch slide.
+
+    reserved: (name, left, top, width, height) areas in inches.
+    """
+    findings = []
+    for shape in shapes:
+        overhang = max(-shape.left, -shape.top, shape.right - width, shape.bottom - height)
+        if overhang > tolerance:
+            findings.append(Finding(number, 'out_of_bounds', shape.name, None,
+                                    f"{_where(shape)} is {overhang:.2f}in off the {width:g}x{height:g}in slide"))
+        if shape.placeholder:
+            continue
+        for name, left, top, area_w, area_h in reserved:
+            overlap_w = min(shape.right, left + area_w) - max(shape.left, left)
+            overlap_h = min(shape.bottom, top + area_h) - max(shape.top, top)
+            if overlap_w > tolerance and overlap_h > tolerance:
+                findings.append(Finding(number, 'reserved', shape.name, name,
+                                        f"{_where(shape)} reaches {overlap_w:.2f}in into {name}"))
+
+    # Shrunk by the tolerance, so shapes that only share an edge do not meet
+    rects = [(s.left + tolerance, s.top + tolerance, s.right - tolerance, s.bottom - tolerance) for s in shapes]
+    index = SpatialIndex(rects)
+    for i, below in enumerate(shapes):
+        if below.kind == 'connector':
+            continue
+        for j in sorted(index.query(rects[i])):
+            above = shapes[j]
+            if j <= i or above.kind == 'connector':
+                continue
+            if below.text and above.text:
+                findings.append(Finding(number, 'overlap', above.name, below.name,
+                                        f"text {_where(above)} lies on text {_where(below)}"))
+            elif _contains(below, above, tolerance):
+                continue
+            elif _contains(above, below, tolerance):
+                if above.opaque:
+                    findings.append(Finding(number, 'covered', below.name, above.name,
+                                            f"{_where(below)} is hidden under {_where(above)}"))
+            else:
+                findings.append(Finding(number, 'overlap', above.name, below.name,
+                                        f"{_where(above)} partly overlaps {_where(below)}"))
+    return findings
+
+
+def lint_slide(sld, number: int, width: float, height: float, reserved=(), tolerance: float = TOLERANCE) -> list:
+    """Findings for one p:sld element (ElementTree or lxml)."""
+    return lint_shapes(read_shapes(sld), number, width, height, reserved, tolerance)
+
+
+def lint_deck(path, reserved=(), tolerance: float = TOLERANCE) -> list:
+    """Findings for every slide of a .pptx, read with zipfile and ElementTree only."""
+    with zipfile.ZipFile(path) as z:
+        document = rel_target(read_rels(z, ''), RT_OFFICE_DOCUMENT)
+        size = ET.fromstring(z.read(document)).find(NS_P + 'sldSz')
+        width = int(size.get('cx')) / EMU_PER_INCH if size is not None else 10.0
+        height = int(size.get('cy')) / EMU_PER_INCH if size is not None else 7.5
+        document_rels = read_rels(z, document)
+        findings = []
+        for number, rId in enumerate(read_id_list(z, document, NS_P + 'sldIdLst'), 1):
+            sld = ET.fromstring(z.read(document_rels[rId][1]))
+            findings.extend(lint_slide(sld, number, width, height, reserved, tolerance))
+        return findings
+
+
+def collect_decks(paths) -> list:
+    """Expand directories (*.pptx inside, recursively) into decks."""
+    decks = []
+    for path in map(Path, paths):
+        decks.extend(sorted(path.rglob('*.pptx')) if path.is_dir() else [path])
+    return decks
+
+
+def parse_reserved(value: str) -> tuple:
+    """Parse 'NAME=LEFT,TOP,WIDTH,HEIGHT' (inches) into a reserved area."""
+    name, _, numbers = value.partition('=')
+    try:
+        left, top, width, height = (float(n) for n in numbers.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected NAME=LEFT,TOP,WIDTH,HEIGHT, got {value!r}") from None
+    return name, left, top, width, height
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lint slide layouts for off-slide, reserved-area and overlapping shapes')
+    parser.add_argument('decks', nargs='+', help='.pptx files or directories of them')
+    parser.add_argument('--generator', '-g', default=DEFAULT_GENERATOR,
+                        help=f'Generator class whose reserved areas to check, as module:Class (default: {DEFAULT_GENERATOR})')
+    parser.add_argument('--reserved', type=parse_reserved, action='append', default=None,
+                        metavar='NAME=LEFT,TOP,WIDTH,HEIGHT', help="Reserved area in inches, instead of the generator's")
+    parser.add_argument('--no-reserved', action='store_true', help='Do not check reserved areas')
+    parser.add_argument('--workers', '-j', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--json', default=None, metavar='FILE', help='Also write the findings as JSON')
+    args = parser.parse_args()
+
+    if args.no_reserved:
+        reserved = []
+    elif args.reserved:
+        reserved = args.reserved
+    else:
+        reserved = load_generator(args.generator).reserved_areas()
+
+    start = time.perf_counter()
+    decks = collect_decks(args.decks)
+    workers = min((os.cpu_count() or 1) if args.workers is None else args.workers, len(decks))
+    if workers <= 1:
+        findings = [lint_deck(deck, reserved) for deck in decks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            findings = list(pool.map(lint_deck, decks, repeat(reserved)))
+    results = dict(zip(map(str, decks), findings))
+    seconds = time.perf_counter() - start
+
+    total = 0
+    for deck, findings in results.items():
+        for f in findings:
+            other = f" / {f.other}" if f.other else ''
+            print(f"{deck} slide {f.slide}: {f.kind}: {f.shape}{other}: {f.detail}")
+        total += len(findings)
+    print(f"{total} finding(s) in {len(results)} deck(s) ({seconds:.2f}s)")
+
+    if args.json:
+        report = {deck: [f._asdict() for f in findings] for deck, findings in results.items()}
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    if total:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Prune template parts a generated deck does not use.
+
+delete_all_slides() removes the template's sample slides, but every layout,
+master and embedded image of the template still ships in each output deck.
+slim_presentation() drops
+
+- slide layouts no slide is based on (unless allow-listed)
+- slide masters left without any layout (the first master is always kept)
+- media relationships whose rId is no longer referenced from the part's XML
+
+python-pptx only writes parts reachable from the package relationships, so
+once those relationships are gone the layouts, masters, their themes and any
+media only they used are left out of the saved file.
+"""
+
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.package import XmlPart
+
+MEDIA_RELTYPES = {RT.IMAGE, RT.MEDIA, RT.VIDEO, RT.AUDIO}
+
+_R_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+
+def _referenced_rids(part) -> set:
+    """All r:* attribute values in a part's XML (r:id, r:embed, r:link, ...)."""
+    return set(part._element.xpath(f'//@*[namespace-uri()="{_R_NS}"]'))
+
+
+def _part_kind(part) -> str:
+    name = str(part.partname)
+    if name.startswith('/ppt/slideLayouts/'):
+        return 'layouts'
+    if name.startswith('/ppt/slideMasters/'):
+        return 'masters'
+    if name.startswith('/ppt/theme/'):
+        return 'themes'
+    if name.startswith('/ppt/media/'):
+        return 'media'
+    return 'other'
+
+
+def slim_presentation(prs, keep_layouts=()) -> dict:
+    """Drop unused layouts, masters and media from prs in place.
+
+    Args:
+        prs: the Presentation to slim.
+        keep_layouts: layout names, or indices into prs.slide_layouts, to keep even if unused.
+
+    Returns:
+        Counts of removed parts by kind, plus the media bytes saved.
+    """
+    package = prs.part.package
+    parts_before = set(package.iter_parts())
+    keep_layouts = set(keep_layouts)
+
+    used_layouts = {slide.part.slide_layout.part for slide in prs.slides}
+
+    # Layout indices of the allow-list refer to the first master's layouts
+    first_master_layouts = list(prs.slide_layouts)
+    kept_by_index = {layout.part for i, layout in enumerate(first_master_layouts) if i in keep_layouts}
+
+    masters = list(prs.slide_masters)
+    for master in masters:
+        sldLayoutIdLst = master._element.get_or_add_sldLayoutIdLst()
+        for sldLayoutId in list(sldLayoutIdLst.sldLayoutId_lst):
+            layout_part = master.part.related_slide_layout(sldLayoutId.rId).part
+            if layout_part in used_layouts or layout_part in kept_by_index:
+                continue
+            if layout_part.slide_layout.name in keep_layouts:
+                continue
+            sldLayoutIdLst.remove(sldLayoutId)
+            master.part.drop_rel(sldLayoutId.rId)
+
+    sldMasterIdLst = prs.part._element.get_or_add_sldMasterIdLst()
+    for i, sldMasterId in enumerate(list(sldMasterIdLst.sldMasterId_lst)):
+        master = masters[i]
+        if i == 0 or len(master.slide_layouts) > 0:
+            continue
+        sldMasterIdLst.remove(sldMasterId)
+        prs.part.drop_rel(sldMasterId.rId)
+
+    for part in package.iter_parts():
+        if not isinstance(part, XmlPart):
+            continue
+        media_rids = [rId for rId, rel in part.rels.items()
+                      if rel.reltype in MEDIA_RELTYPES and not rel.is_external]
+        if not media_rids:
+            continue
+        referenced = _referenced_rids(part)
+        for rId in media_rids:
+            if rId not in referenced:
+                part.rels.pop(rId)
+
+    removed = parts_before - set(package.iter_parts())
+    stats = {'layouts': 0, 'masters': 0, 'themes': 0, 'media': 0, 'other': 0, 'media_bytes': 0}
+    for part in removed:
+        kind = _part_kind(part)
+        stats[kind] += 1
+        if kind == 'media':
+            stats['media_bytes'] += len(part.blob)
+    return stats
@@ -0,0 +1,240 @@
+"""
+Stream a presentation package into any writable binary sink.
+
+python-pptx saves through zipfile with one compression level for every part and
+compresses them one after another. write_package() instead
+
+- writes to anything with a write() method (an HTTP response, sys.stdout.buffer,
+  io.BytesIO) without seeking, temp files or a second pass
+- picks a compression level per part: already-compressed media is stored as-is,
+  XML is deflated at a configurable level
+- deflates large parts on a thread pool (zlib releases the GIL), while parts are
+  still written in package order
+
+ZipStreamWriter is the underlying write-only zip writer; it also accepts members
+that were compressed earlier, so callers can reuse compressed bytes across decks.
+"""
+
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from zipfile import ZIP_DEFLATED, ZIP_STORED
+
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from pptx.opc.serialized import _ContentTypesItem
+
+STORED = 0
+
+# Compression level by part extension or content type (0 stores the part as-is)
+DEFAULT_COMPRESSION = {
+    'png': STORED,
+    'jpg': STORED,
+    'jpeg': STORED,
+    'gif': STORED,
+    'tif': STORED,
+    'tiff': STORED,
+    'wdp': STORED,
+    'mp3': STORED,
+    'm4a': STORED,
+    'mp4': STORED,
+    'm4v': STORED,
+    'mov': STORED,
+    'xlsx': STORED,
+    'docx': STORED,
+}
+DEFAULT_LEVEL = 6
+
+# Parts at least this large are deflated on the thread pool
+PARALLEL_THRESHOLD = 64 * 1024
+
+# Fixed member timestamp (1980-01-01 00:00) keeps output byte-for-byte reproducible
+_DOS_TIME = 0
+_DOS_DATE = (1 << 5) | 1
+
+_ZIP64_LIMIT = 0xFFFFFFFF
+_ZIP64_COUNT_LIMIT = 0xFFFF
+
+
+class CompressedMember:
+    """A zip member's payload, already compressed."""
+
+    __slots__ = ('name', 'method', 'crc', 'size', 'data')
+
+    def __init__(self, name: str, method: int, crc: int, size: int, data: bytes):
+        self.name = name
+        self.method = method
+        self.crc = crc
+        self.size = size
+        self.data = data
+
+
+def compress_member(name: str, blob: bytes, level: int = DEFAULT_LEVEL) -> CompressedMember:
+    """Compress one member: stored when level is 0, raw deflate otherwise."""
+    crc = zlib.crc32(blob)
+    if level == STORED:
+        return CompressedMember(name, ZIP_STORED, crc, len(blob), blob)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    data = compressor.compress(blob) + compressor.flush()
+    return CompressedMember(name, ZIP_DEFLATED, crc, len(blob), data)
+
+
+class ZipStreamWriter:
+    """Write-only zip writer that never seeks, so any binary sink will do."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._offset = 0
+        self._central = []
+        self._closed = False
+
+    @property
+    def bytes_written(self) -> int:
+        return self._offset
+
+    def _write(self, data: bytes):
+        self._stream.write(data)
+        self._offset += len(data)
+
+    def write(self, name: str, blob: bytes, level: int = DEFAULT_LEVEL):
+        """Compress and append one member."""
+        self.write_compressed(compress_member(name, blob, level))
+
+    def write_compressed(self, member: CompressedMember):
+        """Append a member whose payload was compressed earlier."""
+        encoded_name = member.name.encode('utf-8')
+        flags = 0 if member.name.isascii() else 0x800
+        csize, usize = len(member.data), member.size
+        offset = self._offset
+
+        zip64 = csize >= _ZIP64_LIMIT or usize >= _ZIP64_LIMIT
+        extra = struct.pack('<HHQQ', 0x0001, 16, usize, csize) if zip64 else b''
+        version = 45 if zip64 else 20
+        header = struct.pack(
+            '<IHHHHHIIIHH', 0x04034B50, version, flags, member.method, _DOS_TIME, _DOS_DATE,
+            member.crc, _ZIP64_LIMIT if zip64 else csize, _ZIP64_LIMIT if zip64 else usize,
+            len(encoded_name), len(extra),
+        )
+        self._write(header + encoded_name + extra)
+        self._write(member.data)
+        self._central.append((encoded_name, flags, member.method, member.crc, csize, usize, offset))
+
+    def close(self):
+        """Write the central directory; the sink itself is left open."""
+        if self._closed:
+            return
+        self._closed = True
+
+        cd_offset = self._offset
+        for encoded_name, flags, method, crc, csize, usize, offset in self._central:
+            fields = []
+            if usize >= _ZIP64_LIMIT:
+                fields.append(usize)
+            if csize >= _ZIP64_LIMIT:
+                fields.append(csize)
+            if offset >= _ZIP64_LIMIT:
+                fields.append(offset)
+            extra = struct.pack('<HH', 0x0001, 8 * len(fields)) + struct.pack(f'<{len(fields)}Q', *fields) \
+                if fields else b''
+            version = 45 if fields else 20
+            header = struct.pack(
+                '<IHHHHHHIIIHHHHHII', 0x02014B50, version, version, flags, method, _DOS_TIME, _DOS_DATE,
+                crc, min(csize, _ZIP64_LIMIT), min(usize, _ZIP64_LIMIT), len(encoded_name), len(extra),
+                0, 0, 0, 0, min(offset, _ZIP64_LIMIT),
+            )
+            self._write(header + encoded_name + extra)
+        cd_size = self._offset - cd_offset
+        count = len(self._central)
+
+        if count >= _ZIP64_COUNT_LIMIT or cd_offset >= _ZIP64_LIMIT or cd_size >= _ZIP64_LIMIT:
+            zip64_offset = self._offset
+            self._write(struct.pack('<IQHHIIQQQQ', 0x06064B50, 44, 45, 45, 0, 0,
+                                    count, count, cd_size, cd_offset))
+            self._write(struct.pack('<IIQI', 0x07064B50, 0, zip64_offset, 1))
+        self._write(struct.pack(
+            '<IHHHHIIH', 0x06054B50, 0, 0, min(count, _ZIP64_COUNT_LIMIT), min(count, _ZIP64_COUNT_LIMIT),
+            min(cd_size, _ZIP64_LIMIT), min(cd_offset, _ZIP64_LIMIT), 0,
+        ))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+
+def compression_level(partname: str, content_type: str = None, compression: dict = None) -> int:
+    """Level for a member: content-type entry, then extension entry, then the '*' default."""
+    compression = DEFAULT_COMPRESSION if compression is None else compression
+    if content_type is not None and content_type in compression:
+        return compression[content_type]
+    ext = partname.rsplit('.', 1)[-1].lower()
+    if ext in compression:
+        return compression[ext]
+    return compression.get('*', DEFAULT_LEVEL)
+
+
+def iter_package_members(package, extra_parts=()):
+    """Yield (membername, content_type, blob_fn) in the order python-pptx writes them.
+
+    extra_parts are parts already written elsewhere (no longer in the package)
+    that [Content_Types].xml must still cover; they are not yielded themselves.
+    """
+    parts = tuple(package.iter_parts())
+    yield (CONTENT_TYPES_URI.membername, CT.XML,
+           lambda: serialize_part_xml(_ContentTypesItem.xml_for(parts + tuple(extra_parts))))
+    yield PACKAGE_URI.rels_uri.membername, CT.OPC_RELATIONSHIPS, lambda: package._rels.xml
+    for part in parts:
+        yield part.partname.membername, part.content_type, lambda part=part: part.blob
+        if part._rels:
+            yield part.partname.rels_uri.membername, CT.OPC_RELATIONSHIPS, lambda part=part: part.rels.xml
+
+
+def _resolve(item) -> CompressedMember:
+    return item.result() if isinstance(item, Future) else item
+
+
+def _ready(item) -> bool:
+    return not isinstance(item, Future) or item.done()
+
+
+def write_package(package, stream, compression: dict = None, threads: int = None,
+                  parallel_threshold: int = PARALLEL_THRESHOLD) -> int:
+    """Write a python-pptx package as a .pptx into a binary stream.
+
+    Args:
+        package: prs.part.package of the presentation to write.
+        stream: any object with write(bytes); it is not seeked or closed.
+        compression: {extension or content type: level}; '*' sets the default level.
+            Defaults to DEFAULT_COMPRESSION (media stored, everything else level 6).
+        threads: deflate threads for large parts (default: ThreadPoolExecutor's default count).
+        parallel_threshold: blob size from which a part is deflated on the pool.
+
+    Returns:
+        Number of bytes written.
+    """
+    members = [
+        (name, blob_fn, compression_level(name, content_type, compression))
+        for name, content_type, blob_fn in iter_package_members(package)
+    ]
+
+    threads = threads or min(32, (os.cpu_count() or 1) + 4)
+    window = 4 * threads
+    with ZipStreamWriter(stream) as writer, ThreadPoolExecutor(max_workers=threads) as pool:
+        pending = deque()
+        for name, blob_fn, level in members:
+            blob = blob_fn()
+            if level != STORED and len(blob) >= parallel_threshold:
+                pending.append(pool.submit(compress_member, name, blob, level))
+            else:
+                pending.append(compress_member(name, blob, level))
+            # Flush finished members in package order, keeping a bounded window in flight
+            while pending and (len(pending) > window or _ready(pending[0])):
+                writer.write_compressed(_resolve(pending.popleft()))
+        while pending:
+            writer.write_compressed(_resolve(pending.popleft()))
+    return writer.bytes_written
@@ -0,0 +1,256 @@
+"""
+Build the slides of one deck across worker processes.
+
+python-pptx objects cannot be shared between processes, so a deck is normally
+built one slide after another on one core. build_parallel() hands slide jobs
+(a builder method, or record_slide() for one record) to a process pool
+instead. Each worker sets up a generator like the caller's once, from the
+cached template snapshot, and for every job:
+
+1. runs the builder and resolves its images
+2. exports each slide it added as its serialised XML plus its relationships;
+   a relationship points at an external URL, a template part (by partname) or
+   a part the job created (media, charts, notes), which is exported the same
+   way, recursively
+3. deletes the slides again, so a worker's memory stays flat
+
+The parent adds the exported slides to its presentation in job order, as
+SlideStreamWriter.add_slide() does, with their exact rIds. New parts get
+partnames numbered on from the ones already in the package, the way
+python-pptx numbers them in a sequential build, so a parallel build writes the
+same package as generate_all() without workers. Media is de-duplicated by
+content.
+
+Jobs go out in contiguous chunks, CHUNKS_PER_WORKER per worker, and the
+parent assembles each chunk while the workers build the next ones. Worker
+events (template load, one 'slide' span per job) are added to the generator's
+metrics with a worker=pid field, on the parent's clock.
+
+A job builds from the generator's state as worker_state() returns it; a
+builder that relies on state another builder sets up will not see it.
+"""
+
+import hashlib
+import math
+import os
+import re
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.constants import RELATIONSHIP_TARGET_MODE as RTM
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.package import PartFactory, _Relationship
+from pptx.opc.packuri import PackURI
+from pptx.parts.slide import SlidePart
+
+from slide_cache import builder_fingerprint, load_slide_xml
+
+# Chunks of jobs per worker: enough to balance uneven slides, few enough to keep pickling cheap
+CHUNKS_PER_WORKER = 4
+
+_TRAILING_NUMBER = re.compile(r'\d*(\.\w+)$')
+
+# Per-process state set up by _init_worker
+_worker = {}
+
+
+def _init_worker(generator_cls, template_path: str, state: dict):
+    """Set up a generator with the caller's state on a fresh copy of the template."""
+    if tracemalloc.is_tracing():
+        # Forked from a parent that tracks memory; workers are not tracked
+        tracemalloc.stop()
+    gen = generator_cls(template_path)
+    gen.__dict__.update(state)
+    gen.load_template()
+    gen.delete_all_slides()
+    _worker['gen'] = gen
+    _worker['template'] = {id(part) for part in gen.prs.part.package.iter_parts()}
+
+
+def _export(part, template: set, seen: set):
+    """A part as ('template', partname), ('seen', partname) or ('part', partname, content type, blob, rels).
+
+    rels are (rId, reltype, is_external, URL or exported target part) tuples.
+    """
+    partname = str(part.partname)
+    if id(part) in template:
+        return 'template', partname
+    if partname in seen:
+        return 'seen', partname
+    seen.add(partname)
+    rels = [
+        (rId, rel.reltype, rel.is_external,
+         rel.target_ref if rel.is_external else _export(rel.target_part, template, seen))
+        for rId, rel in part.rels.items()
+    ]
+    return 'part', partname, part.content_type, part.blob, rels
+
+
+def _build(chunk) -> tuple:
+    """Run a chunk of jobs; returns (pid, metrics epoch, events, slot defaults, exported slides per job)."""
+    gen = _worker['gen']
+    outputs = []
+    for number, method_name, args, fields in chunk:
+        with gen.metrics.span('slide', method_name, number=number, **fields) as event:
+            getattr(gen, method_name)(*args)
+            gen.resolve_images()
+
+        seen = set()
+        exported = []
+        for slide in gen.prs.slides:
+            boxes = [box[1:] for box in gen.text_boxes if box[0] is slide.part]
+            exported.append((_export(slide.part, _worker['template'], seen), boxes))
+        slides = list(gen.prs.slides)
+        event.update(slides=len(slides), shapes=sum(len(slide.shapes) for slide in slides),
+                     xml_bytes=sum(len(item[0][3]) for item in exported))
+        outputs.append(exported)
+
+        gen.delete_all_slides()
+        gen.text_boxes.clear()
+
+    events, gen.metrics.events = gen.metrics.events, []
+    return os.getpid(), gen.metrics._epoch, events, dict(gen.slot_defaults), outputs
+
+
+class _Assembler:
+    """Add exported slides to a presentation, numbering their new parts on from its own."""
+
+    def __init__(self, prs):
+        self.prs = prs
+        self.package = prs.part.package
+        self.parts = {str(part.partname): part for part in self.package.iter_parts()}
+        self._names = set(self.parts)
+        # partname pattern ('/ppt/media/image%d.png') -> next number to try
+        self._numbers = {}
+        # (content type, sha1) -> media part already added
+        self._media = {}
+        sldIdLst = prs.part._element.get_or_add_sldIdLst()
+        self._next_id = max([255] + [int(sldId.id) for sldId in sldIdLst]) + 1
+
+    def add_slide(self, exported):
+        """Append an exported slide (and the new parts it uses) to the presentation."""
+        _kind, partname, _content_type, blob, rels = exported
+        layout = next(self.parts[target[1]] for _rId, reltype, _external, target in rels
+                      if reltype == RT.SLIDE_LAYOUT)
+        prs_part = self.prs.part
+        slide_part = SlidePart.new(prs_part._next_slide_partname, self.package, layout)
+        # A brand-new part cannot match an existing relationship, so skip relate_to()'s search
+        rId = prs_part.rels._add_relationship(RT.SLIDE, slide_part)
+        prs_part._element.get_or_add_sldIdLst()._add_sldId(id=self._next_id, rId=rId)
+        self._next_id += 1
+
+        load_slide_xml(slide_part, blob)
+        self._relate(slide_part, rels, {partname: slide_part})
+        return slide_part.slide
+
+    def restore_slide(self, layout_index: int, slide_xml: bytes):
+        """Append a slide from a SlideCache entry (its only relationship is its layout)."""
+        layout = self.prs.slide_layouts[layout_index].part
+        rels = [('rId1', RT.SLIDE_LAYOUT, False, ('template', str(layout.partname)))]
+        return self.add_slide(('part', None, CT.PML_SLIDE, slide_xml, rels))
+
+    def _relate(self, part, rels, seen: dict):
+        """Give part exactly the exported relationships, rIds included."""
+        part.rels._rels.clear()
+        for rId, reltype, is_external, target in rels:
+            if not is_external:
+                target = self._import(target, seen)
+            part.rels._rels[rId] = _Relationship(
+                part.partname.baseURI, rId, reltype, RTM.EXTERNAL if is_external else RTM.INTERNAL, target)
+
+    def _import(self, exported, seen: dict):
+        kind, partname = exported[:2]
+        if kind == 'template':
+            return self.parts[partname]
+        if kind == 'seen':
+            return seen[partname]
+
+        _kind, partname, content_type, blob, rels = exported
+        if content_type == CT.PML_NOTES_MASTER:
+            # Created on demand and related to the presentation: use (or create) this package's own
+            part = seen[partname] = self.prs.part.notes_master_part
+            self._names.add(str(part.partname))
+            self._names.update(str(rel.target_part.partname) for rel in part.rels.values() if not rel.is_external)
+            return part
+        key = None
+        if partname.startswith('/ppt/media/'):
+            key = (content_type, hashlib.sha1(blob).digest())
+            part = self._media.get(key)
+            if part is not None:
+                seen[partname] = part
+                return part
+
+        part = PartFactory(self._partname(partname), content_type, self.package, blob)
+        seen[partname] = part
+        if key is not None:
+            self._media[key] = part
+        self._relate(part, rels, seen)
+        return part
+
+    def _partname(self, partname: str) -> PackURI:
+        """The first free partname like partname, numbered on from the last one handed out."""
+        pattern = _TRAILING_NUMBER.sub(r'%d\1', partname)
+        n = self._numbers.get(pattern, 1)
+        while pattern % n in self._names:
+            n += 1
+        self._numbers[pattern] = n + 1
+        self._names.add(pattern % n)
+        return PackURI(pattern % n)
+
+
+def _built(gen, results):
+    """(exported slides, slide event) per built job, in job order, absorbing worker metrics."""
+    for pid, epoch, events, slot_defaults, outputs in results:
+        events = gen.metrics.absorb(events, epoch, worker=pid)
+        gen.slot_defaults.update(slot_defaults)
+        yield from zip(outputs, [event for event in events if event['event'] == 'slide'])
+
+
+def build_parallel(gen, jobs, workers: int, cache=None):
+    """Build jobs in worker processes and add their slides to gen.prs, in job order.
+
+    jobs: (number, method name, args, event fields) tuples; the worker calls
+    getattr(gen, method name)(*args). With a SlideCache, jobs without args
+    whose builder inputs are unchanged are restored here instead. Yields
+    (job, slide event) as each job's slides are added.
+    """
+    assembler = _Assembler(gen.prs)
+    plan = []
+    for job in jobs:
+        fingerprint = entry = None
+        if cache is not None and not job[2]:
+            fingerprint = builder_fingerprint(gen, job[1])
+            entry = cache.get(fingerprint)
+        plan.append((job, fingerprint, entry))
+
+    to_build = [job for job, _fingerprint, entry in plan if entry is None]
+    workers = max(1, min(workers, len(to_build)))
+    size = max(1, math.ceil(len(to_build) / (workers * CHUNKS_PER_WORKER)))
+    chunks = [to_build[i:i + size] for i in range(0, len(to_build), size)]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(type(gen), gen.template_path, gen.worker_state())) as pool:
+        built = _built(gen, pool.map(_build, chunks))
+        for job, fingerprint, entry in plan:
+            number, method_name, _args, fields = job
+            if entry is not None:
+                with gen.metrics.span('slide', method_name, number=number, **fields) as event:
+                    layout_index, slide_xml, boxes = entry
+                    slide = assembler.restore_slide(layout_index, slide_xml)
+                    gen.text_boxes.extend((slide.part, *box) for box in boxes)
+                event.update(shapes=len(slide.shapes), xml_bytes=len(slide.part.blob), cached=True)
+                yield job, event
+                continue
+
+            exported, event = next(built)
+            slides = []
+            for slide_export, boxes in exported:
+                slide = assembler.add_slide(slide_export)
+                gen.text_boxes.extend((slide.part, *box) for box in boxes)
+                slides.append(slide)
+            if cache is not None:
+                event['cached'] = False
+                if fingerprint is not None and len(slides) == 1:
+                    cache.put(fingerprint, gen.prs, slides[0], exported[0][1])
+            yield job, event
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Local render server: keep templates warm and render decks on request.
+
+Every CLI run pays for importing python-pptx, reading the template and
+extracting its theme before the first slide is built, which dominates small
+decks. The server pays that once: worker processes are started and warmed
+(template snapshots parsed, generator classes imported) before it accepts
+connections, and each request only builds and saves its deck.
+
+Endpoints (HTTP/1.1, one request per connection):
+    POST /render   body: design markdown; query: template=NAME, generator=module:Class
+                   -> the .pptx, written back in chunks as the client reads it
+    GET  /metrics  request counts, queue depth and latency percentiles (JSON)
+    GET  /health   "ok"
+
+A worker that dies mid-render (OOM-killed, say) fails its request with 500
+and the pool is restarted and warmed again, so later requests are served as before.
+
+At most --workers decks render at once and up to --queue more wait for a
+worker; past that, requests are refused with 503 and Retry-After instead of
+piling up. Only the templates and generators named on the command line are
+served. It listens on 127.0.0.1 or a Unix socket; nothing leaves the machine.
+
+Usage:
+    uv run python slides/scripts/render_server.py [--port 8765 | --socket PATH] [--workers N] [--queue N]
+        [--template NAME ...] [--generator module:Class ...] [--metrics FILE]
+
+Example:
+    uv run python slides/scripts/render_server.py --generator generate_warehouse_proposal:WarehouseProposalGenerator
+    curl --data-binary @slides/design/2026-01-16_warehouse-system-proposal.md \\
+        'http://127.0.0.1:8765/render?generator=generate_warehouse_proposal:WarehouseProposalGenerator' -o deck.pptx
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from batch_generate import DEFAULT_GENERATOR, load_generator
+from template_cache import load_snapshot
+
+PPTX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+
+# Largest design payload accepted, in bytes
+MAX_BODY = 4 * 1024 * 1024
+
+# Response bytes written per drain(), so slow clients push back on the server
+CHUNK_SIZE = 64 * 1024
+
+# Requests kept for the /metrics percentiles
+LATENCY_WINDOW = 1024
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+# Seconds start() waits for every worker to come up
+WARM_TIMEOUT = 120
+
+# Per-process state set up by _init_worker
+_worker = {}
+
+
+class HTTPError(Exception):
+    """Answer the request with this status and message."""
+
+    def __init__(self, status: int, message: str, headers: dict = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def _init_worker(template_paths, generator_specs, barrier=None):
+    """Parse the templates and import the generators once per worker.
+
+    barrier: a multiprocessing.Barrier for the pool's workers, which _warm() waits on.
+    """
+    for path in template_paths:
+        load_snapshot(path).new_presentation()
+    _worker['generators'] = {spec: load_generator(spec) for spec in generator_specs}
+    _worker['barrier'] = barrier
+
+
+def _warm():
+    """Wait until every worker is warm; a worker blocked here cannot take another _warm() call."""
+    if _worker.get('barrier') is not None:
+        _worker['barrier'].wait(WARM_TIMEOUT)
+    return os.getpid()
+
+
+def render_design(design: bytes, template_path: str, generator_spec: str) -> tuple:
+    """Render one design payload in a worker; returns (pptx bytes, info dict)."""
+    start = time.perf_counter()
+    generator = _worker['generators'][generator_spec]
+    gen = generator(template_path)
+    with tempfile.TemporaryDirectory() as tmp:
+        design_path = Path(tmp) / 'design.md'
+        design_path.write_bytes(design)
+        with contextlib.redirect_stdout(io.StringIO()):
+            gen.generate_design(str(design_path))
+    out = io.BytesIO()
+    gen.save_to_stream(out)
+    info = {
+        'pid': os.getpid(),
+        'slides': len(gen.prs.slides),
+        'render_s': round(time.perf_counter() - start, 6),
+        'phases': gen.metrics.summary()['phases'],
+    }
+    return out.getvalue(), info
+
+
+def percentiles(values) -> dict:
+    """Nearest-rank p50/p95/p99 and max of a list of seconds."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+    return {'p50': rank(50), 'p95': rank(95), 'p99': rank(99), 'max': ordered[-1]}
+
+
+class RenderServer:
+    """Queue design payloads onto a pool of warm worker processes."""
+
+    def __init__(self, templates: dict, generators, workers: int = None, queue: int = 16,
+                 metrics_path: str = None):
+        """
+        Args:
+            templates: {name: template path} that requests may ask for; the first is the default.
+            generators: 'module:Class' specs requests may ask for; the first is the default.
+            workers: worker processes, i.e. decks rendered at once (default: CPU count).
+            queue: requests allowed to wait for a worker before new ones get 503.
+            metrics_path: append one JSON line per request to this file.
+        """
+        self.templates = dict(templates)
+        self.generators = list(generators)
+        self.workers = workers or os.cpu_count() or 1
+        self.queue = queue
+        self.metrics_path = metrics_path
+        self.pool = None
+        self._slots = None
+        # Times the pool was replaced after a worker died
+        self.restarts = 0
+        self.pending = 0
+        self.running = 0
+        self.counts = Counter()
+        self.recent = deque(maxlen=LATENCY_WINDOW)
+
+    async def start(self):
+        """Start and warm the worker pool."""
+        # Fail fast on bad specs, and warm the parent so forked workers inherit it
+        for spec in self.generators:
+            load_generator(spec)
+        for path in self.templates.values():
+            load_snapshot(path)
+
+        self.pool = self._new_pool()
+        self._slots = asyncio.Semaphore(self.workers)
+        pids = await self._warm_pool()
+        return sorted(set(pids))
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        barrier = multiprocessing.Barrier(self.workers)
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(list(self.templates.values()), self.generators, barrier))
+
+    def _warm_pool(self) -> asyncio.Future:
+        """Queue one _warm() per worker on the current pool; the future gives their pids."""
+        loop = asyncio.get_running_loop()
+        # Each _warm() blocks its worker until all have one, so every worker gets exactly one
+        return asyncio.gather(*(loop.run_in_executor(self.pool, _warm) for _ in range(self.workers)))
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        """Replace a pool a dead worker broke (once, however many requests saw it break)."""
+        if self.pool is not broken:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.pool = self._new_pool()
+        self.restarts += 1
+        print(f"Worker died; restarted the pool ({self.restarts} restart(s) so far)")
+        # Queued ahead of any request for the new pool, so its workers start up together now
+        # rather than one by one under the next requests
+        self._warm_pool().add_done_callback(self._warmed)
+
+    def _warmed(self, warming: asyncio.Future):
+        if not warming.cancelled() and warming.exception() is not None:
+            print(f"Warming the restarted pool failed: {warming.exception()!r}")
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one connection (a single request)."""
+        start = time.perf_counter()
+        event = {'event': 'request', 'name': None, 'status': 500}
+        try:
+            method, path, query, body = await self._read_request(reader)
+            event['name'] = path
+            if path == '/render':
+                if method != 'POST':
+                    raise HTTPError(405, 'use POST', {'Allow': 'POST'})
+                blob = await self.render(body, query, event)
+                event['status'] = 200
+                await self._respond(writer, 200, blob, PPTX_CONTENT_TYPE, {
+                    'X-Queue-Seconds': f"{event['queue_s']:.6f}",
+                    'X-Render-Seconds': f"{event['render_s']:.6f}",
+                })
+            elif path == '/metrics' and method == 'GET':
+                event['status'] = 200
+                await self._respond(writer, 200, json.dumps(self.metrics(), indent=2).encode(), 'application/json')
+            elif path == '/health' and method == 'GET':
+                event['status'] = 200
+                await self._respond(writer, 200, b'ok\n', 'text/plain')
+            else:
+                raise HTTPError(404, f'no route for {method} {path}')
+        except HTTPError as e:
+            event['status'] = e.status
+            event['error'] = str(e)
+            await self._respond(writer, e.status, f'{e}\n'.encode(), 'text/plain', e.headers)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            event['status'] = 499
+        except Exception as e:
+            event['error'] = f'{type(e).__name__}: {e}'
+            await self._respond(writer, 500, f"{event['error']}\n".encode(), 'text/plain')
+        finally:
+            event['wall_s'] = round(time.perf_counter() - start, 6)
+            self._record(event)
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def render(self, design: bytes, query: dict, event: dict) -> bytes:
+        """Wait for a worker (or refuse when the queue is full) and render one deck."""
+        template = query.get('template', next(iter(self.templates)))
+        if template not in self.templates:
+            raise HTTPError(404, f'unknown template {template!r}; serving {sorted(self.templates)}')
+        generator = query.get('generator', self.generators[0])
+        if generator not in self.generators:
+            raise HTTPError(404, f'unknown generator {generator!r}; serving {self.generators}')
+        event.update(template=template, generator=generator)
+
+        if self.pending >= self.workers + self.queue:
+            raise HTTPError(503, f'{self.pending} requests in progress, try again', {'Retry-After': '1'})
+        self.pending += 1
+        queued = time.perf_counter()
+        try:
+            async with self._slots:
+                event['queue_s'] = round(time.perf_counter() - queued, 6)
+                self.running += 1
+                pool = self.pool
+                try:
+                    loop = asyncio.get_running_loop()
+                    blob, info = await loop.run_in_executor(
+                        pool, render_design, design, self.templates[template], generator)
+                except BrokenProcessPool:
+                    self._restart(pool)
+                    raise HTTPError(500, 'a worker died while rendering (out of memory?); '
+                                         'the workers were restarted') from None
+                finally:
+                    self.running -= 1
+        finally:
+            self.pending -= 1
+        event.update(info, bytes=len(blob))
+        return blob
+
+    def metrics(self) -> dict:
+        """Counts, queue state and latency percentiles over the last LATENCY_WINDOW requests."""
+        renders = [e for e in self.recent if e['name'] == '/render' and e['status'] == 200]
+        return {
+            'workers': self.workers,
+            'queue': self.queue,
+            'pending': self.pending,
+            'running': self.running,
+            'restarts': self.restarts,
+            'requests': dict(self.counts),
+            'latency_s': {
+                key: percentiles([e[key] for e in renders])
+                for key in ('wall_s', 'queue_s', 'render_s')
+            },
+        }
+
+    def _record(self, event: dict):
+        self.counts[event['status']] += 1
+        self.recent.append(event)
+        if self.metrics_path:
+            with open(self.metrics_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(event, ensure_ascii=False) + '\n')
+        print(f"{event['status']} {event['name']} {event['wall_s'] * 1000:.1f} ms"
+              + (f" ({event['slides']} slides, pid {event['pid']})" if 'slides' in event else ''))
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> tuple:
+        request_line = await reader.readline()
+        try:
+            method, target, _version = request_line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(400, 'malformed request line') from None
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HTTPError(400, 'bad Content-Length') from None
+        if length > MAX_BODY:
+            raise HTTPError(413, f'design payload over {MAX_BODY} bytes')
+        body = await reader.readexactly(length) if length else b''
+
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        return method.upper(), url.path, query, body
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, body: bytes,
+                       content_type: str, headers: dict = None):
+        head = [f'HTTP/1.1 {status} {REASONS.get(status, "")}',
+                f'Content-Type: {content_type}',
+                f'Content-Length: {len(body)}',
+                'Connection: close']
+        head += [f'{name}: {value}' for name, value in (headers or {}).items()]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+        for offset in range(0, len(body), CHUNK_SIZE):
+            writer.write(body[offset:offset + CHUNK_SIZE])
+            await writer.drain()
+        await writer.drain()
+
+
+async def serve(server: RenderServer, host: str = '127.0.0.1', port: int = 8765, socket_path: str = None):
+    """Warm the workers, then serve until cancelled."""
+    pids = await server.start()
+    print(f"Warmed {len(pids)} worker(s): {', '.join(map(str, pids))}")
+    try:
+        if socket_path:
+            listener = await asyncio.start_unix_server(server.handle, socket_path)
+            print(f"Listening on {socket_path}")
+        else:
+            listener = await asyncio.start_server(server.handle, host, port)
+            print(f"Listening on http://{host}:{port}")
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve deck renders from warm worker processes')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='TCP port (default: 8765)')
+    parser.add_argument('--socket', default=None, metavar='PATH', help='Listen on a Unix socket instead')
+    parser.add_argument('--workers', '-j', type=int, default=None,
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--queue', type=int, default=16,
+                        help='Requests that may wait for a worker before 503 (default: 16)')
+    parser.add_argument('--template', '-t', action='append', default=None, metavar='NAME',
+                        help='Template to serve (repeatable; first is the default; default: genda)')
+    parser.add_argument('--generator', '-g', action='append', default=None, metavar='module:Class',
+                        help=f'Generator to serve (repeatable; first is the default; default: {DEFAULT_GENERATOR})')
+    parser.add_argument('--metrics', default=None, metavar='FILE',
+                        help='Append one JSON line per request')
+    args = parser.parse_args()
+
+    templates = {name: f'./slides/templates/{name}.pptx' for name in args.template or ['genda']}
+    server = RenderServer(templates, args.generator or [DEFAULT_GENERATOR], args.workers, args.queue,
+                          args.metrics)
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.socket))
+    except KeyboardInterrupt:
+        print("\nStopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+"""
+Precompiled XML fragments for the SlideGenerator drawing primitives.
+
+Building a shape through python-pptx proxies (fill.solid(), fore_color.rgb,
+adjustments, paragraph fonts) lazily creates each element one call at a time.
+Here every primitive is compiled once: the same styling code runs on a
+detached shape with placeholder values, and the resulting p:sp tree is kept as
+a prototype. Stamping a shape deep-copies the prototype and patches ids,
+geometry, colors, sizes and text straight into the copied elements, so the
+output XML is identical to the proxy path at a fraction of the cost.
+
+The style_* functions are the proxy path; SlideGenerator uses them when
+USE_FRAGMENTS is off, and they define what the fragments look like.
+"""
+
+import copy
+import re
+
+from pptx.dml.color import RGBColor
+from pptx.enum.text import MSO_ANCHOR, PP_ALIGN
+from pptx.oxml.ns import qn
+from pptx.oxml.shapes.autoshape import CT_Shape
+from pptx.oxml.shapes.graphfrm import CT_GraphicalObjectFrame
+from pptx.oxml.text import CT_RegularTextRun
+from pptx.shapes.autoshape import Shape
+from pptx.shapes.graphfrm import GraphicFrame
+from pptx.table import _Cell
+from pptx.util import Emu, Pt
+
+# Compiled fragments by kind, built on first use
+_fragments = {}
+
+_EXT_LST = qn('p:extLst')
+_LINE_BREAKS = re.compile('\n|\v')
+
+_PLACEHOLDER_COLOR = RGBColor(0, 0, 0)
+
+
+def style_rounded_box(shape, fill_color, text: str, font_size: int, font_color):
+    """Apply the add_rounded_box styling to an autoshape through python-pptx proxies."""
+    shape.fill.solid()
+    shape.fill.fore_color.rgb = fill_color
+    shape.line.fill.background()
+
+    if hasattr(shape, 'adjustments') and len(shape.adjustments) > 0:
+        shape.adjustments[0] = 0.1
+
+    if text:
+        tf = shape.text_frame
+        tf.word_wrap = True
+        tf.anchor = MSO_ANCHOR.MIDDLE
+        p = tf.paragraphs[0]
+        p.text = text
+        p.font.size = Pt(font_size)
+        p.font.color.rgb = font_color
+        p.font.bold = True
+        p.alignment = PP_ALIGN.CENTER
+
+
+def style_text_box(txBox, text: str, font_size: int, font_color, bold: bool, align):
+    """Apply the add_text_box styling to a text box through python-pptx proxies."""
+    tf = txBox.text_frame
+    tf.word_wrap = True
+    p = tf.paragraphs[0]
+    p.text = text
+    p.font.size = Pt(font_size)
+    p.font.color.rgb = font_color
+    p.font.bold = bold
+    p.alignment = align
+
+
+def style_multiline_box(shape, font_color, title: str, subtitle: str, title_size: int, subtitle_size: int):
+    """Apply the add_multiline_box title/subtitle paragraphs to a rounded box."""
+    tf = shape.text_frame
+    tf.word_wrap = True
+    tf.anchor = MSO_ANCHOR.MIDDLE
+
+    p = tf.paragraphs[0]
+    p.text = title
+    p.font.size = Pt(title_size)
+    p.font.color.rgb = font_color
+    p.font.bold = True
+    p.alignment = PP_ALIGN.CENTER
+
+    if subtitle:
+        p2 = tf.add_paragraph()
+        p2.text = subtitle
+        p2.font.size = Pt(subtitle_size)
+        p2.font.color.rgb = font_color
+        p2.font.bold = False
+        p2.alignment = PP_ALIGN.CENTER
+
+
+def style_card(shape, fill_color, paragraphs, insets, spacing, align, anchor):
+    """Apply the add_card styling to a rounded box: one paragraph per (text, size, color, bold).
+
+    insets are (left/right, top/bottom) in EMU; spacing is the space before every
+    paragraph after the first, as a Length (0 for none).
+    """
+    style_rounded_box(shape, fill_color, '', 10, fill_color)
+    tf = shape.text_frame
+    tf.word_wrap = True
+    tf.vertical_anchor = anchor
+    tf.margin_left = tf.margin_right = insets[0]
+    tf.margin_top = tf.margin_bottom = insets[1]
+    for i, (text, font_size, font_color, bold) in enumerate(paragraphs):
+        p = tf.paragraphs[0] if i == 0 else tf.add_paragraph()
+        p.text = text
+        if i and spacing:
+            p.space_before = spacing
+        p.font.size = Pt(font_size)
+        p.font.color.rgb = font_color
+        p.font.bold = bold
+        p.alignment = align
+
+
+def style_table_cell(cell, fill_color, text: str, font_size: int, font_color, bold: bool, align):
+    """Apply the add_table cell styling to a table cell through python-pptx proxies."""
+    cell.fill.solid()
+    cell.fill.fore_color.rgb = fill_color
+    cell.vertical_anchor = MSO_ANCHOR.MIDDLE
+    p = cell.text_frame.paragraphs[0]
+    p.text = text
+    p.alignment = align
+    for run in p.runs:
+        run.font.size = Pt(font_size)
+        run.font.bold = bold
+        run.font.color.rgb = font_color
+
+
+def _path_to(root, node) -> tuple:
+    """Child-index path from root down to node."""
+    path = []
+    while node is not root:
+        parent = node.getparent()
+        path.append(parent.index(node))
+        node = parent
+    return tuple(reversed(path))
+
+
+def _walk(root, path):
+    node = root
+    for i in path:
+        node = node[i]
+    return node
+
+
+class _Fragment:
+    """A prototype p:sp tree plus the paths of the elements stamping patches."""
+
+    def __init__(self, sp, basename: str, paragraphs: int = 0):
+        self.sp = sp
+        self.basename = basename
+        nodes = {
+            'cNvPr': sp.nvSpPr.cNvPr,
+            'off': sp.spPr.xfrm.off,
+            'ext': sp.spPr.xfrm.ext,
+        }
+        fill = sp.spPr.find('{*}solidFill')
+        if fill is not None:
+            nodes['fill'] = fill[0]
+        self.run = self.br = None
+        if paragraphs:
+            nodes['bodyPr'] = sp.txBody.bodyPr
+        for i, p in enumerate(sp.txBody.p_lst[:paragraphs]):
+            if self.run is None:
+                self.run = copy.deepcopy(p.r_lst[0])
+                self.run.t.text = None
+                self.br = p.makeelement(qn('a:br'))
+            pPr = p.pPr
+            nodes[f'p{i}'] = p
+            nodes[f'pPr{i}'] = pPr
+            nodes[f'defRPr{i}'] = pPr.defRPr
+            nodes[f'color{i}'] = pPr.defRPr.find('{*}solidFill')[0]
+        self.paths = {name: _path_to(sp, node) for name, node in nodes.items()}
+
+    def stamp(self, shapes, x: int, y: int, cx: int, cy: int):
+        """Copy the prototype with a fresh shape id and the given geometry."""
+        sp = copy.deepcopy(self.sp)
+        nodes = {name: _walk(sp, path) for name, path in self.paths.items()}
+        id_ = _next_shape_id(shapes)
+        cNvPr = nodes['cNvPr']
+        cNvPr.set('id', str(id_))
+        cNvPr.set('name', f'{self.basename} {id_ - 1}')
+        nodes['off'].set('x', str(x))
+        nodes['off'].set('y', str(y))
+        nodes['ext'].set('cx', str(cx))
+        nodes['ext'].set('cy', str(cy))
+        return sp, nodes
+
+    def append_text(self, p, text: str):
+        """Append a:r/a:br children for text, as CT_TextParagraph.append_text does."""
+        for idx, r_str in enumerate(_LINE_BREAKS.split(text)):
+            if idx > 0:
+                p.append(copy.copy(self.br))
+            if r_str:
+                r = copy.deepcopy(self.run)
+                r[0].text = CT_RegularTextRun._escape_ctrl_chars(r_str)
+                p.append(r)
+
+
+def _set_paragraph(fragment, nodes, i: int, text: str, font_size, font_color, bold, align=PP_ALIGN.CENTER):
+    """Patch paragraph i of a stamped fragment the way _Paragraph setters would."""
+    p = nodes[f'p{i}']
+    del p[1:]
+    fragment.append_text(p, text)
+    defRPr = nodes[f'defRPr{i}']
+    defRPr.set('sz', str(Pt(font_size).centipoints))
+    if bold is None:
+        defRPr.attrib.pop('b', None)
+    else:
+        defRPr.set('b', '1' if bold else '0')
+    nodes[f'color{i}'].set('val', str(font_color))
+    pPr = nodes[f'pPr{i}']
+    if align is None:
+        pPr.attrib.pop('algn', None)
+    else:
+        pPr.set('algn', PP_ALIGN.to_xml(align))
+
+
+def _new_autoshape():
+    return Shape(CT_Shape.new_autoshape_sp(1, '', 'roundRect', 0, 0, 0, 0), None)
+
+
+def _compile(kind: str) -> _Fragment:
+    """Build the prototype for one primitive variant by running its proxy styling."""
+    color = _PLACEHOLDER_COLOR
+    if kind == 'rounded':
+        shape = _new_autoshape()
+        style_rounded_box(shape, color, '', 10, color)
+        return _Fragment(shape._element, 'Rounded Rectangle')
+    if kind == 'rounded_text':
+        shape = _new_autoshape()
+        style_rounded_box(shape, color, 'x', 10, color)
+        return _Fragment(shape._element, 'Rounded Rectangle', paragraphs=1)
+    if kind in ('multiline', 'multiline_subtitle'):
+        shape = _new_autoshape()
+        style_rounded_box(shape, color, '', 10, color)
+        subtitle = 'x' if kind == 'multiline_subtitle' else ''
+        style_multiline_box(shape, color, 'x', subtitle, 10, 10)
+        return _Fragment(shape._element, 'Rounded Rectangle', paragraphs=2 if subtitle else 1)
+    if kind == 'text':
+        shape = Shape(CT_Shape.new_textbox_sp(1, '', 0, 0, 0, 0), None)
+        style_text_box(shape, 'x', 10, color, True, PP_ALIGN.LEFT)
+        return _Fragment(shape._element, 'TextBox', paragraphs=1)
+    if kind == 'card':
+        # Two paragraphs: the second, with its spacing, is copied for every later one
+        shape = _new_autoshape()
+        style_card(shape, color, [('x', 10, color, True)] * 2, (0, 0), Pt(1), PP_ALIGN.LEFT, MSO_ANCHOR.TOP)
+        return _Fragment(shape._element, 'Rounded Rectangle', paragraphs=2)
+    raise ValueError(f"Unknown fragment kind: {kind}")
+
+
+def _fragment(kind: str) -> _Fragment:
+    fragment = _fragments.get(kind)
+    if fragment is None:
+        fragment = _fragments[kind] = _compile(kind)
+    return fragment
+
+
+def _last_shape(grpSp):
+    """The last child of a shape tree, ignoring a trailing p:extLst."""
+    last = grpSp[-1] if len(grpSp) else None
+    if last is not None and last.tag == _EXT_LST:
+        last = last.getprevious()
+    return last
+
+
+def _next_shape_id(shapes) -> int:
+    """shapes._next_shape_id, without scanning the whole tree for every stamped shape.
+
+    _insert() leaves the next id on the shapes proxy with the element it inserted;
+    while that element is still the last shape, nothing else has been added since.
+    """
+    next_id = getattr(shapes, '_fragment_next_id', None)
+    if next_id is not None and _last_shape(shapes._grpSp) is next_id[1]:
+        return next_id[0]
+    return shapes._next_shape_id
+
+
+def _insert(shapes, sp, proxy=Shape):
+    """Insert a stamped shape element the way add_shape does (before any trailing p:extLst)."""
+    grpSp = shapes._grpSp
+    last = grpSp[-1] if len(grpSp) else None
+    if last is not None and last.tag == _EXT_LST:
+        last.addprevious(sp)
+    else:
+        grpSp.append(sp)
+    shapes._recalculate_extents()
+    # cNvPr is the first child of p:nvSpPr / p:nvGraphicFramePr
+    shapes._fragment_next_id = (int(sp[0][0].get('id')) + 1, sp)
+    # Fragments never carry a p:ph element, so skip BaseShapeFactory's lookup
+    return proxy(sp, shapes)
+
+
+def stamp_rounded_box(shapes, x: int, y: int, cx: int, cy: int, fill_color,
+                      text: str, font_size: int, font_color):
+    """Add a rounded box from its fragment; same XML as add_shape + style_rounded_box."""
+    fragment = _fragment('rounded_text' if text else 'rounded')
+    sp, nodes = fragment.stamp(shapes, x, y, cx, cy)
+    nodes['fill'].set('val', str(fill_color))
+    if text:
+        _set_paragraph(fragment, nodes, 0, text, font_size, font_color, True)
+    return _insert(shapes, sp)
+
+
+def stamp_text_box(shapes, x: int, y: int, cx: int, cy: int, text: str,
+                   font_size: int, font_color, bold: bool, align):
+    """Add a text box from its fragment; same XML as add_textbox + style_text_box."""
+    fragment = _fragment('text')
+    sp, nodes = fragment.stamp(shapes, x, y, cx, cy)
+    _set_paragraph(fragment, nodes, 0, text, font_size, font_color, bold, align)
+    return _insert(shapes, sp)
+
+
+def stamp_multiline_box(shapes, x: int, y: int, cx: int, cy: int, fill_color, title: str,
+                        subtitle: str, font_color, title_size: int, subtitle_size: int):
+    """Add a title/subtitle rounded box from its fragment; same XML as the proxy path."""
+    fragment = _fragment('multiline_subtitle' if subtitle else 'multiline')
+    sp, nodes = fragment.stamp(shapes, x, y, cx, cy)
+    nodes['fill'].set('val', str(fill_color))
+    _set_paragraph(fragment, nodes, 0, title, title_size, font_color, True)
+    if subtitle:
+        _set_paragraph(fragment, nodes, 1, subtitle, subtitle_size, font_color, False)
+    return _insert(shapes, sp)
+
+
+def stamp_card(shapes, x: int, y: int, cx: int, cy: int, fill_color, paragraphs, insets,
+               spacing, align, anchor):
+    """Add a card from its fragment; same XML as add_shape + style_card."""
+    fragment = _fragment('card')
+    sp, nodes = fragment.stamp(shapes, x, y, cx, cy)
+    nodes['fill'].set('val', str(fill_color))
+    bodyPr = nodes['bodyPr']
+    bodyPr.set('anchor', MSO_ANCHOR.to_xml(anchor))
+    bodyPr.set('lIns', str(insets[0]))
+    bodyPr.set('rIns', str(insets[0]))
+    bodyPr.set('tIns', str(insets[1]))
+    bodyPr.set('bIns', str(insets[1]))
+
+    later = nodes['p1']
+    txBody = later.getparent()
+    txBody.remove(later)
+    spcBef = later.pPr.find(qn('a:spcBef'))
+    if spacing:
+        spcBef[0].set('val', str(Emu(spacing).centipoints))
+    else:
+        later.pPr.remove(spcBef)
+    for i, (text, font_size, font_color, bold) in enumerate(paragraphs):
+        if i:
+            p = copy.deepcopy(later)
+            txBody.append(p)
+            defRPr = p.pPr.defRPr
+            nodes.update(p1=p, pPr1=p.pPr, defRPr1=defRPr, color1=defRPr.find('{*}solidFill')[0])
+        _set_paragraph(fragment, nodes, min(i, 1), text, font_size, font_color, bold, align)
+    return _insert(shapes, sp)
+
+
+class _TableFragment:
+    """A prototype table graphicFrame plus a styled cell, copied per table and per cell."""
+
+    def __init__(self):
+        frame = CT_GraphicalObjectFrame.new_table_graphicFrame(1, '', 1, 1, 0, 0, 0, 0)
+        tbl = frame.graphic.graphicData.tbl
+        style_table_cell(_Cell(tbl.tc(0, 0), None), _PLACEHOLDER_COLOR, 'x', 10, _PLACEHOLDER_COLOR, True,
+                         PP_ALIGN.CENTER)
+        tc = tbl.tc(0, 0)
+        p = tc.txBody.p_lst[0]
+        self.run = p.r_lst[0]
+        p.remove(self.run)
+        self.br = p.makeelement(qn('a:br'))
+        self.tc = tc
+        self.tc_paths = {
+            'fill': _path_to(tc, tc.tcPr.find('{*}solidFill')[0]),
+            'p': _path_to(tc, p),
+            'pPr': _path_to(tc, p.pPr),
+        }
+        self.tr = tbl.tr_lst[0]
+        self.tr.remove(tc)
+        tbl.remove(self.tr)
+        self.gridCol = tbl.tblGrid[0]
+        tbl.tblGrid.remove(self.gridCol)
+        self.frame = frame
+        self.frame_paths = {
+            'cNvPr': _path_to(frame, frame.nvGraphicFramePr.cNvPr),
+            'off': _path_to(frame, frame.xfrm.off),
+            'ext': _path_to(frame, frame.xfrm.ext),
+            'tbl': _path_to(frame, tbl),
+        }
+        # (fill, font size, font color, bold, align) -> (styled a:tc, styled a:r)
+        self._styles = {}
+
+    def styled(self, fill_color, font_size, font_color, bold, align) -> tuple:
+        """Prototype cell and run for one cell style, patched once and reused."""
+        key = (str(fill_color), font_size, str(font_color), bold, align)
+        protos = self._styles.get(key)
+        if protos is None:
+            tc = copy.deepcopy(self.tc)
+            _walk(tc, self.tc_paths['fill']).set('val', str(fill_color))
+            _walk(tc, self.tc_paths['pPr']).set('algn', PP_ALIGN.to_xml(align))
+            run = copy.deepcopy(self.run)
+            rPr = run[0]
+            rPr.set('sz', str(Pt(font_size).centipoints))
+            rPr.set('b', '1' if bold else '0')
+            rPr[0][0].set('val', str(font_color))
+            protos = self._styles[key] = (tc, run)
+        return protos
+
+    def cell(self, text: str, fill_color, font_size, font_color, bold, align):
+        """A styled a:tc holding text, as style_table_cell writes it."""
+        tc_proto, run_proto = self.styled(fill_color, font_size, font_color, bold, align)
+        tc = copy.deepcopy(tc_proto)
+        p = _walk(tc, self.tc_paths['p'])
+        for idx, line in enumerate(_LINE_BREAKS.split(text)):
+            if idx > 0:
+                p.append(copy.copy(self.br))
+            if line:
+                r = copy.deepcopy(run_proto)
+                r[1].text = CT_RegularTextRun._escape_ctrl_chars(line)
+                p.append(r)
+        return tc
+
+
+def stamp_table(shapes, x: int, y: int, col_widths, row_heights, cells, font_size: int, align):
+    """Add a native table from the table fragment; same XML as add_table + style_table_cell.
+
+    col_widths and row_heights are in EMU; cells holds one (text, fill, font color, bold)
+    tuple per cell, row by row.
+    """
+    fragment = _fragments.get('table')
+    if fragment is None:
+        fragment = _fragments['table'] = _TableFragment()
+
+    frame = copy.deepcopy(fragment.frame)
+    nodes = {name: _walk(frame, path) for name, path in fragment.frame_paths.items()}
+    id_ = _next_shape_id(shapes)
+    nodes['cNvPr'].set('id', str(id_))
+    nodes['cNvPr'].set('name', f'Table {id_ - 1}')
+    nodes['off'].set('x', str(x))
+    nodes['off'].set('y', str(y))
+    nodes['ext'].set('cx', str(sum(col_widths)))
+    nodes['ext'].set('cy', str(sum(row_heights)))
+
+    tbl = nodes['tbl']
+    tblGrid = tbl[1]
+    for width in col_widths:
+        gridCol = copy.copy(fragment.gridCol)
+        gridCol.set('w', str(width))
+        tblGrid.append(gridCol)
+    for height, row in zip(row_heights, cells):
+        tr = copy.copy(fragment.tr)
+        tr.set('h', str(height))
+        for text, fill_color, font_color, bold in row:
+            tr.append(fragment.cell(text, fill_color, font_size, font_color, bold, align))
+        tbl.append(tr)
+    return _insert(shapes, frame, GraphicFrame)
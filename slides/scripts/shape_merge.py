@@ -0,0 +1,256 @@
+"""
+Fold text boxes into the rounded boxes they sit on.
+
+Decks built from primitives often draw a card as a filled rounded box with
+text boxes laid over it; every slide then carries three shapes where one
+would do, and each costs XML, file size and drawing time in PowerPoint.
+merge_presentation() finds, on each slide, an empty solid-filled roundRect
+and the plain text boxes drawn above it that lie entirely inside it, and
+moves their paragraphs into the rounded box:
+
+- the box's insets are set so its text starts where the first text box's did
+  (counting the text rectangle its corners pull in, as text_metrics does)
+- paragraphs keep their horizontal position through marL/marR
+- the vertical gap to each later text box becomes space before its first
+  paragraph, from the text height text_metrics predicts
+
+A box is left alone when anything else drawn above it overlaps it, when its
+text boxes overlap each other, or when they use anything the move would
+change: fills, outlines, rotation, non-top anchoring or text without an
+explicit color (a shape's text color comes from its style, a text box's
+does not). Vertical positions are as good as the line height prediction;
+SlideGenerator.add_card() draws cards as one shape to begin with.
+"""
+
+import copy
+
+from pptx.oxml.ns import qn
+
+from text_metrics import EMU_PER_INCH, corner_inset, read_paragraphs, round_rect, text_height
+
+_SP = qn('p:sp')
+_SP_PR = qn('p:spPr')
+_TX_BODY = qn('p:txBody')
+_BODY_PR = qn('a:bodyPr')
+_P = qn('a:p')
+_P_PR = qn('a:pPr')
+_R = qn('a:r')
+_RPR = qn('a:rPr')
+_DEF_RPR = qn('a:defRPr')
+_SOLID_FILL = qn('a:solidFill')
+_SPC_BEF = qn('a:spcBef')
+_SPC_PTS = qn('a:spcPts')
+_NO_FILL = qn('a:noFill')
+_LN = qn('a:ln')
+_XFRM_TAGS = (qn('a:xfrm'), qn('p:xfrm'))
+_FILLS = tuple(qn(f'a:{tag}') for tag in ('solidFill', 'gradFill', 'blipFill', 'pattFill', 'grpFill'))
+_PH_PATH = f"*/{qn('p:nvPr')}/{qn('p:ph')}"
+_CNV_SP_PR_PATH = f"{qn('p:nvSpPr')}/{qn('p:cNvSpPr')}"
+_NOT_SHAPES = {qn('p:nvGrpSpPr'), qn('p:grpSpPr'), qn('p:extLst')}
+
+# bodyPr inset defaults (0.1" and 0.05"), in EMU
+_DEFAULT_INSETS = {'lIns': 91440, 'tIns': 45720, 'rIns': 91440, 'bIns': 45720}
+
+# pPr children that come before a:spcBef in schema order
+_BEFORE_SPC_BEF = {qn('a:lnSpc')}
+
+
+def _geometry(el):
+    """(x, y, cx, cy) in EMU of a shape element, or None if it has no own transform or is rotated."""
+    for child in el:
+        if child.tag == _SP_PR or child.tag.endswith('}grpSpPr') or child.tag in _XFRM_TAGS:
+            xfrm = child if child.tag in _XFRM_TAGS else child.find('{*}xfrm')
+            break
+    else:
+        return None
+    if xfrm is None or xfrm.get('rot') not in (None, '0') or xfrm.get('flipH') or xfrm.get('flipV'):
+        return None
+    off, ext = xfrm.find('{*}off'), xfrm.find('{*}ext')
+    if off is None or ext is None:
+        return None
+    return int(off.get('x')), int(off.get('y')), int(ext.get('cx')), int(ext.get('cy'))
+
+
+def _contains(outer, inner) -> bool:
+    return (outer[0] <= inner[0] and outer[1] <= inner[1]
+            and inner[0] + inner[2] <= outer[0] + outer[2] and inner[1] + inner[3] <= outer[1] + outer[3])
+
+
+def _overlaps(a, b) -> bool:
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+def _has_text(txBody) -> bool:
+    return txBody is not None and any(t.text for t in txBody.iter(qn('a:t')))
+
+
+def _is_card(sp) -> bool:
+    """An empty, solid-filled roundRect that is not a placeholder."""
+    if sp.tag != _SP or sp.find(_PH_PATH) is not None or _has_text(sp.find(_TX_BODY)):
+        return False
+    spPr = sp.find(_SP_PR)
+    return round_rect(sp)[0] and spPr.find(_SOLID_FILL) is not None
+
+
+def _colored(p) -> bool:
+    """Whether every run of a paragraph has an explicit color."""
+    pPr = p.find(_P_PR)
+    defRPr = pPr.find(_DEF_RPR) if pPr is not None else None
+    if defRPr is not None and defRPr.find(_SOLID_FILL) is not None:
+        return True
+    for r in p.iterchildren(_R):
+        rPr = r.find(_RPR)
+        if rPr is None or rPr.find(_SOLID_FILL) is None:
+            return False
+    return True
+
+
+def _is_plain_text_box(sp) -> bool:
+    """An unfilled, unoutlined, top-anchored, wrapping text box whose text all has a color."""
+    if sp.tag != _SP or sp.find(_PH_PATH) is not None:
+        return False
+    cNvSpPr = sp.find(_CNV_SP_PR_PATH)
+    txBody = sp.find(_TX_BODY)
+    if cNvSpPr is None or cNvSpPr.get('txBox') not in ('1', 'true') or not _has_text(txBody):
+        return False
+    spPr = sp.find(_SP_PR)
+    if any(spPr.find(tag) is not None for tag in _FILLS):
+        return False
+    ln = spPr.find(_LN)
+    if ln is not None and ln.find(_NO_FILL) is None:
+        return False
+    bodyPr = txBody.find(_BODY_PR)
+    if bodyPr is not None and (bodyPr.get('wrap') == 'none' or bodyPr.get('anchor') not in (None, 't')
+                               or bodyPr.get('vert') not in (None, 'horz') or bodyPr.get('numCol')):
+        return False
+    return all(_colored(p) for p in txBody.iterchildren(_P))
+
+
+def _insets(txBody) -> dict:
+    bodyPr = txBody.find(_BODY_PR)
+    return {name: int(bodyPr.get(name, default)) if bodyPr is not None else default
+            for name, default in _DEFAULT_INSETS.items()}
+
+
+def _plan(card, geometry, text_boxes, font):
+    """Box insets and per-text-box (marL, marR, space before) in EMU, or None if the text would move."""
+    x, y, cx, cy = geometry
+    _rounded, adjustment = round_rect(card)
+    corner = round(corner_inset(cx, cy, adjustment))
+    rect_left, rect_top, rect_right, rect_bottom = x + corner, y + corner, x + cx - corner, y + cy - corner
+
+    areas = []
+    for sp, (tx, ty, tcx, tcy) in text_boxes:
+        insets = _insets(sp.find(_TX_BODY))
+        areas.append((tx + insets['lIns'], ty + insets['tIns'], tx + tcx - insets['rIns'], ty + tcy - insets['bIns']))
+    left = min(area[0] for area in areas)
+    right = max(area[2] for area in areas)
+    bottom = max(area[3] for area in areas)
+    body = {
+        'lIns': left - rect_left,
+        'tIns': areas[0][1] - rect_top,
+        'rIns': rect_right - right,
+        'bIns': max(rect_bottom - bottom, 0),
+    }
+    if min(body.values()) < 0:
+        return None
+
+    spacing = []
+    cursor = areas[0][1]
+    for (sp, _geometry), (area_left, area_top, area_right, _area_bottom) in zip(text_boxes, areas):
+        gap = area_top - cursor
+        if gap < 0:
+            return None
+        width = (area_right - area_left) / EMU_PER_INCH
+        height = text_height(read_paragraphs(sp.find(_TX_BODY)), width, font)
+        cursor = area_top + round(height * EMU_PER_INCH)
+        spacing.append((area_left - left, right - area_right, gap))
+    return body, spacing
+
+
+def _shift_paragraph(p, mar_l: int, mar_r: int, space_before: int):
+    """Indent a paragraph by mar_l/mar_r EMU and add space_before EMU above it."""
+    pPr = p.find(_P_PR)
+    if pPr is None:
+        pPr = p.makeelement(_P_PR)
+        p.insert(0, pPr)
+    for name, delta in (('marL', mar_l), ('marR', mar_r)):
+        if delta:
+            pPr.set(name, str(int(pPr.get(name, 0)) + delta))
+    if space_before:
+        spcBef = pPr.find(_SPC_BEF)
+        if spcBef is None:
+            spcBef = pPr.makeelement(_SPC_BEF)
+            index = sum(1 for child in pPr if child.tag in _BEFORE_SPC_BEF)
+            pPr.insert(index, spcBef)
+        spcPts = spcBef.find(_SPC_PTS)
+        if spcPts is None:
+            spcBef.clear()
+            spcPts = spcBef.makeelement(_SPC_PTS)
+            spcBef.append(spcPts)
+        # spcPts counts hundredths of a point; 127 EMU each
+        spcPts.set('val', str(int(spcPts.get('val', 0)) + round(space_before / 127)))
+
+
+def _merge(card, plan, text_boxes):
+    body, spacing = plan
+    txBody = card.get_or_add_txBody()
+    bodyPr = txBody.find(_BODY_PR)
+    bodyPr.set('anchor', 't')
+    bodyPr.set('wrap', 'square')
+    for name, value in body.items():
+        bodyPr.set(name, str(value))
+    for p in list(txBody.iterchildren(_P)):
+        txBody.remove(p)
+
+    for (sp, _geometry), (mar_l, mar_r, gap) in zip(text_boxes, spacing):
+        for i, p in enumerate(sp.find(_TX_BODY).iterchildren(_P)):
+            p = copy.deepcopy(p)
+            _shift_paragraph(p, mar_l, mar_r, gap if i == 0 else 0)
+            txBody.append(p)
+        sp.getparent().remove(sp)
+
+
+def merge_shapes(spTree, font: str = None) -> int:
+    """Merge the text boxes of one shape tree into their rounded boxes; returns the shapes removed."""
+    shapes = [el for el in spTree if el.tag not in _NOT_SHAPES]
+    merged = set()
+    removed = 0
+    for i, card in enumerate(shapes):
+        if id(card) in merged or not _is_card(card):
+            continue
+        geometry = _geometry(card)
+        if geometry is None:
+            continue
+        text_boxes = []
+        for above in shapes[i + 1:]:
+            if id(above) in merged:
+                continue
+            bounds = _geometry(above)
+            if bounds is not None and _contains(geometry, bounds) and _is_plain_text_box(above):
+                text_boxes.append((above, bounds))
+            elif bounds is None or _overlaps(geometry, bounds):
+                break
+        if not text_boxes:
+            continue
+        text_boxes.sort(key=lambda item: item[1][1])
+        plan = _plan(card, geometry, text_boxes, font)
+        if plan is None:
+            continue
+        _merge(card, plan, text_boxes)
+        merged.update(id(sp) for sp, _bounds in text_boxes)
+        removed += len(text_boxes)
+    return removed
+
+
+def merge_presentation(prs, font: str = None) -> dict:
+    """Merge text boxes into the rounded boxes under them on every slide of prs, in place.
+
+    Returns the shape counts before and after and the number of shapes saved.
+    """
+    before = saved = 0
+    for slide in prs.slides:
+        spTree = slide.shapes._spTree
+        before += sum(1 for el in spTree if el.tag not in _NOT_SHAPES)
+        saved += merge_shapes(spTree, font)
+    return {'shapes_before': before, 'shapes_after': before - saved, 'saved': saved}
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Compile a deck once, then fill in many personalised or localised variants.
+
+Building a deck means loading the template, running every slide builder and
+serialising and compressing every part, even when only a customer name
+changes between runs. A skeleton does that work once:
+
+1. compile_skeleton() runs a generator with skeleton mode on, so every
+   SlideGenerator.slot() is drawn as a {{name}} marker, and saves the deck.
+2. The saved package is split into members without markers, kept already
+   compressed, and members with markers, kept as serialised XML cut at each
+   marker.
+3. fill() writes a variant by joining each cut member with the variant's
+   values (XML-escaped), compressing only those members and copying the rest
+   byte for byte.
+
+With catalogue=True the text of every run on the slides also becomes a slot,
+keyed by the text itself, so a locale variant is just {source text:
+translation} and fills the same way. Keys are per run: a paragraph with line
+breaks is translated a line at a time.
+
+Slot values are substituted after layout, so builders should give slots boxes
+that fit the longest expected value; AUTO_SHRINK measures the marker, not the
+value. Values may contain line breaks, which split the run like p.text does.
+
+Usage:
+    uv run python slides/scripts/skeleton.py compile [--generator module:Class] [--template NAME]
+        [--catalogue] --output FILE
+    uv run python slides/scripts/skeleton.py fill SKELETON VALUES [--output-dir DIR] [--name-field FIELD]
+
+VALUES is a JSON lines file with one object of slot values per variant, or a
+.json file holding a single object (a locale catalogue, say).
+
+Example:
+    uv run python slides/scripts/skeleton.py compile --output slides/output/proposal.skeleton
+    uv run python slides/scripts/skeleton.py fill slides/output/proposal.skeleton customers.jsonl --name-field customer
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import pickle
+import re
+import time
+import zipfile
+from pathlib import Path
+from xml.sax.saxutils import escape, unescape
+
+from pptx.oxml.text import CT_RegularTextRun
+
+from batch_generate import load_generator
+from package_writer import (
+    DEFAULT_LEVEL, CompressedMember, ZipStreamWriter, compress_member, compression_level,
+)
+
+DEFAULT_GENERATOR = 'generate_warehouse_proposal:WarehouseProposalGenerator'
+
+# Bump when the pickled Skeleton layout changes
+SKELETON_VERSION = 1
+
+_MARKER = re.compile(rb'\{\{([A-Za-z_][\w.-]*)\}\}')
+_RUN_TEXT = re.compile(rb'(<a:t>)(.*?)(</a:t>)', re.S)
+# Characters not allowed (or not safe) in a file name on any platform
+_UNSAFE_NAME = re.compile(r'[\x00-\x1f/\\:*?"<>|]')
+
+# Members whose run text becomes catalogue slots
+CATALOGUE_PREFIXES = ('ppt/slides/', 'ppt/notesSlides/')
+
+
+def _run_start(blob: bytes, pos: int):
+    """The XML opening the run whose a:t contains pos ('<a:r>[<a:rPr/>]<a:t>'), or None."""
+    t = blob.rfind(b'<a:t>', 0, pos)
+    r = blob.rfind(b'<a:r>', 0, t)
+    if t < 0 or r < 0 or blob.find(b'</a:r>', r, t) >= 0:
+        return None
+    return blob[r:t + len(b'<a:t>')]
+
+
+def _escape(value: str, run_start: bytes = None) -> bytes:
+    """A value as a:t content: XML-escaped, each line break closing the run and opening a like one.
+
+    Without the run's opening XML, line breaks become soft breaks inside the run.
+    """
+    value = str(value).replace('\r\n', '\n').replace('\v', '\n')
+    if run_start is None:
+        value = value.replace('\n', '\v')
+    text = escape(CT_RegularTextRun._escape_ctrl_chars(value)).encode('utf-8')
+    if run_start is not None:
+        text = text.replace(b'\n', b'</a:t></a:r><a:br/>' + run_start)
+    return text
+
+
+def _cut(blob: bytes, catalogue: bool) -> list:
+    """Split XML into literal bytes and ('slot', name, run start) / ('text', key, run start, original) pieces."""
+    pieces = []
+    start = 0
+    if catalogue:
+        matches = [m for m in _RUN_TEXT.finditer(blob) if m.group(2) and not _MARKER.search(m.group(2))]
+        for match in sorted([*matches, *_MARKER.finditer(blob)], key=lambda m: m.start()):
+            if match.re is _MARKER:
+                pieces.append(blob[start:match.start()])
+                pieces.append(('slot', match.group(1).decode('ascii'), _run_start(blob, match.start())))
+                start = match.end()
+            else:
+                text = match.group(2)
+                pieces.append(blob[start:match.end(1)])
+                pieces.append(('text', unescape(text.decode('utf-8')), _run_start(blob, match.end(1)), text))
+                start = match.start(3)
+    else:
+        for match in _MARKER.finditer(blob):
+            pieces.append(blob[start:match.start()])
+            pieces.append(('slot', match.group(1).decode('ascii'), _run_start(blob, match.start())))
+            start = match.end()
+    pieces.append(blob[start:])
+    return [piece for piece in pieces if piece != b'']
+
+
+class Skeleton:
+    """A compiled deck: precompressed static members plus XML cut at its slots."""
+
+    def __init__(self, members: list, defaults: dict, level: int = DEFAULT_LEVEL):
+        # members: CompressedMember, or (name, pieces) for members with slots, in package order
+        self.members = members
+        self.defaults = dict(defaults)
+        self.level = level
+        self.slots = sorted({piece[1] for _name, pieces in self._cut_members() for piece in pieces
+                             if isinstance(piece, tuple) and piece[0] == 'slot'})
+        self.texts = sorted({piece[1] for _name, pieces in self._cut_members() for piece in pieces
+                             if isinstance(piece, tuple) and piece[0] == 'text'})
+
+    def _cut_members(self):
+        return [member for member in self.members if not isinstance(member, CompressedMember)]
+
+    @classmethod
+    def from_package(cls, package: bytes, defaults: dict = None, catalogue: bool = False,
+                     level: int = DEFAULT_LEVEL):
+        """Compile the bytes of a deck whose text contains {{name}} markers."""
+        members = []
+        with zipfile.ZipFile(io.BytesIO(package)) as z:
+            for info in z.infolist():
+                blob = z.read(info)
+                member_catalogue = catalogue and info.filename.startswith(CATALOGUE_PREFIXES)
+                if info.filename.endswith(('.xml', '.rels')) and (member_catalogue or _MARKER.search(blob)):
+                    members.append((info.filename, _cut(blob, member_catalogue)))
+                else:
+                    members.append(compress_member(info.filename, blob, compression_level(info.filename)))
+        return cls(members, defaults or {}, level)
+
+    def fill(self, values: dict, stream) -> int:
+        """Write the variant for values ({slot: value} and/or {source text: translation}) to stream.
+
+        Slots without a value fall back to the default their builder declared;
+        run text without a translation is kept. Returns the bytes written.
+        """
+        missing = [name for name in self.slots if name not in values and name not in self.defaults]
+        if missing:
+            raise ValueError(f"No value for slots: {', '.join(missing)}")
+
+        with ZipStreamWriter(stream) as writer:
+            for member in self.members:
+                if isinstance(member, CompressedMember):
+                    writer.write_compressed(member)
+                    continue
+                name, pieces = member
+                parts = []
+                for piece in pieces:
+                    if not isinstance(piece, tuple):
+                        parts.append(piece)
+                    elif piece[0] == 'slot':
+                        value = values[piece[1]] if piece[1] in values else self.defaults[piece[1]]
+                        parts.append(_escape(value, piece[2]))
+                    elif piece[1] in values:
+                        parts.append(_escape(values[piece[1]], piece[2]))
+                    else:
+                        parts.append(piece[3])
+                writer.write(name, b''.join(parts), self.level)
+        return writer.bytes_written
+
+    def render(self, values: dict) -> bytes:
+        """The variant for values as .pptx bytes."""
+        sink = io.BytesIO()
+        self.fill(values, sink)
+        return sink.getvalue()
+
+    def save(self, path):
+        path = Path(path)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((SKELETON_VERSION, self), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            version, skeleton = pickle.load(f)
+        if version != SKELETON_VERSION:
+            raise ValueError(f"{path} is a version {version} skeleton; recompile it (current: {SKELETON_VERSION})")
+        return skeleton
+
+
+def compile_skeleton(gen, catalogue: bool = False, level: int = DEFAULT_LEVEL) -> Skeleton:
+    """Run a generator's generate_all() once with slots as markers and compile the result."""
+    gen.skeleton = True
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            gen.generate_all()
+    finally:
+        gen.skeleton = False
+    sink = io.BytesIO()
+    gen.save_to_stream(sink)
+    return Skeleton.from_package(sink.getvalue(), gen.slot_defaults, catalogue, level)
+
+
+def read_values(path) -> list:
+    """Variants from a JSON lines file, or the single object of a .json file."""
+    text = Path(path).read_text(encoding='utf-8')
+    if str(path).endswith('.json'):
+        return [json.loads(text)]
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def deck_name(name, number: int, used: set) -> str:
+    """A file name (without .pptx) for variant `number` named `name`, unique among `used` (updated).
+
+    Path separators and other characters file systems reject become '_', and
+    leading dots are dropped, so a name cannot leave the output directory.
+    Repeated names get -2, -3, ...; no name falls back to variant-00001, ...
+    """
+    stem = _UNSAFE_NAME.sub('_', str(name)).strip().lstrip('.').strip() if name not in (None, '') else ''
+    stem = stem or f'variant-{number:05d}'
+    unique, n = stem, 1
+    while unique.casefold() in used:
+        n += 1
+        unique = f'{stem}-{n}'
+    used.add(unique.casefold())
+    return unique
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile a deck skeleton and fill variants from it')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    compile_parser = commands.add_parser('compile', help='Run a generator once and save its skeleton')
+    compile_parser.add_argument('--generator', '-g', default=DEFAULT_GENERATOR,
+                                help=f'Generator class as module:Class (default: {DEFAULT_GENERATOR})')
+    compile_parser.add_argument('--template', '-t', default='genda', help='Template name (default: genda)')
+    compile_parser.add_argument('--catalogue', action='store_true',
+                                help='Also make the text of every run a slot (for locale variants)')
+    compile_parser.add_argument('--output', '-o', required=True, help='Skeleton file to write')
+
+    fill_parser = commands.add_parser('fill', help='Write one deck per set of values')
+    fill_parser.add_argument('skeleton', help='Skeleton file from compile')
+    fill_parser.add_argument('values', help='JSON lines of slot values per variant, or one .json object')
+    fill_parser.add_argument('--output-dir', '-o', default='./slides/output', help='Output directory')
+    fill_parser.add_argument('--name-field', default=None,
+                             help='Value to name each deck by (default: variant-00001.pptx, ...)')
+    args = parser.parse_args()
+
+    if args.command == 'compile':
+        start = time.perf_counter()
+        gen = load_generator(args.generator)(f'./slides/templates/{args.template}.pptx')
+        skeleton = compile_skeleton(gen, args.catalogue)
+        skeleton.save(args.output)
+        print(f"Compiled {args.output} in {time.perf_counter() - start:.2f}s")
+        print(f"Slots: {', '.join(skeleton.slots) or '(none)'}")
+        if args.catalogue:
+            print(f"Catalogue texts: {len(skeleton.texts)}")
+        return
+
+    skeleton = Skeleton.load(args.skeleton)
+    variants = read_values(args.values)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    used = set()
+    for number, values in enumerate(variants, 1):
+        name = values.get(args.name_field) if args.name_field else None
+        path = output_dir / f"{deck_name(name, number, used)}.pptx"
+        with open(path, 'wb') as f:
+            skeleton.fill(values, f)
+    seconds = time.perf_counter() - start
+    print(f"{len(variants)} decks written to {output_dir} in {seconds:.2f}s "
+          f"({seconds / max(len(variants), 1) * 1000:.1f} ms each)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Fingerprinted cache of generated slide XML for incremental rebuilds.
+
+A slide builder's fingerprint covers everything that decides its output: the
+template hash and theme palette, the generator's upper-case settings (class
+constants, and any an instance overrides, such as AUTO_SHRINK), the source
+of the builder method and of the helper methods it draws with (including helper
+modules next to the generator, such as shape_fragments), its slot values, plus
+anything a generator returns from slide_inputs(). When the fingerprint is
+unchanged the previously generated slide XML is restored instead of running the
+builder.
+
+Only slides whose sole relationship is their layout are cached; slides that
+embed media or charts are always rebuilt.
+"""
+
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+from pathlib import Path
+
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml import parse_xml
+from pptx.parts.slide import SlidePart
+
+from template_cache import CACHE_DIR
+
+# Bump when the cache entry layout changes
+SLIDE_CACHE_VERSION = 2
+
+# generator class -> hash of its helper sources and constants
+_class_hashes = {}
+
+
+def _source(obj) -> str:
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        code = getattr(obj, '__code__', None)
+        return repr(code.co_code) if code is not None else repr(obj)
+
+
+def _class_hash(cls) -> str:
+    """Hash helper-method sources and constants of a generator class."""
+    digest = _class_hashes.get(cls)
+    if digest is not None:
+        return digest
+
+    builders = {method_name for method_name, _label in cls.SLIDE_BUILDERS}
+    h = hashlib.sha256()
+    for klass in cls.__mro__:
+        if klass is object:
+            continue
+        for name, attr in sorted(vars(klass).items()):
+            if name in builders or name.startswith('__'):
+                continue
+            if callable(attr) or isinstance(attr, (staticmethod, classmethod)):
+                h.update(_source(attr).encode('utf-8'))
+            elif name.isupper():
+                h.update(f'{klass.__name__}.{name}={attr!r}'.encode('utf-8'))
+
+    # Helper modules living next to the generator (but not defining it)
+    class_modules = {klass.__module__ for klass in cls.__mro__}
+    home = Path(inspect.getfile(cls)).resolve().parent
+    for name, module in sorted(sys.modules.items()):
+        path = getattr(module, '__file__', None)
+        if name in class_modules or not path or Path(path).resolve().parent != home:
+            continue
+        h.update(_source(module).encode('utf-8'))
+
+    digest = _class_hashes[cls] = h.hexdigest()
+    return digest
+
+
+def builder_fingerprint(gen, method_name: str) -> str:
+    """Fingerprint the inputs of one slide builder on a generator instance."""
+    h = hashlib.sha256()
+    h.update(f'v{SLIDE_CACHE_VERSION}'.encode('ascii'))
+    h.update(gen.template.digest.encode('ascii'))
+    h.update(repr(sorted((k, str(v)) for k, v in gen.colors.colors.items())).encode('utf-8'))
+    h.update(_class_hash(type(gen)).encode('ascii'))
+    # Settings set on the instance (gen.AUTO_SHRINK = True) shadow the class constants hashed above
+    overrides = sorted((name, repr(value)) for name, value in vars(gen).items() if name.isupper())
+    h.update(repr(overrides).encode('utf-8'))
+    h.update(method_name.encode('utf-8'))
+    h.update(_source(getattr(type(gen), method_name)).encode('utf-8'))
+    h.update(repr(gen.slide_inputs(method_name)).encode('utf-8'))
+    h.update(repr((gen.skeleton, sorted(gen.slot_values.items()))).encode('utf-8'))
+    return h.hexdigest()
+
+
+class SlideCache:
+    """On-disk store of slide XML keyed by builder fingerprint."""
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = Path(cache_dir) if cache_dir else CACHE_DIR / 'slides'
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, fingerprint: str) -> Path:
+        return self.cache_dir / f'{fingerprint}.pickle'
+
+    def get(self, fingerprint: str):
+        """Return (layout_index, slide_xml, text boxes) for a fingerprint, or None."""
+        try:
+            with open(self._path(fingerprint), 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, fingerprint: str, prs, slide, boxes=()):
+        """Store a freshly built slide, if it is self-contained.
+
+        boxes: the slide's SlideGenerator.text_boxes entries without their slide
+        part, (left, top, width, height, rounded, paragraphs), for check_text().
+        """
+        if len(slide.part.rels) != 1:
+            return
+        layout_index = prs.slide_layouts.index(slide.slide_layout)
+        path = self._path(fingerprint)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((layout_index, slide.part.blob, list(boxes)), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+
+def restore_slide(prs, layout_index: int, slide_xml: bytes):
+    """Append a slide to prs whose content is the cached slide XML."""
+    # Not prs.slides.add_slide(): it reads slide.shapes, which would keep the layout's
+    # placeholder tree that load_slide_xml() replaces
+    prs_part = prs.part
+    slide_part = SlidePart.new(prs_part._next_slide_partname, prs_part.package,
+                               prs.slide_layouts[layout_index].part)
+    rId = prs_part.relate_to(slide_part, RT.SLIDE)
+    load_slide_xml(slide_part, slide_xml)
+    prs.slides._sldIdLst.add_sldId(rId)
+    return slide_part.slide
+
+
+def load_slide_xml(slide_part, slide_xml: bytes):
+    """Replace the content of a slide part with serialised slide XML, in place.
+
+    Call it before anything reads slide_part.slide.shapes: the shapes proxy
+    holds on to the shape tree it was created with, which this replaces.
+    """
+    element = slide_part._element
+    loaded = parse_xml(slide_xml)
+    element.attrib.clear()
+    element.attrib.update(loaded.attrib)
+    element[:] = list(loaded)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Render PNG previews of a deck without an office suite.
+
+Slides are read into scenes (slide_scene.py) and drawn with Pillow: filled
+and outlined rectangles, rounded rectangles and ellipses, and their text,
+wrapped with the same line breaking text_metrics uses to predict overflow.
+Pictures and charts are drawn as gray boxes. Slides are rendered across a
+process pool and can be laid out on one contact sheet.
+
+Text needs a font that covers the deck's script; the first of FONT_CANDIDATES
+found is used unless --font is given. Shapes are drawn at SUPERSAMPLE times
+the output size and downsampled, which antialiases their edges.
+
+Usage:
+    uv run python slides/scripts/slide_preview.py <deck.pptx> [--output sheet.png] [--slides-dir DIR]
+        [--width PX] [--columns N] [--font FILE] [--workers N]
+
+Example:
+    uv run python slides/scripts/slide_preview.py slides/output/proposal.pptx -o /tmp/proposal.png
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+from slide_scene import read_scenes
+from text_metrics import LINE_SPACING, corner_inset, wrap
+
+THUMBNAIL_WIDTH = 480
+SUPERSAMPLE = 2
+
+FONT_CANDIDATES = (
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/truetype/noto/NotoSansJP-Regular.ttf',
+    '/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc',
+    '/System/Library/Fonts/Hiragino Sans GB.ttc',
+    'C:/Windows/Fonts/YuGothM.ttc',
+    'C:/Windows/Fonts/meiryo.ttc',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+)
+
+# Pictures and charts are not drawn; they show as this fill
+PLACEHOLDER_FILL = 'D9D9D9'
+PLACEHOLDER_LINE = 'A6A6A6'
+
+SHEET_GAP = 16
+SHEET_BACKGROUND = 'E7E6E6'
+
+
+def default_font():
+    """First installed font of FONT_CANDIDATES, or None for Pillow's built-in font."""
+    for path in FONT_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+@lru_cache(maxsize=256)
+def _font(path, size_px: int):
+    if path is None:
+        return ImageFont.load_default(size_px)
+    return ImageFont.truetype(path, size_px)
+
+
+def _rgb(color: str) -> tuple:
+    return int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16)
+
+
+def text_lines(box, font_path=None) -> list:
+    """Lay out a box's paragraphs inside its insets, in inches.
+
+    Returns (text, paragraph, left, width, middle) per line: the line's area
+    after paragraph margins and the vertical centre of its line box. Aligning
+    the text within that width is up to the caller. A roundRect's text
+    rectangle is pulled in from its corners, as PowerPoint (and
+    text_metrics.text_area) place it.
+    """
+    left_inset, top_inset, right_inset, bottom_inset = box.insets
+    if box.geometry == 'roundRect':
+        corner = corner_inset(box.width, box.height, box.adjustment)
+        left_inset, top_inset, right_inset, bottom_inset = (
+            left_inset + corner, top_inset + corner, right_inset + corner, bottom_inset + corner)
+    inner_w = max(box.width - left_inset - right_inset, 0.0)
+    inner_h = box.height - top_inset - bottom_inset
+
+    lines = []
+    for i, p in enumerate(box.paragraphs):
+        width = max(inner_w - p.margin_left - p.margin_right, 0.0)
+        wrapped = wrap(p.text, p.size, width, font_path, p.bold) if box.wrap else p.text.split('\n')
+        for j, text in enumerate(wrapped):
+            # Space before the first line of every paragraph but the first
+            space = p.space_before / 72 if i and not j else 0.0
+            lines.append((text, p, space))
+    if not any(text for text, _p, _space in lines):
+        return []
+
+    height = sum(p.size * LINE_SPACING / 72 + space for _text, p, space in lines)
+    if box.anchor == 'ctr':
+        y = box.top + top_inset + (inner_h - height) / 2
+    elif box.anchor == 'b':
+        y = box.top + top_inset + inner_h - height
+    else:
+        y = box.top + top_inset
+
+    laid_out = []
+    for text, p, space in lines:
+        y += space
+        line_h = p.size * LINE_SPACING / 72
+        laid_out.append((text, p, box.left + left_inset + p.margin_left, inner_w - p.margin_left - p.margin_right,
+                         y + line_h / 2))
+        y += line_h
+    return laid_out
+
+
+def _draw_text(draw, box, scale: float, font_path):
+    """Draw a box's paragraphs inside its insets."""
+    for text, p, left, available, middle in text_lines(box, font_path):
+        if not text:
+            continue
+        font = _font(font_path, max(1, round(p.size / 72 * scale)))
+        width = draw.textlength(text, font=font) / scale
+        if p.align == 'ctr':
+            x = left + (available - width) / 2
+        elif p.align == 'r':
+            x = left + available - width
+        else:
+            x = left
+        stroke = round(p.size / 72 * scale / 30) if p.bold else 0
+        # Baseline-free placement: centre the glyph box in the line
+        draw.text((x * scale, middle * scale), text, font=font, fill=_rgb(p.color),
+                  anchor='lm', stroke_width=stroke, stroke_fill=_rgb(p.color))
+
+
+def render_scene(scene, width: int = THUMBNAIL_WIDTH, font_path=None) -> Image.Image:
+    """Draw one scene as an RGB image `width` pixels wide."""
+    scale = width * SUPERSAMPLE / scene.width
+    size = (width * SUPERSAMPLE, round(scene.height * scale))
+    im = Image.new('RGB', size, _rgb(scene.background))
+    draw = ImageDraw.Draw(im)
+
+    for box in scene.boxes:
+        fill, line, line_width = box.fill, box.line, box.line_width
+        if box.kind in ('picture', 'chart'):
+            fill, line, line_width = PLACEHOLDER_FILL, PLACEHOLDER_LINE, 1.0
+        rect = (box.left * scale, box.top * scale,
+                (box.left + box.width) * scale, (box.top + box.height) * scale)
+        if rect[2] < rect[0] or rect[3] < rect[1]:
+            continue
+        if fill or line:
+            outline = _rgb(line) if line else None
+            stroke = max(1, round(line_width / 72 * scale)) if line else 0
+            fill = _rgb(fill) if fill else None
+            if box.geometry == 'roundRect':
+                radius = min(box.width, box.height) * box.adjustment * scale
+                draw.rounded_rectangle(rect, radius, fill=fill, outline=outline, width=stroke)
+            elif box.geometry == 'ellipse':
+                draw.ellipse(rect, fill=fill, outline=outline, width=stroke)
+            else:
+                draw.rectangle(rect, fill=fill, outline=outline, width=stroke)
+        if box.paragraphs:
+            _draw_text(draw, box, scale, font_path)
+
+    if SUPERSAMPLE > 1:
+        im = im.resize((width, round(size[1] / SUPERSAMPLE)), Image.LANCZOS)
+    return im
+
+
+def _render(args):
+    scene, width, font_path = args
+    return render_scene(scene, width, font_path)
+
+
+def render_deck(package, width: int = THUMBNAIL_WIDTH, font_path=None, workers: int = None,
+                slides=None) -> list:
+    """Render a deck's slides (path or bytes) to images, in parallel when there are several.
+
+    workers: processes to render with (default: CPU count); 1 renders inline.
+    """
+    if font_path is None:
+        font_path = default_font()
+    scenes = read_scenes(package, slides)
+    workers = min((os.cpu_count() or 1) if workers is None else workers, len(scenes))
+    jobs = [(scene, width, font_path) for scene in scenes]
+    if workers <= 1:
+        return [_render(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def contact_sheet(images, columns: int = 4, gap: int = SHEET_GAP) -> Image.Image:
+    """Lay slide images out in a grid, in order, on a neutral background."""
+    if not images:
+        return Image.new('RGB', (gap, gap), _rgb(SHEET_BACKGROUND))
+    columns = min(columns, len(images))
+    rows = -(-len(images) // columns)
+    cell_w = max(im.width for im in images)
+    cell_h = max(im.height for im in images)
+    sheet = Image.new('RGB', (gap + columns * (cell_w + gap), gap + rows * (cell_h + gap)), _rgb(SHEET_BACKGROUND))
+    for i, im in enumerate(images):
+        row, column = divmod(i, columns)
+        sheet.paste(im, (gap + column * (cell_w + gap), gap + row * (cell_h + gap)))
+    return sheet
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render PNG previews of a deck')
+    parser.add_argument('deck', help='.pptx to preview')
+    parser.add_argument('--output', '-o', default=None,
+                        help='Contact sheet path (default: <deck>.png next to the deck)')
+    parser.add_argument('--slides-dir', default=None, metavar='DIR',
+                        help='Also write one PNG per slide (slide-001.png, ...) to DIR')
+    parser.add_argument('--width', type=int, default=THUMBNAIL_WIDTH, help='Slide width in pixels')
+    parser.add_argument('--columns', type=int, default=4, help='Contact sheet columns')
+    parser.add_argument('--font', default=None, help='Font file for text (default: first found of FONT_CANDIDATES)')
+    parser.add_argument('--workers', '-j', type=int, default=None, help='Worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    images = render_deck(args.deck, args.width, args.font, args.workers)
+    output = Path(args.output) if args.output else Path(args.deck).with_suffix('.png')
+    contact_sheet(images, args.columns).save(output)
+    if args.slides_dir:
+        slides_dir = Path(args.slides_dir)
+        slides_dir.mkdir(parents=True, exist_ok=True)
+        for number, im in enumerate(images, 1):
+            im.save(slides_dir / f'slide-{number:03d}.png')
+
+    print(f"{len(images)} slides rendered in {time.perf_counter() - start:.2f}s")
+    print(f"Contact sheet: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,453 @@
+"""
+Read the slides of a .pptx into flat scenes of boxes, for previews and exports.
+
+A scene is what a slide looks like, with every inherited property resolved:
+a background color and, in paint order, the boxes of the master, the layout
+and the slide. Each box has its geometry in inches, its preset shape, fill
+and outline colors, and its text as paragraphs with size, boldness, color
+and alignment.
+
+Placeholders take geometry, text anchor and paragraph defaults from the
+matching layout and master placeholders and from the master's text styles;
+theme colors go through the master's color map to its theme palette. Tables
+become one box per cell, groups are flattened, pictures and charts become
+boxes of kind 'picture' and 'chart' without content.
+
+This covers what the generators emit (rounded rectangles with solid fills,
+text boxes, titles, tables); it is not a general DrawingML renderer. Color
+modifiers (tint, lumMod, ...), gradients, effects and run-level formatting
+within a paragraph are ignored.
+
+The package is read with zipfile and ElementTree only, so scenes can be
+built without loading the deck into python-pptx. Scenes are NamedTuples and
+pickle cheaply to worker processes.
+"""
+
+import io
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import NamedTuple
+
+from theme_registry import (
+    NS_A, NS_P, RT, RT_OFFICE_DOCUMENT, RT_THEME, read_clr_scheme, read_id_list, read_rels, rel_target,
+)
+
+RT_SLIDE_LAYOUT = RT + 'slideLayout'
+RT_SLIDE_MASTER = RT + 'slideMaster'
+
+EMU_PER_INCH = 914400
+
+# Body insets PowerPoint uses when a:bodyPr sets none (lIns, tIns, rIns, bIns), in inches
+DEFAULT_INSETS = (0.1, 0.05, 0.1, 0.05)
+DEFAULT_FONT_SIZE = 18
+
+# Default roundRect corner, as a fraction of the shorter side
+DEFAULT_ROUND_RECT_ADJ = 0.16667
+
+# Master placeholder a slide placeholder type inherits from
+_MASTER_PH_TYPE = {'ctrTitle': 'title', 'subTitle': 'body', 'obj': 'body'}
+
+_SHAPE_TAGS = {NS_P + tag for tag in ('sp', 'pic', 'graphicFrame', 'grpSp', 'cxnSp')}
+
+
+class Paragraph(NamedTuple):
+    text: str
+    size: float  # pt
+    bold: bool
+    color: str  # 'RRGGBB'
+    align: str  # 'l', 'ctr', 'r' or 'just'
+    space_before: float = 0.0  # pt
+    margin_left: float = 0.0  # inches
+    margin_right: float = 0.0  # inches
+
+
+class Box(NamedTuple):
+    """A shape, table cell, picture or chart, positioned in inches."""
+
+    kind: str  # 'shape', 'cell', 'picture' or 'chart'
+    left: float
+    top: float
+    width: float
+    height: float
+    geometry: str  # preset geometry ('rect', 'roundRect', 'ellipse', ...)
+    adjustment: float  # first geometry adjustment as a fraction (roundRect corner)
+    fill: str  # 'RRGGBB' or None
+    line: str  # 'RRGGBB' or None
+    line_width: float  # pt
+    paragraphs: tuple
+    anchor: str  # 't', 'ctr' or 'b'
+    wrap: bool
+    insets: tuple  # (left, top, right, bottom) inches
+
+    @property
+    def text(self) -> str:
+        return '\n'.join(p.text for p in self.paragraphs)
+
+
+class Scene(NamedTuple):
+    number: int
+    width: float  # inches
+    height: float
+    background: str  # 'RRGGBB'
+    boxes: tuple
+
+
+def _emu(value, default=0) -> float:
+    return int(value) / EMU_PER_INCH if value is not None else default
+
+
+def _ph(sp):
+    """(type, idx) of a placeholder shape, or None."""
+    ph = sp.find(f'./*/{NS_P}nvPr/{NS_P}ph')
+    if ph is None:
+        return None
+    return ph.get('type', 'body'), ph.get('idx')
+
+
+def _xfrm(sp):
+    xfrm = sp.find(f'./*/{NS_A}xfrm')
+    if xfrm is None:
+        xfrm = sp.find(f'{NS_P}xfrm')
+    return xfrm
+
+
+class _Part:
+    """A parsed master or layout: its placeholders by (type, idx) and by type."""
+
+    def __init__(self, root):
+        self.root = root
+        self.by_idx = {}
+        self.by_type = {}
+        sp_tree = root.find(f'{NS_P}cSld/{NS_P}spTree')
+        for sp in sp_tree.iter(NS_P + 'sp'):
+            ph = _ph(sp)
+            if ph is None:
+                continue
+            ph_type, idx = ph
+            if idx is not None:
+                self.by_idx.setdefault(idx, sp)
+            self.by_type.setdefault(ph_type, sp)
+
+    def match(self, ph_type: str, idx: str, master: bool = False):
+        if master:
+            return self.by_type.get(_MASTER_PH_TYPE.get(ph_type, ph_type))
+        if idx is not None and idx in self.by_idx:
+            return self.by_idx[idx]
+        return self.by_type.get(ph_type)
+
+
+class _Theme:
+    """Color resolution for one master: clrMap -> clrScheme."""
+
+    def __init__(self, palette: dict, clr_map):
+        self.palette = palette
+        self.map = dict(clr_map.attrib) if clr_map is not None else {}
+
+    def color(self, parent):
+        """'RRGGBB' of the color element under parent (a solidFill, style ref, ...), or None."""
+        if parent is None:
+            return None
+        for child in parent:
+            if child.tag == NS_A + 'srgbClr':
+                return child.get('val').upper()
+            if child.tag == NS_A + 'schemeClr':
+                slot = child.get('val')
+                return self.palette.get(self.map.get(slot, slot))
+            if child.tag == NS_A + 'sysClr':
+                return child.get('lastClr')
+            if child.tag == NS_A + 'prstClr':
+                return {'black': '000000', 'white': 'FFFFFF'}.get(child.get('val'))
+        return None
+
+
+class _Master:
+    def __init__(self, z: zipfile.ZipFile, member: str):
+        root = ET.fromstring(z.read(member))
+        self.part = _Part(root)
+        theme = rel_target(read_rels(z, member), RT_THEME)
+        self.theme = _Theme(read_clr_scheme(z, theme) if theme else {}, root.find(NS_P + 'clrMap'))
+        styles = root.find(NS_P + 'txStyles')
+        self.text_styles = {}
+        if styles is not None:
+            for name in ('titleStyle', 'bodyStyle', 'otherStyle'):
+                style = styles.find(NS_P + name)
+                if style is not None:
+                    self.text_styles[name] = style.find(NS_A + 'lvl1pPr')
+
+    def text_style(self, ph_type):
+        if ph_type in ('title', 'ctrTitle'):
+            return self.text_styles.get('titleStyle')
+        if ph_type is not None:
+            return self.text_styles.get('bodyStyle')
+        return self.text_styles.get('otherStyle')
+
+
+def _lvl1(sp):
+    if sp is None:
+        return None
+    return sp.find(f'{NS_P}txBody/{NS_A}lstStyle/{NS_A}lvl1pPr')
+
+
+def _first(elements, getter):
+    for element in elements:
+        if element is not None:
+            value = getter(element)
+            if value is not None:
+                return value
+    return None
+
+
+class _SceneBuilder:
+    """Flattens the shapes of one slide (and its layout and master) into boxes."""
+
+    def __init__(self, master: _Master, layout: _Part):
+        self.master = master
+        self.layout = layout
+        self.theme = master.theme
+        self.boxes = []
+
+    def inherited(self, sp, ph):
+        """The layout and master placeholders sp inherits from (most specific first)."""
+        if ph is None:
+            return []
+        ph_type, idx = ph
+        chain = []
+        if self.layout is not None:
+            chain.append(self.layout.match(ph_type, idx))
+        chain.append(self.master.part.match(ph_type, idx, master=True))
+        return [s for s in chain if s is not None and s is not sp]
+
+    def add_tree(self, sp_tree, placeholders: bool = True, transform=None):
+        for child in sp_tree:
+            if child.tag not in _SHAPE_TAGS:
+                continue
+            if child.tag == NS_P + 'grpSp':
+                self.add_group(child, placeholders, transform)
+            elif child.tag == NS_P + 'graphicFrame':
+                self.add_frame(child, transform)
+            elif child.tag == NS_P + 'pic':
+                self.add_simple(child, 'picture', transform)
+            elif placeholders or _ph(child) is None:
+                self.add_shape(child, transform)
+
+    def place(self, xfrm, transform):
+        """(left, top, width, height) inches of an a:xfrm, through any group transforms."""
+        off, ext = xfrm.find(NS_A + 'off'), xfrm.find(NS_A + 'ext')
+        left, top = _emu(off.get('x')), _emu(off.get('y'))
+        width, height = _emu(ext.get('cx')), _emu(ext.get('cy'))
+        if transform:
+            sx, sy, dx, dy = transform
+            left, top, width, height = left * sx + dx, top * sy + dy, width * sx, height * sy
+        return left, top, width, height
+
+    def add_group(self, grp, placeholders, transform):
+        xfrm = grp.find(f'{NS_P}grpSpPr/{NS_A}xfrm')
+        child_transform = transform
+        if xfrm is not None and xfrm.find(NS_A + 'chExt') is not None:
+            left, top, width, height = self.place(xfrm, transform)
+            ch_off, ch_ext = xfrm.find(NS_A + 'chOff'), xfrm.find(NS_A + 'chExt')
+            ch_w, ch_h = _emu(ch_ext.get('cx')), _emu(ch_ext.get('cy'))
+            sx = width / ch_w if ch_w else 1.0
+            sy = height / ch_h if ch_h else 1.0
+            child_transform = (sx, sy, left - _emu(ch_off.get('x')) * sx, top - _emu(ch_off.get('y')) * sy)
+        self.add_tree(grp, placeholders, child_transform)
+
+    def add_simple(self, sp, kind, transform):
+        xfrm = _xfrm(sp)
+        if xfrm is None:
+            return
+        self.boxes.append(Box(kind, *self.place(xfrm, transform), 'rect', 0.0, None, None, 0.0,
+                              (), 't', True, DEFAULT_INSETS))
+
+    def add_frame(self, frame, transform):
+        tbl = frame.find(f'{NS_A}graphic/{NS_A}graphicData/{NS_A}tbl')
+        if tbl is None:
+            self.add_simple(frame, 'chart', transform)
+            return
+        left, top, _w, _h = self.place(frame.find(NS_P + 'xfrm'), transform)
+        sx = transform[0] if transform else 1.0
+        sy = transform[1] if transform else 1.0
+        widths = [_emu(col.get('w')) * sx for col in tbl.iter(NS_A + 'gridCol')]
+        starts = [left + sum(widths[:i]) for i in range(len(widths))]
+        y = top
+        for tr in tbl.iter(NS_A + 'tr'):
+            height = _emu(tr.get('h')) * sy
+            for i, tc in enumerate(tr.iter(NS_A + 'tc')):
+                if i >= len(widths) or tc.get('hMerge') == '1' or tc.get('vMerge') == '1':
+                    continue
+                span = int(tc.get('gridSpan', 1))
+                self.add_cell(tc, starts[i], y, sum(widths[i:i + span]), height)
+            y += height
+
+    def add_cell(self, tc, x, y, width, height):
+        tc_pr = tc.find(NS_A + 'tcPr')
+        fill = anchor = None
+        insets = (0.1, 0.05, 0.1, 0.05)
+        if tc_pr is not None:
+            fill = self.theme.color(tc_pr.find(NS_A + 'solidFill'))
+            anchor = tc_pr.get('anchor')
+            insets = tuple(_emu(tc_pr.get(name), default)
+                           for name, default in zip(('marL', 'marT', 'marR', 'marB'), insets))
+        paragraphs = self.paragraphs(tc.find(NS_A + 'txBody'), [], None)
+        self.boxes.append(Box('cell', x, y, width, height, 'rect', 0.0, fill, None, 0.0,
+                              paragraphs, anchor or 't', True, insets))
+
+    def add_shape(self, sp, transform):
+        ph = _ph(sp)
+        chain = self.inherited(sp, ph)
+        xfrm = _first([sp, *chain], _xfrm)
+        if xfrm is None:
+            return
+
+        sp_pr = sp.find(NS_P + 'spPr')
+        geom = sp_pr.find(NS_A + 'prstGeom') if sp_pr is not None else None
+        geometry = geom.get('prst') if geom is not None else 'rect'
+        adjustment = DEFAULT_ROUND_RECT_ADJ if geometry == 'roundRect' else 0.0
+        gd = geom.find(f'{NS_A}avLst/{NS_A}gd') if geom is not None else None
+        if gd is not None and gd.get('fmla', '').startswith('val '):
+            adjustment = int(gd.get('fmla')[4:]) / 100000
+
+        style = sp.find(NS_P + 'style')
+        fill = self.fill(sp_pr, style)
+        line, line_width = self.line(sp_pr, style)
+
+        tx_body = sp.find(NS_P + 'txBody')
+        bodies = [b for b in (s.find(f'{NS_P}txBody/{NS_A}bodyPr') for s in [sp, *chain]) if b is not None]
+        anchor = _first(bodies, lambda b: b.get('anchor')) or 't'
+        wrap = (_first(bodies, lambda b: b.get('wrap')) or 'square') != 'none'
+        insets = tuple(_emu(_first(bodies, lambda b, n=name: b.get(n)), default)
+                       for name, default in zip(('lIns', 'tIns', 'rIns', 'bIns'), DEFAULT_INSETS))
+
+        levels = [_lvl1(s) for s in [sp, *chain]]
+        levels.append(self.master.text_style(ph[0] if ph else None))
+        default_color = self.theme.color(style.find(NS_A + 'fontRef')) if style is not None else None
+        paragraphs = self.paragraphs(tx_body, levels, default_color)
+
+        self.boxes.append(Box('shape', *self.place(xfrm, transform), geometry, adjustment, fill, line,
+                              line_width, paragraphs, anchor, wrap, insets))
+
+    def fill(self, sp_pr, style):
+        if sp_pr is not None:
+            if sp_pr.find(NS_A + 'noFill') is not None:
+                return None
+            solid = sp_pr.find(NS_A + 'solidFill')
+            if solid is not None:
+                return self.theme.color(solid)
+            if sp_pr.find(NS_A + 'gradFill') is not None or sp_pr.find(NS_A + 'pattFill') is not None:
+                return None
+        ref = style.find(NS_A + 'fillRef') if style is not None else None
+        if ref is not None and ref.get('idx', '0') != '0':
+            return self.theme.color(ref)
+        return None
+
+    def line(self, sp_pr, style):
+        ln = sp_pr.find(NS_A + 'ln') if sp_pr is not None else None
+        width = int(ln.get('w', 12700)) / 12700 if ln is not None else 1.0
+        if ln is not None:
+            if ln.find(NS_A + 'noFill') is not None:
+                return None, 0.0
+            solid = ln.find(NS_A + 'solidFill')
+            if solid is not None:
+                return self.theme.color(solid), width
+        ref = style.find(NS_A + 'lnRef') if style is not None else None
+        if ref is not None and ref.get('idx', '0') != '0':
+            return self.theme.color(ref), width
+        return None, 0.0
+
+    def paragraphs(self, tx_body, levels, default_color) -> tuple:
+        """Paragraphs of a txBody, each with its first run's (or inherited) formatting."""
+        if tx_body is None:
+            return ()
+        paragraphs = []
+        for p in tx_body.iter(NS_A + 'p'):
+            parts = []
+            r_pr = None
+            for child in p:
+                if child.tag in (NS_A + 'r', NS_A + 'fld'):
+                    if r_pr is None:
+                        r_pr = child.find(NS_A + 'rPr')
+                    parts.append(child.findtext(NS_A + 't') or '')
+                elif child.tag == NS_A + 'br':
+                    parts.append('\n')
+            p_pr = p.find(NS_A + 'pPr')
+            def_r_prs = [r_pr, p_pr.find(NS_A + 'defRPr') if p_pr is not None else None]
+            def_r_prs += [level.find(NS_A + 'defRPr') for level in levels if level is not None]
+            size = _first(def_r_prs, lambda e: e.get('sz'))
+            bold = _first(def_r_prs, lambda e: e.get('b'))
+            color = _first(def_r_prs, lambda e: self.theme.color(e.find(NS_A + 'solidFill')))
+            p_prs = [p_pr, *levels]
+            align = _first(p_prs, lambda e: e.get('algn'))
+            space_before = _first(p_prs, lambda e: e.find(f'{NS_A}spcBef/{NS_A}spcPts'))
+            paragraphs.append(Paragraph(
+                ''.join(parts),
+                int(size) / 100 if size else DEFAULT_FONT_SIZE,
+                bold in ('1', 'true'),
+                color or default_color or self.theme.palette.get(self.theme.map.get('tx1', 'dk1'), '000000'),
+                align or 'l',
+                int(space_before.get('val')) / 100 if space_before is not None else 0.0,
+                _emu(_first(p_prs, lambda e: e.get('marL')), 0.0),
+                _emu(_first(p_prs, lambda e: e.get('marR')), 0.0),
+            ))
+        return tuple(paragraphs)
+
+    def background(self, roots) -> str:
+        for root in roots:
+            bg = root.find(f'{NS_P}cSld/{NS_P}bg')
+            if bg is None:
+                continue
+            bg_pr = bg.find(NS_P + 'bgPr')
+            color = self.theme.color(bg_pr.find(NS_A + 'solidFill')) if bg_pr is not None else None
+            if color is None:
+                color = self.theme.color(bg.find(NS_P + 'bgRef'))
+            if color is not None:
+                return color
+        return 'FFFFFF'
+
+
+def _show_master_shapes(root) -> bool:
+    return root.get('showMasterSp', '1') not in ('0', 'false')
+
+
+def read_scenes(package, slides=None) -> list:
+    """Scenes of a deck's slides.
+
+    Args:
+        package: a path, or the bytes of a .pptx.
+        slides: slide numbers (from 1) to read; all slides when None.
+    """
+    return list(iter_scenes(package, slides))
+
+
+def iter_scenes(package, slides=None):
+    """Yield the scenes of read_scenes() one slide at a time, each as soon as it is read."""
+    source = io.BytesIO(package) if isinstance(package, (bytes, bytearray)) else package
+    with zipfile.ZipFile(source) as z:
+        document = rel_target(read_rels(z, ''), RT_OFFICE_DOCUMENT)
+        presentation = ET.fromstring(z.read(document))
+        size = presentation.find(NS_P + 'sldSz')
+        width, height = _emu(size.get('cx'), 10.0), _emu(size.get('cy'), 7.5)
+
+        document_rels = read_rels(z, document)
+        members = [document_rels[rId][1] for rId in read_id_list(z, document, NS_P + 'sldIdLst')]
+        masters, layouts = {}, {}
+        for number, member in enumerate(members, 1):
+            if slides is not None and number not in slides:
+                continue
+            root = ET.fromstring(z.read(member))
+            layout_member = rel_target(read_rels(z, member), RT_SLIDE_LAYOUT)
+            if layout_member not in layouts:
+                layouts[layout_member] = _Part(ET.fromstring(z.read(layout_member)))
+            layout = layouts[layout_member]
+            master_member = rel_target(read_rels(z, layout_member), RT_SLIDE_MASTER)
+            if master_member not in masters:
+                masters[master_member] = _Master(z, master_member)
+            master = masters[master_member]
+
+            builder = _SceneBuilder(master, layout)
+            if _show_master_shapes(root) and _show_master_shapes(layout.root):
+                builder.add_tree(master.part.root.find(f'{NS_P}cSld/{NS_P}spTree'), placeholders=False)
+            if _show_master_shapes(root):
+                builder.add_tree(layout.root.find(f'{NS_P}cSld/{NS_P}spTree'), placeholders=False)
+            builder.add_tree(root.find(f'{NS_P}cSld/{NS_P}spTree'))
+            background = builder.background([root, layout.root, master.part.root])
+            yield Scene(number, width, height, background, tuple(builder.boxes))
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Export a deck as one standalone SVG per slide plus an index page, for the web.
+
+Slides are read into scenes (slide_scene.py) and written as SVG: rectangles,
+rounded rectangles and ellipses with their fill and outline, and their text
+laid out the way slide_preview draws it (text_lines(): wrapped with
+text_metrics, anchored in the box insets), with alignment left to the
+browser through text-anchor. Pictures and charts are drawn as gray boxes.
+
+Scenes are read and written one slide at a time, so the first slides are on
+disk while the rest of the deck is still being read and memory does not grow
+with the deck. index.html, written last, shows the slides as a grid of
+lazily loaded images.
+
+SVG user units are points (72 per inch). Text is set in FONT_FAMILY; line
+breaks are predicted with the built-in widths, or with the real advances of
+--font if given, so it should name the font the page will use.
+
+Usage:
+    uv run python slides/scripts/slide_svg.py <deck.pptx> [--output-dir DIR] [--width PX] [--font FILE]
+        [--font-family CSS]
+
+Example:
+    uv run python slides/scripts/slide_svg.py slides/output/proposal.pptx -o /tmp/proposal-svg
+"""
+
+import argparse
+import time
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from slide_preview import PLACEHOLDER_FILL, PLACEHOLDER_LINE, SHEET_BACKGROUND, text_lines
+from slide_scene import iter_scenes
+
+PT_PER_INCH = 72
+
+# Default rendered width of each slide, in CSS pixels (the SVG scales to any size)
+SVG_WIDTH = 960
+
+FONT_FAMILY = "'Noto Sans CJK JP', 'Hiragino Sans', 'Yu Gothic', Meiryo, sans-serif"
+
+_ANCHORS = {'ctr': 'middle', 'r': 'end'}
+
+
+def _n(value: float) -> str:
+    """A length in inches as points, with at most two decimals."""
+    return f'{value * PT_PER_INCH:.2f}'.rstrip('0').rstrip('.')
+
+
+def _paint(fill, line, line_width: float) -> str:
+    attrs = f' fill="#{fill}"' if fill else ' fill="none"'
+    if line:
+        attrs += f' stroke="#{line}" stroke-width="{line_width:g}"'
+    return attrs
+
+
+def scene_svg(scene, width: int = SVG_WIDTH, font_path=None, font_family: str = FONT_FAMILY) -> str:
+    """One scene as a standalone SVG document, `width` CSS pixels wide."""
+    height = round(width * scene.height / scene.width)
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {_n(scene.width)} {_n(scene.height)}" '
+        f'width="{width}" height="{height}" font-family="{escape(font_family, {'"': '&quot;'})}">',
+        f'<rect width="100%" height="100%" fill="#{scene.background}"/>',
+    ]
+    for box in scene.boxes:
+        if box.width < 0 or box.height < 0:
+            continue
+        fill, line, line_width = box.fill, box.line, box.line_width
+        if box.kind in ('picture', 'chart'):
+            fill, line, line_width = PLACEHOLDER_FILL, PLACEHOLDER_LINE, 1.0
+        if fill or line:
+            paint = _paint(fill, line, line_width)
+            if box.geometry == 'ellipse':
+                out.append(f'<ellipse cx="{_n(box.left + box.width / 2)}" cy="{_n(box.top + box.height / 2)}" '
+                           f'rx="{_n(box.width / 2)}" ry="{_n(box.height / 2)}"{paint}/>')
+            else:
+                radius = min(box.width, box.height) * box.adjustment if box.geometry == 'roundRect' else 0
+                corner = f' rx="{_n(radius)}"' if radius else ''
+                out.append(f'<rect x="{_n(box.left)}" y="{_n(box.top)}" width="{_n(box.width)}" '
+                           f'height="{_n(box.height)}"{corner}{paint}/>')
+
+        for text, p, left, available, middle in text_lines(box, font_path) if box.paragraphs else ():
+            if not text:
+                continue
+            anchor = _ANCHORS.get(p.align)
+            x = left + available / 2 if anchor == 'middle' else left + available if anchor == 'end' else left
+            attrs = f' text-anchor="{anchor}"' if anchor else ''
+            if p.bold:
+                attrs += ' font-weight="bold"'
+            out.append(f'<text x="{_n(x)}" y="{_n(middle)}" font-size="{p.size:g}" fill="#{p.color}"{attrs} '
+                       f'dominant-baseline="central" xml:space="preserve">{escape(text)}</text>')
+    out.append('</svg>')
+    return '\n'.join(out)
+
+
+def iter_svg(package, width: int = SVG_WIDTH, font_path=None, font_family: str = FONT_FAMILY, slides=None):
+    """Yield (scene, SVG) for a deck's slides (path or bytes), one slide at a time."""
+    for scene in iter_scenes(package, slides):
+        yield scene, scene_svg(scene, width, font_path, font_family)
+
+
+def index_html(entries, title: str, width: int = SVG_WIDTH) -> str:
+    """A page showing the slides as a grid; entries are (number, file name, pixel height)."""
+    figures = '\n'.join(
+        f'<figure><a href="{name}"><img src="{name}" width="{width}" height="{height}" loading="lazy" '
+        f'alt="Slide {number}"></a><figcaption>{number}</figcaption></figure>'
+        for number, name, height in entries
+    )
+    return f'''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{escape(title)}</title>
+<style>
+body {{ margin: 0; padding: 16px; background: #{SHEET_BACKGROUND}; font-family: sans-serif; }}
+main {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(320px, 1fr)); gap: 16px; }}
+figure {{ margin: 0; }}
+img {{ width: 100%; height: auto; display: block; background: #fff; box-shadow: 0 1px 3px rgba(0, 0, 0, .2); }}
+figcaption {{ font-size: 12px; color: #555; padding-top: 4px; }}
+</style>
+</head>
+<body>
+<h1>{escape(title)}</h1>
+<main>
+{figures}
+</main>
+</body>
+</html>
+'''
+
+
+def export_svg(package, output_dir, width: int = SVG_WIDTH, font_path=None, font_family: str = FONT_FAMILY,
+               slides=None, title: str = 'Slides') -> int:
+    """Write slide-001.svg, ... as each slide is read, then index.html; returns the slides written."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    entries = []
+    for scene, svg in iter_svg(package, width, font_path, font_family, slides):
+        name = f'slide-{scene.number:03d}.svg'
+        (output_dir / name).write_text(svg, encoding='utf-8')
+        entries.append((scene.number, name, round(width * scene.height / scene.width)))
+    (output_dir / 'index.html').write_text(index_html(entries, title, width), encoding='utf-8')
+    return len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export a deck as SVG slides and an index page')
+    parser.add_argument('deck', help='.pptx to export')
+    parser.add_argument('--output-dir', '-o', default=None,
+                        help='Directory to write to (default: <deck>-svg next to the deck)')
+    parser.add_argument('--width', type=int, default=SVG_WIDTH, help='Slide width in CSS pixels')
+    parser.add_argument('--font', default=None, help='Font file to predict line breaks with (default: built-in widths)')
+    parser.add_argument('--font-family', default=FONT_FAMILY, help='CSS font-family of the text')
+    args = parser.parse_args()
+
+    deck = Path(args.deck)
+    output_dir = Path(args.output_dir) if args.output_dir else deck.with_name(f'{deck.stem}-svg')
+    start = time.perf_counter()
+    count = export_svg(deck, output_dir, args.width, args.font, args.font_family, title=deck.stem)
+    print(f"{count} slides exported in {time.perf_counter() - start:.2f}s")
+    print(f"Index: {output_dir / 'index.html'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Content-hashed snapshot cache for PowerPoint templates.
+
+Opening a template used to cost a full theme scan in TemplateColors and a
+second package parse in SlideGenerator.load_template. A snapshot records
+everything the generators need from a template:
+
+- the theme palettes of every master and layout (hex strings keyed by clrScheme
+  slot, e.g. 'dk1'), resolved by theme_registry.ThemeRegistry
+- the title/subtitle placeholder index of every slide layout
+
+Snapshots are keyed by the SHA-256 of the .pptx file, memoised in-process and
+pickled under the cache directory, so editing the template invalidates them.
+Only that derived data is pickled: the template has to be read to be hashed
+anyway, so its bytes are attached on load rather than stored twice. Within a
+process the package is parsed once, on first use, and kept as a prototype;
+each load_template() receives a deep copy of it instead of re-parsing the zip.
+
+The cache directory defaults to ./slides/.cache and can be moved with the
+SLIDES_CACHE_DIR environment variable.
+"""
+
+import copy
+import hashlib
+import io
+import os
+import pickle
+from pathlib import Path
+
+from pptx import Presentation
+
+from theme_registry import ThemeRegistry
+
+CACHE_DIR = Path(os.environ.get('SLIDES_CACHE_DIR', './slides/.cache'))
+
+# Bump when the snapshot layout changes so stale pickles are ignored
+SNAPSHOT_VERSION = 3
+
+# Placeholder types the generators fill in (PP_PLACEHOLDER.TITLE / SUBTITLE)
+PH_TITLE = 1
+PH_SUBTITLE = 4
+
+# (path, mtime_ns, size) -> TemplateSnapshot
+_snapshots = {}
+
+
+def extract_theme_colors(package: bytes) -> dict:
+    """Extract the palette of the first master's theme as {slot: 'RRGGBB'}."""
+    return ThemeRegistry.from_package(package).default
+
+
+def index_placeholders(prs) -> dict:
+    """Map each layout index to its fillable (idx, type, top_emu) placeholders.
+
+    Only placeholders cloned onto new slides and of type TITLE or SUBTITLE are
+    recorded; those are the ones add_title_slide/add_content_slide touch.
+    """
+    index = {}
+    for layout_idx, layout in enumerate(prs.slide_layouts):
+        entries = []
+        for ph in layout.iter_cloneable_placeholders():
+            ph_type = ph.placeholder_format.type
+            if ph_type is None or ph_type.real not in (PH_TITLE, PH_SUBTITLE):
+                continue
+            top = ph.top
+            entries.append((ph.placeholder_format.idx, ph_type.real, None if top is None else int(top)))
+        index[layout_idx] = entries
+    return index
+
+
+class TemplateSnapshot:
+    """Everything the generators read from a template, keyed by its hash."""
+
+    def __init__(self, digest: str, themes: ThemeRegistry, placeholders: dict, package: bytes):
+        self.digest = digest
+        self.themes = themes
+        self.colors = themes.default
+        self.placeholders = placeholders
+        self.package = package
+        self._prototype = None
+
+    @classmethod
+    def build(cls, package: bytes, digest: str):
+        """Parse a template package into a snapshot."""
+        prs = Presentation(io.BytesIO(package))
+        snapshot = cls(digest, ThemeRegistry.from_package(package), index_placeholders(prs), package)
+        snapshot._prototype = prs
+        return snapshot
+
+    def __getstate__(self):
+        # The package bytes are re-read (to hash them) on every load; do not pickle them again
+        state = self.__dict__.copy()
+        state['package'] = None
+        state['_prototype'] = None
+        return state
+
+    def new_presentation(self):
+        """Return a fresh Presentation, copied from the parsed prototype."""
+        if self._prototype is None:
+            self._prototype = Presentation(io.BytesIO(self.package))
+        return copy.deepcopy(self._prototype)
+
+
+def _snapshot_path(digest: str) -> Path:
+    return CACHE_DIR / 'templates' / f'{digest}-v{SNAPSHOT_VERSION}.pickle'
+
+
+def _read_snapshot(path: Path):
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError):
+        return None
+    return snapshot if isinstance(snapshot, TemplateSnapshot) else None
+
+
+def _write_snapshot(path: Path, snapshot: TemplateSnapshot):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(template_path, use_disk: bool = True) -> TemplateSnapshot:
+    """Return the snapshot for a template, building and caching it if needed."""
+    stat = os.stat(template_path)
+    key = (os.path.abspath(template_path), stat.st_mtime_ns, stat.st_size)
+    snapshot = _snapshots.get(key)
+    if snapshot is not None:
+        return snapshot
+
+    with open(template_path, 'rb') as f:
+        package = f.read()
+    digest = hashlib.sha256(package).hexdigest()
+
+    snapshot = None
+    path = _snapshot_path(digest)
+    if use_disk:
+        snapshot = _read_snapshot(path)
+    if snapshot is None or snapshot.digest != digest:
+        snapshot = TemplateSnapshot.build(package, digest)
+        if use_disk:
+            try:
+                _write_snapshot(path, snapshot)
+            except OSError:
+                pass
+    else:
+        snapshot.package = package
+
+    _snapshots[key] = snapshot
+    return snapshot
+
+
+def clear_memory_cache():
+    """Forget in-process snapshots (the on-disk cache is left alone)."""
+    _snapshots.clear()
@@ -0,0 +1,357 @@
+"""
+Predict how text wraps in a slide box, without rendering the deck.
+
+Text is measured with per-font advance-width tables that are filled lazily and
+cached per character:
+
+- the built-in table uses Helvetica widths for ASCII, one em for full-width
+  (CJK, kana, full-width forms, emoji) and half an em for half-width kana
+- a .ttf/.otf/.ttc path instead reads the real advances from the font with Pillow
+
+Lines break the way PowerPoint breaks Japanese text: between any two full-width
+characters, at spaces between Latin words, and never against the kinsoku rules
+(no closing brackets, small kana or 、。 at a line start, no opening bracket at
+a line end). Words longer than the line are broken by character.
+
+wrap() is memoised on (text, size, width, font, bold), so checking the boxes of
+a large batch mostly costs dictionary lookups. fit_font_sizes() shrinks font
+sizes until text fits its box; find_overflows() reports every text box of a
+generated presentation whose text is predicted to overflow.
+"""
+
+import unicodedata
+from functools import lru_cache
+
+from pptx.oxml.ns import qn
+
+EMU_PER_INCH = 914400
+
+# Default text frame insets (a:bodyPr lIns/rIns and tIns/bIns), in inches
+INSET_X = 0.1
+INSET_Y = 0.05
+
+# Single line spacing as a multiple of the font size
+LINE_SPACING = 1.2
+
+# roundRect text rectangle inset, as a fraction of the corner radius
+_ROUND_RECT_TEXT_INSET = 0.29289
+
+# Font size PowerPoint falls back to when a paragraph sets none
+DEFAULT_FONT_SIZE = 18
+
+# Kinsoku shori (JIS X 4051): characters that may not start or end a line
+NOT_AT_LINE_START = frozenset(
+    ')]}）］｝〕〉》」』】〙〗〟’”｠»'
+    '、。，．,.・：；:;？！?!‼⁇⁈⁉'
+    'ー－‐゠–〜～ヽヾゝゞ々〻'
+    'ぁぃぅぇぉっゃゅょゎゕゖァィゥェォッャュョヮヵヶㇰㇱㇲㇳㇴㇵㇶㇷㇸㇹㇺㇻㇼㇽㇾㇿ'
+)
+NOT_AT_LINE_END = frozenset('([{（［｛〔〈《「『【〘〖〝‘“｟«')
+
+# Helvetica advance widths for printable ASCII (1/1000 em), starting at ' '
+_LATIN_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_LATIN = {chr(32 + i): w / 1000 for i, w in enumerate(_LATIN_WIDTHS)}
+
+# Bold Latin runs roughly this much wider in the built-in table
+_BOLD_FACTOR = 1.06
+
+# (font, bold) -> FontMetrics
+_fonts = {}
+
+_SP = qn('p:sp')
+_TX_BODY = qn('p:txBody')
+_BODY_PR = qn('a:bodyPr')
+_P = qn('a:p')
+_P_PR = qn('a:pPr')
+_DEF_RPR = qn('a:defRPr')
+_R = qn('a:r')
+_RPR = qn('a:rPr')
+_T = qn('a:t')
+_BR = qn('a:br')
+_EXT_PATH = f"{qn('p:spPr')}/{qn('a:xfrm')}/{qn('a:ext')}"
+_GEOM_PATH = f"{qn('p:spPr')}/{qn('a:prstGeom')}"
+_GD_PATH = f"{qn('a:avLst')}/{qn('a:gd')}"
+_OFF_PATH = f"{qn('p:spPr')}/{qn('a:xfrm')}/{qn('a:off')}"
+
+
+@lru_cache(maxsize=None)
+def is_wide(ch: str) -> bool:
+    """True for full-width characters (CJK, kana, full-width forms, emoji, ambiguous symbols)."""
+    return unicodedata.east_asian_width(ch) in ('F', 'W', 'A')
+
+
+def _is_zero_width(ch: str) -> bool:
+    return unicodedata.category(ch) in ('Mn', 'Me', 'Cf')
+
+
+def _builtin_advance(ch: str, bold: bool) -> float:
+    if ch in _LATIN:
+        return _LATIN[ch] * (_BOLD_FACTOR if bold else 1.0)
+    if _is_zero_width(ch):
+        return 0.0
+    eaw = unicodedata.east_asian_width(ch)
+    if eaw in ('F', 'W', 'A'):
+        return 1.0
+    if eaw == 'H':
+        return 0.5
+    return 0.556 * (_BOLD_FACTOR if bold else 1.0)
+
+
+class FontMetrics:
+    """Advance widths of one font face in em, cached per character."""
+
+    def __init__(self, name: str, advance):
+        self.name = name
+        self._advance = advance
+        self._widths = {}
+
+    def char_width(self, ch: str) -> float:
+        width = self._widths.get(ch)
+        if width is None:
+            width = self._widths[ch] = self._advance(ch)
+        return width
+
+    def text_width(self, text: str) -> float:
+        """Advance width of text in em."""
+        widths = self._widths
+        total = 0.0
+        for ch in text:
+            width = widths.get(ch)
+            if width is None:
+                width = self.char_width(ch)
+            total += width
+        return total
+
+
+def get_font(font: str = None, bold: bool = False) -> FontMetrics:
+    """Metrics for a font file path, or the built-in table when font is None."""
+    key = (font, bold)
+    metrics = _fonts.get(key)
+    if metrics is not None:
+        return metrics
+
+    if font is None:
+        metrics = FontMetrics('builtin-bold' if bold else 'builtin', lambda ch: _builtin_advance(ch, bold))
+    else:
+        from PIL import ImageFont
+
+        face = ImageFont.truetype(font, 1000)
+        metrics = FontMetrics(font, lambda ch: face.getlength(ch) / 1000)
+    _fonts[key] = metrics
+    return metrics
+
+
+def _can_break(prev: str, ch: str) -> bool:
+    """Whether a line may break between prev and ch."""
+    if ch in NOT_AT_LINE_START or prev in NOT_AT_LINE_END:
+        return False
+    if ch.isspace() or _is_zero_width(ch):
+        return False
+    if prev.isspace():
+        return True
+    return is_wide(prev) or is_wide(ch)
+
+
+def _units(paragraph: str) -> list:
+    """Split a paragraph into unbreakable units (trailing spaces stay on their unit)."""
+    units = []
+    start = 0
+    for i in range(1, len(paragraph)):
+        if _can_break(paragraph[i - 1], paragraph[i]):
+            units.append(paragraph[start:i])
+            start = i
+    units.append(paragraph[start:])
+    return units
+
+
+def _wrap_paragraph(paragraph: str, available: float, metrics: FontMetrics) -> list:
+    """Greedy line filling in em units; trailing spaces may hang past the edge."""
+    lines = []
+    line, line_width = '', 0.0
+    for unit in _units(paragraph):
+        core = unit.rstrip(' ')
+        core_width = metrics.text_width(core)
+        if line and line_width + core_width > available + 1e-9:
+            lines.append(line.rstrip(' '))
+            line, line_width = '', 0.0
+        if not line and core_width > available + 1e-9:
+            # Longer than a whole line: break it by character
+            for ch in core:
+                width = metrics.char_width(ch)
+                if line and line_width + width > available + 1e-9:
+                    lines.append(line)
+                    line, line_width = '', 0.0
+                line += ch
+                line_width += width
+            line += unit[len(core):]
+            line_width += metrics.text_width(unit[len(core):])
+            continue
+        line += unit
+        line_width += metrics.text_width(unit)
+    lines.append(line.rstrip(' '))
+    return lines
+
+
+def corner_inset(width: float, height: float, adjustment: float = 0.1) -> float:
+    """Inches a roundRect's text rectangle is pulled in from each edge by its corners."""
+    return min(width, height) * adjustment * _ROUND_RECT_TEXT_INSET
+
+
+def text_area(width: float, height: float, rounded: bool = False, adjustment: float = 0.1) -> tuple:
+    """Inner (width, height) in inches available to text in a box, after insets.
+
+    rounded: the box is a roundRect with corner `adjustment`, whose text
+    rectangle is pulled in from the corners.
+    """
+    inner_w, inner_h = width - 2 * INSET_X, height - 2 * INSET_Y
+    if rounded:
+        corner = corner_inset(width, height, adjustment)
+        inner_w -= 2 * corner
+        inner_h -= 2 * corner
+    return max(inner_w, 0.0), max(inner_h, 0.0)
+
+
+@lru_cache(maxsize=65536)
+def wrap(text: str, size: float, width: float, font: str = None, bold: bool = False) -> tuple:
+    """Lines text wraps to at `size` pt in a text area `width` inches wide."""
+    metrics = get_font(font, bold)
+    available = width * 72 / size
+    lines = []
+    for paragraph in text.replace('\v', '\n').split('\n'):
+        lines.extend(_wrap_paragraph(paragraph, available, metrics))
+    return tuple(lines)
+
+
+def line_count(text: str, size: float, width: float, font: str = None, bold: bool = False) -> int:
+    """Number of wrapped lines of text at `size` pt in a text area `width` inches wide."""
+    return len(wrap(text, size, width, font, bold))
+
+
+def text_height(paragraphs, width: float, font: str = None) -> float:
+    """Height in inches of (text, size, bold) paragraphs wrapped to a text area `width` wide."""
+    return sum(
+        line_count(text, size, width, font, bold) * size * LINE_SPACING / 72
+        for text, size, bold in paragraphs
+    )
+
+
+def allowed_height(paragraphs, inner_h: float) -> float:
+    """Text height a text area holds; a single line may overhang the insets, as label boxes do."""
+    _text, size, _bold = paragraphs[0]
+    return max(inner_h, size * LINE_SPACING / 72)
+
+
+def overflow(paragraphs, width: float, height: float, rounded: bool = False, font: str = None,
+             adjustment: float = 0.1):
+    """(needed, available) inches if (text, size, bold) paragraphs overflow a width x height box, else None."""
+    inner_w, inner_h = text_area(width, height, rounded, adjustment)
+    needed = text_height(paragraphs, inner_w, font)
+    available = allowed_height(paragraphs, inner_h)
+    if needed > available + 1e-9:
+        return needed, available
+    return None
+
+
+def fits(paragraphs, width: float, height: float, rounded: bool = False, font: str = None) -> bool:
+    """Whether (text, size, bold) paragraphs fit a box of width x height inches."""
+    return overflow(paragraphs, width, height, rounded, font) is None
+
+
+def fit_font_sizes(paragraphs, width: float, height: float, rounded: bool = False,
+                   font: str = None, min_size: int = 8) -> list:
+    """Shrink (text, size, bold) paragraphs until they fit the box; returns the new sizes.
+
+    Sizes are scaled together in 5% steps (like PowerPoint's shrink-on-overflow)
+    and never go below min_size; the smallest sizes are returned if nothing fits.
+    """
+    sizes = [size for _text, size, _bold in paragraphs]
+    scale = 1.0
+    while True:
+        scaled = [(text, size, bold) for (text, _size, bold), size in zip(paragraphs, sizes)]
+        if fits(scaled, width, height, rounded, font) or all(s <= min_size for s in sizes):
+            return sizes
+        scale -= 0.05
+        sizes = [max(min_size, int(size * scale)) for _text, size, _bold in paragraphs]
+
+
+def read_paragraphs(txBody) -> list:
+    """(text, size_pt, bold) for each a:p of a text body."""
+    paragraphs = []
+    for p in txBody.iterchildren(_P):
+        parts = []
+        size, bold = None, False
+        for child in p:
+            tag = child.tag
+            if tag == _R:
+                rPr = child.find(_RPR)
+                if size is None and rPr is not None:
+                    size = rPr.get('sz')
+                parts.append(child.findtext(_T) or '')
+            elif tag == _BR:
+                parts.append('\n')
+            elif tag == _P_PR:
+                defRPr = child.find(_DEF_RPR)
+                if defRPr is not None:
+                    size = defRPr.get('sz')
+                    bold = defRPr.get('b') in ('1', 'true')
+        size = int(size) / 100 if size else DEFAULT_FONT_SIZE
+        paragraphs.append((''.join(parts), size, bold))
+    return paragraphs
+
+
+def round_rect(sp) -> tuple:
+    """(rounded, corner adjustment) of a p:sp's preset geometry."""
+    geom = sp.find(_GEOM_PATH)
+    if geom is None or geom.get('prst') != 'roundRect':
+        return False, 0.0
+    gd = geom.find(_GD_PATH)
+    fmla = gd.get('fmla', '') if gd is not None else ''
+    if fmla.startswith('val '):
+        return True, int(fmla[4:]) / 100000
+    return True, 0.16667
+
+
+def overflow_record(number: int, left: float, top: float, result, paragraphs) -> tuple:
+    """(slide_number, left_in, top_in, needed_in, available_in, text) for a reported box."""
+    needed, available = result
+    text = '\n'.join(text for text, _size, _bold in paragraphs)
+    return number, round(left, 3), round(top, 3), round(needed, 3), round(available, 3), text
+
+
+def find_overflows(prs, font: str = None) -> list:
+    """Text boxes of prs whose text is predicted to overflow.
+
+    Returns (slide_number, left_in, top_in, needed_in, available_in, text) tuples.
+    Placeholders without their own geometry and boxes that do not wrap are skipped.
+    This walks the slide XML; SlideGenerator.check_text() is faster for boxes it drew.
+    """
+    overflows = []
+    for number, slide in enumerate(prs.slides, 1):
+        for sp in slide._element.iter(_SP):
+            txBody = sp.find(_TX_BODY)
+            ext = sp.find(_EXT_PATH)
+            if txBody is None or ext is None:
+                continue
+            bodyPr = txBody.find(_BODY_PR)
+            if bodyPr is not None and bodyPr.get('wrap') == 'none':
+                continue
+            paragraphs = read_paragraphs(txBody)
+            if not any(text for text, _size, _bold in paragraphs):
+                continue
+            width = int(ext.get('cx')) / EMU_PER_INCH
+            height = int(ext.get('cy')) / EMU_PER_INCH
+            rounded, adjustment = round_rect(sp)
+            result = overflow(paragraphs, width, height, rounded, font, adjustment)
+            if result is not None:
+                off = sp.find(_OFF_PATH)
+                overflows.append(overflow_record(
+                    number, int(off.get('x')) / EMU_PER_INCH, int(off.get('y')) / EMU_PER_INCH,
+                    result, paragraphs))
+    return overflows
@@ -0,0 +1,147 @@
+"""
+Resolve the theme palette of every slide master and layout in a template.
+
+A .pptx can carry several masters, each with its own theme, and a layout can
+override its master's colors with a themeOverride part, so the file that
+happens to be called theme1.xml is not necessarily the theme a slide uses.
+Which one it is follows from the relationship graph:
+
+    presentation.xml -> slideMaster (sldMasterIdLst order) -> theme
+                        slideMaster -> slideLayout (sldLayoutIdLst order) [-> themeOverride]
+
+ThemeRegistry walks those relationships and reads only the zip members they
+reach. Theme parts are parsed incrementally and parsing stops at the end of
+clrScheme, the first thing in a theme, so the font and format schemes after
+it are never read. Each theme is read once however many layouts share it.
+
+Palettes are {slot: 'RRGGBB'} dicts keyed by clrScheme slot ('dk1', 'accent1', ...).
+Layouts are indexed like python-pptx's master.slide_layouts.
+"""
+
+import io
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+
+NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+NS_R = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+NS_P = '{http://schemas.openxmlformats.org/presentationml/2006/main}'
+NS_A = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+
+RT = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+RT_OFFICE_DOCUMENT = RT + 'officeDocument'
+RT_THEME = RT + 'theme'
+RT_THEME_OVERRIDE = RT + 'themeOverride'
+
+PACKAGE_RELS = '_rels/.rels'
+
+
+def rels_member(member: str) -> str:
+    """Zip member holding the relationships of `member` ('' for the package)."""
+    if not member:
+        return PACKAGE_RELS
+    directory, name = posixpath.split(member)
+    return posixpath.join(directory, '_rels', name + '.rels')
+
+
+def read_rels(z: zipfile.ZipFile, member: str) -> dict:
+    """Internal relationships of a part as {rId: (reltype, target member)}."""
+    try:
+        root = ET.fromstring(z.read(rels_member(member)))
+    except KeyError:
+        return {}
+    base = posixpath.dirname(member)
+    rels = {}
+    for rel in root.iter(NS_PKG_REL + 'Relationship'):
+        if rel.get('TargetMode') == 'External':
+            continue
+        target = rel.get('Target')
+        if target.startswith('/'):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join(base, target))
+        rels[rel.get('Id')] = (rel.get('Type'), target)
+    return rels
+
+
+def rel_target(rels: dict, reltype: str):
+    """Target member of the first relationship of `reltype`, or None."""
+    for rel_type, target in rels.values():
+        if rel_type == reltype:
+            return target
+    return None
+
+
+def read_id_list(z: zipfile.ZipFile, member: str, list_tag: str) -> list:
+    """r:id of each child of the first `list_tag` element, stopping once it is read."""
+    with z.open(member) as f:
+        for _event, elem in ET.iterparse(f, events=('end',)):
+            if elem.tag == list_tag:
+                return [child.get(NS_R + 'id') for child in elem]
+    return []
+
+
+def read_clr_scheme(z: zipfile.ZipFile, member: str) -> dict:
+    """The clrScheme of a theme (or themeOverride) part, parsed only up to its end."""
+    colors = {}
+    with z.open(member) as f:
+        for _event, elem in ET.iterparse(f, events=('end',)):
+            if elem.tag != NS_A + 'clrScheme':
+                continue
+            for slot in elem:
+                for color in slot:
+                    if color.tag == NS_A + 'srgbClr':
+                        colors[slot.tag.split('}')[-1]] = color.get('val')
+                    elif color.tag == NS_A + 'sysClr' and color.get('lastClr'):
+                        colors[slot.tag.split('}')[-1]] = color.get('lastClr')
+            break
+    return colors
+
+
+class ThemeRegistry:
+    """Palettes of each master and of each master's layouts."""
+
+    def __init__(self, masters: list, layouts: list):
+        # masters[m] is a palette; layouts[m][i] the palette of layout i of master m
+        self.masters = masters
+        self.layouts = layouts
+
+    @classmethod
+    def from_package(cls, package: bytes):
+        """Build the registry from the bytes of a .pptx."""
+        with zipfile.ZipFile(io.BytesIO(package), 'r') as z:
+            names = set(z.namelist())
+            themes = {}
+
+            def palette(member):
+                if member not in themes:
+                    themes[member] = read_clr_scheme(z, member) if member in names else {}
+                return themes[member]
+
+            document = rel_target(read_rels(z, ''), RT_OFFICE_DOCUMENT)
+            document_rels = read_rels(z, document)
+            masters, layouts = [], []
+            for rId in read_id_list(z, document, NS_P + 'sldMasterIdLst'):
+                master = document_rels[rId][1]
+                master_rels = read_rels(z, master)
+                theme = rel_target(master_rels, RT_THEME)
+                master_palette = palette(theme) if theme else {}
+                master_layouts = []
+                for layout_rId in read_id_list(z, master, NS_P + 'sldLayoutIdLst'):
+                    override = rel_target(read_rels(z, master_rels[layout_rId][1]), RT_THEME_OVERRIDE)
+                    if override:
+                        master_layouts.append({**master_palette, **palette(override)})
+                    else:
+                        master_layouts.append(master_palette)
+                masters.append(master_palette)
+                layouts.append(master_layouts)
+        return cls(masters, layouts)
+
+    @property
+    def default(self) -> dict:
+        """Palette of the first master (what the deck uses unless a layout says otherwise)."""
+        return self.masters[0] if self.masters else {}
+
+    def layout(self, index: int, master: int = 0) -> dict:
+        """Palette of layout `index` of `master`."""
+        return self.layouts[master][index]
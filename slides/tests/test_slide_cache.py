@@ -0,0 +1,66 @@
+"""
+Regression tests for incremental builds (slide_cache.py).
+
+They need the real template, which is not in the repository: set
+SLIDES_TEMPLATE to its path, or run from the project root with it at
+slides/templates/genda.pptx. Without it the tests are skipped.
+
+Usage:
+    uv run python -m unittest discover slides/tests
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+import generate_pptx  # noqa: E402
+from generate_warehouse_proposal import WarehouseProposalGenerator  # noqa: E402
+from slide_cache import SlideCache  # noqa: E402
+
+TEMPLATE = os.environ.get('SLIDES_TEMPLATE', './slides/templates/genda.pptx')
+
+
+@unittest.skipUnless(Path(TEMPLATE).exists(), f'template not found: {TEMPLATE}')
+class IncrementalRebuildTest(unittest.TestCase):
+    """A deck restored from the slide cache must be the deck a fresh build makes."""
+
+    def build(self, cache, workers: int = None):
+        gen = WarehouseProposalGenerator(TEMPLATE)
+        with mock.patch.object(generate_pptx, 'SlideCache', lambda: cache), \
+                contextlib.redirect_stdout(io.StringIO()):
+            gen.generate_all(incremental=cache is not None, workers=workers)
+        return gen
+
+    def summary(self, gen) -> dict:
+        return {
+            'shapes': [len(slide.shapes) for slide in gen.prs.slides],
+            'overflows': gen.check_text(),
+            'merged': gen.merge_shapes(),
+        }
+
+    def check_rebuild(self, workers: int = None):
+        fresh = self.summary(self.build(None))
+        with tempfile.TemporaryDirectory() as cache_dir:
+            # The first incremental build fills the cache, the second is restored from it
+            self.build(SlideCache(cache_dir), workers)
+            cache = SlideCache(cache_dir)
+            gen = self.build(cache, workers)
+        self.assertEqual((cache.hits, cache.misses), (len(gen.SLIDE_BUILDERS), 0))
+        self.assertEqual(self.summary(gen), fresh)
+
+    def test_sequential_rebuild_matches_fresh_build(self):
+        self.check_rebuild()
+
+    def test_parallel_rebuild_matches_fresh_build(self):
+        self.check_rebuild(workers=2)
+
+
+if __name__ == '__main__':
+    unittest.main()